@@ -0,0 +1,111 @@
+"""
+Poll intervals learned from how often each source actually has new jobs.
+
+Every scheduled run records how many new jobs it found and how many hours
+had passed since the previous run of that source. From that history
+ChangeRateModel estimates a source's rate of new jobs (per hour) for a given
+hour of the day and day of the week, and next_interval() picks the interval
+that should find about `target` new jobs per run - short during peak posting
+hours, long overnight - clamped to the source's bounds.
+
+Sparse buckets are smoothed towards the source's rate for that hour on any
+day, and that towards its overall rate, so a single quiet or busy run does
+not swing the schedule. Only the last ADAPTIVE_HISTORY_DAYS days count.
+
+Usage:
+    python runner.py --schedule --adaptive
+    HOT_JOBS_MIN_INTERVAL_MINUTES=15 HOT_JOBS_MAX_INTERVAL_MINUTES=240 python runner.py --schedule --adaptive
+    ADAPTIVE_TARGET_NEW_JOBS=2 SCHEDULE_DB=/var/lib/bdjobs/schedule.db python runner.py --schedule --adaptive
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Pseudo-hours of observation given to the coarser estimate when smoothing
+SMOOTHING_HOURS = 2.0
+
+
+class ChangeRateModel:
+    """SQLite history of scheduled runs and the new-job rates derived from it"""
+
+    def __init__(self, path=None, history_days=None, target=None):
+        self.path = path or os.environ.get('SCHEDULE_DB', 'schedule.db')
+        self.history_days = history_days or int(os.environ.get('ADAPTIVE_HISTORY_DAYS', 28))
+        # New jobs one run should find on average
+        self.target = target or float(os.environ.get('ADAPTIVE_TARGET_NEW_JOBS', 1))
+        # Runs of different sources finish on different scheduler threads
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS polls (
+                source TEXT NOT NULL,
+                polled_at TEXT NOT NULL,
+                weekday INTEGER NOT NULL,
+                hour INTEGER NOT NULL,
+                covered_hours REAL NOT NULL,
+                new_jobs INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS polls_source ON polls (source, polled_at)")
+        self.conn.commit()
+
+    def last_poll(self, source):
+        row = self.conn.execute("SELECT MAX(polled_at) FROM polls WHERE source = ?", (source,)).fetchone()
+        return datetime.strptime(row[0], TIMESTAMP_FORMAT) if row[0] else None
+
+    def record(self, source, polled_at, new_jobs, default_interval_minutes):
+        """
+        Record a run of source started at polled_at that found new_jobs. The
+        jobs are credited to the middle of the window since the previous run
+        """
+        with self._lock:
+            self._record(source, polled_at, new_jobs, default_interval_minutes)
+
+    def _record(self, source, polled_at, new_jobs, default_interval_minutes):
+        previous = self.last_poll(source)
+        if previous is None or previous >= polled_at:
+            covered = default_interval_minutes / 60
+        else:
+            # A long outage says nothing about the rate during it
+            covered = min((polled_at - previous).total_seconds() / 3600, 7 * 24)
+        middle = polled_at - timedelta(hours=covered / 2)
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO polls (source, polled_at, weekday, hour, covered_hours, new_jobs) VALUES (?, ?, ?, ?, ?, ?)",
+                (source, polled_at.strftime(TIMESTAMP_FORMAT), middle.weekday(), middle.hour, covered, new_jobs),
+            )
+
+    def _totals(self, source, since, **bucket):
+        where = ' '.join(f"AND {column} = ?" for column in bucket)
+        new_jobs, hours = self.conn.execute(
+            f"SELECT SUM(new_jobs), SUM(covered_hours) FROM polls WHERE source = ? AND polled_at >= ? {where}",
+            (source, since, *bucket.values()),
+        ).fetchone()
+        return new_jobs or 0, hours or 0.0
+
+    def rate(self, source, at, default_interval_minutes):
+        """Estimated new jobs per hour of source around `at` (weekday and hour)"""
+        since = (at - timedelta(days=self.history_days)).strftime(TIMESTAMP_FORMAT)
+        # Prior: one new job per default interval, worth one default interval of observation
+        prior_hours = default_interval_minutes / 60
+        overall_new, overall_hours = self._totals(source, since)
+        overall = (overall_new + 1) / (overall_hours + prior_hours)
+
+        hour_new, hour_hours = self._totals(source, since, hour=at.hour)
+        hourly = (hour_new + SMOOTHING_HOURS * overall) / (hour_hours + SMOOTHING_HOURS)
+
+        slot_new, slot_hours = self._totals(source, since, weekday=at.weekday(), hour=at.hour)
+        return (slot_new + SMOOTHING_HOURS * hourly) / (slot_hours + SMOOTHING_HOURS)
+
+    def next_interval(self, source, at, default_minutes, min_minutes, max_minutes):
+        """Minutes until the next run of source: about `target` expected new jobs, within the bounds"""
+        with self._lock:
+            rate = self.rate(source, at, default_minutes)
+        minutes = self.target / rate * 60 if rate > 0 else max_minutes
+        return max(min_minutes, min(max_minutes, minutes))
+
+    def close(self):
+        self.conn.close()
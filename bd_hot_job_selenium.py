@@ -1,97 +1,199 @@
 import time
-import requests
 import json
 import os
-from apscheduler.schedulers.blocking import BlockingScheduler
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
 from datetime import datetime
-import os
+
+from browser import driver_rss_mb, get_pool
+from dedup import DedupIndex
+from delivery import ApiDelivery
+from enrichment import DetailEnricher
+from hot_jobs_payload import PayloadCapture, cards_match_page, fetch_payload_cards
+from outbox import Outbox, OutboxDrainer
+from job_store import JobStore
+from lean_profile import LeanProfile, NetworkStats
+from metrics import (
+    DRIVER_STARTUP, EXTRACTION, PAGE_LOAD, READINESS_WAIT, SERIALIZATION, Metrics, instrument_driver
+)
+from records import HotJob
+from seen_index import SeenIndex
+from sinks import ApiBatchSink, BatchSink, CsvSink, OutboxSink, RecordPipeline, TypedSink, write_csv
+from waits import LatencyBudget, ReadinessWaiter
+
+# Text of an element as the per-element loop reads it (.text of a visible element)
+VISIBLE_TEXT_JS = """
+function visibleText(el) {
+    const visible = !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    return visible ? (el.innerText || '').trim() : '';
+}
+"""
+
+# One-round-trip extraction of every Hot Jobs card: the same fields the
+# per-element loop reads (visible text of the .wr spans, src/href properties)
+EXTRACT_CARDS_JS = VISIBLE_TEXT_JS + """
+return Array.from(document.querySelectorAll('.c-card')).map(card => {
+    const logo = card.querySelector('.companyLogo img');
+    return {
+        company_logo_url: logo ? (logo.hasAttribute('src') ? logo.src : null) : 'N/A',
+        company_name: Array.from(card.querySelectorAll('h3 .wr')).map(visibleText).join(' '),
+        jobs: Array.from(card.querySelectorAll('.companyDetails li a')).map(a => ({
+            position: Array.from(a.querySelectorAll('.wr')).map(visibleText).join(' '),
+            job_url: a.hasAttribute('href') ? a.href : null,
+        })),
+    };
+});
+"""
+
+# Company name of every rendered card, to check a captured payload against
+CARD_COMPANIES_JS = VISIBLE_TEXT_JS + """
+return Array.from(document.querySelectorAll('.c-card')).map(
+    card => Array.from(card.querySelectorAll('h3 .wr')).map(visibleText).join(' '));
+"""
+
 
 class BDJobsHotJobsScraper:
-    def __init__(self):
+    def __init__(self, batch_extract=None, pool=None, profile=None, incremental=None, metrics=None, enrich=None,
+                 dedup=None, job_store=None, fast_path=None, seen_namespace='bdjobs_hot_jobs'):
         self.base_url = "https://bdjobs.com/"
-        # Set up Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in headless mode
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        
-        # Initialize the Chrome WebDriver
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=chrome_options
-        )
+        # Read all cards with one execute_script call instead of several
+        # WebDriver round trips per card and per job link
+        # Usage: BATCH_EXTRACT=0 RUN_ONCE=1 python bd_hot_job_selenium.py
+        if batch_extract is None:
+            batch_extract = os.environ.get('BATCH_EXTRACT', '1') != '0'
+        self.batch_extract = batch_extract
+
+        # Incremental mode: only return jobs that are new or changed since they
+        # were last delivered (see seen_index.py). Runs that deliver somewhere
+        # else keep their own seen_namespace, so they never hide jobs from the API
+        # Usage: INCREMENTAL=1 RUN_ONCE=1 python bd_hot_job_selenium.py
+        if incremental is None:
+            incremental = os.environ.get('INCREMENTAL') == '1'
+        self.seen_index = SeenIndex(seen_namespace) if incremental else None
+
+        # Skip images, fonts, media and ad/tracker scripts (see lean_profile.py)
+        # Usage: HOT_JOBS_LEAN_PROFILE=0 RUN_ONCE=1 python bd_hot_job_selenium.py
+        self.profile = profile or LeanProfile.from_env('HOT_JOBS_')
+
+        # Per-phase timings, WebDriver call counts and memory (see metrics.py)
+        self.metrics = metrics or Metrics('bdjobs_hot_jobs')
+
+        # History of every job sighting with first/last seen (see job_store.py)
+        # Usage: JOB_STORE=0 RUN_ONCE=1 python bd_hot_job_selenium.py to disable
+        if job_store is None:
+            job_store = os.environ.get('JOB_STORE', '1') != '0'
+        self.job_store = JobStore(run_id=self.metrics.run_id) if job_store else None
+
+        # Drop jobs already scraped under another URL or from another source
+        # Usage: DEDUP=0 RUN_ONCE=1 python bd_hot_job_selenium.py to disable (see dedup.py)
+        if dedup is None:
+            dedup = os.environ.get('DEDUP', '1') != '0'
+        self.dedup = DedupIndex('bdjobs_hot_jobs') if dedup else None
+
+        # Fetch each (new) job's detail page for organization, text and PDF circulars
+        # Usage: ENRICH=1 RUN_ONCE=1 python bd_hot_job_selenium.py (see enrichment.py)
+        if enrich is None:
+            enrich = os.environ.get('ENRICH') == '1'
+        self.enricher = DetailEnricher(metrics=self.metrics) if enrich else None
+
+        # Build the records from the JSON the cards are rendered from, falling
+        # back to the DOM if it is missing or changed shape (see hot_jobs_payload.py)
+        # Usage: HOT_JOBS_FAST_PATH=0 RUN_ONCE=1 python bd_hot_job_selenium.py (DOM only)
+        if fast_path is None:
+            fast_path = os.environ.get('HOT_JOBS_FAST_PATH', '1') != '0'
+        self.fast_path = fast_path
+        # Fetch that JSON directly, without a browser
+        # Usage: HOT_JOBS_PAYLOAD_URL=https://... RUN_ONCE=1 python bd_hot_job_selenium.py
+        self.payload_url = os.environ.get('HOT_JOBS_PAYLOAD_URL') if fast_path else None
+
+        self.network_stats = NetworkStats()
+        self.capture = PayloadCapture(self.network_stats)
+        self.budget = LatencyBudget()
+        # A warm Chrome session is borrowed from the pool shared across
+        # scheduled runs once the page has to be rendered (start_browser)
+        self.pool = pool or get_pool(self.profile)
+        self.driver = None
+        self.waiter = None
+
+    def start_browser(self):
+        """Borrow a Chrome session from the pool (once per run)"""
+        if self.driver is None:
+            with self.metrics.timer(DRIVER_STARTUP):
+                self.driver = self.pool.acquire()
+            instrument_driver(self.driver, self.metrics)
+            self.profile.apply_session(self.driver)
+            self.waiter = ReadinessWaiter(self.driver, self.budget, network_stats=self.capture)
+        return self.driver
 
     def wait_for_element(self, by, value, timeout=10):
         """Wait for an element to be present on the page"""
+        # Selenium is imported once the page is rendered, not with the module (see cli.py)
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         return WebDriverWait(self.driver, timeout).until(
             EC.presence_of_element_located((by, value))
         )
 
-    def scrape_hot_jobs(self):
-        """Scrape jobs from the Hot Jobs section"""
+    def scrape_hot_jobs(self, sink=None):
+        """
+        Scrape jobs from the Hot Jobs section. With a sink (see sinks.py) each
+        card's jobs are written to it as soon as they are read and the jobs
+        are not kept; otherwise they are returned as a list
+        """
         print("Starting to scrape Hot Jobs section...")
         try:
-            # Load the page
-            self.driver.get(self.base_url)
-            print("Page loaded, waiting for content...")
-            
-            # Wait for the Hot Jobs section to load
-            hot_jobs_section = self.wait_for_element(By.CLASS_NAME, "m-text-center")
-            print("Found Hot Jobs section!")
+            cards = self.payload_cards()
+            if cards is None:
+                from selenium.webdriver.common.by import By
+
+                with self.metrics.timer(READINESS_WAIT):
+                    # Wait for the Hot Jobs section to load
+                    hot_jobs_section = self.wait_for_element(By.CLASS_NAME, "m-text-center")
+                    print("Found Hot Jobs section!")
+
+                    # Wait until the cards' data has arrived and the card list stops growing
+                    self.waiter.network_idle()
+                    self.waiter.stable_count(".c-card")
+
+                if self.batch_extract:
+                    cards = self.scrape_cards_batched()
+                else:
+                    cards = self.scrape_cards()
+
+            scraped = fresh = kept = 0
+
+            def fresh_cards():
+                nonlocal scraped, fresh, kept
+                for card_jobs in self.metrics.timed_iter(cards, EXTRACTION):
+                    scraped += len(card_jobs)
+                    if self.job_store is not None:
+                        self.job_store.record('bdjobs_hot_jobs', card_jobs)
+                    if self.seen_index is not None:
+                        card_jobs = self.seen_index.filter_fresh(card_jobs)
+                    fresh += len(card_jobs)
+                    if self.dedup is not None:
+                        card_jobs = self.dedup.filter(card_jobs)
+                    kept += len(card_jobs)
+                    yield card_jobs
 
-            # Wait a bit for all dynamic content to load
-            time.sleep(5)
+            batches = fresh_cards()
+            if self.enricher is not None:
+                # Detail pages of several cards are fetched concurrently
+                batches = self.enricher.enrich_batches(batches)
 
-            # Get all job cards
-            job_cards = self.driver.find_elements(By.CLASS_NAME, "c-card")
             all_jobs = []
+            writing = 0.0
+            for jobs in batches:
+                if sink is not None:
+                    started = time.perf_counter()
+                    sink.write_many(jobs)
+                    writing += time.perf_counter() - started
+                else:
+                    all_jobs.extend(jobs)
+            if sink is not None:
+                self.metrics.observe(SERIALIZATION, writing, records=kept)
 
-            print(f"Found {len(job_cards)} job cards")
-            for card in job_cards:
-                try:
-                    # Get company logo
-                    try:
-                        logo = card.find_element(By.CSS_SELECTOR, ".companyLogo img")
-                        logo_url = logo.get_attribute('src')
-                    except:
-                        logo_url = 'N/A'
-
-                    # Get company name
-                    try:
-                        company_name_spans = card.find_elements(By.CSS_SELECTOR, "h3 .wr")
-                        company_name = ' '.join([span.text for span in company_name_spans])
-                    except:
-                        company_name = 'N/A'
-
-                    # Get job positions
-                    job_links = card.find_elements(By.CSS_SELECTOR, ".companyDetails li a")
-                    
-                    for job_link in job_links:
-                        position_spans = job_link.find_elements(By.CLASS_NAME, "wr")
-                        position = ' '.join([span.text for span in position_spans])
-                        job_url = job_link.get_attribute('href')
-                        
-                        job_data = {
-                            'company_name': company_name,
-                            'company_logo_url': logo_url,
-                            'position': position,
-                            'job_url': job_url,
-                            'scraped_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        }
-                        all_jobs.append(job_data)
-                        print(f"Scraped: {job_data['company_name']} - {job_data['position']}")
-
-                except Exception as e:
-                    print(f"Error processing job card: {e}")
-                    continue
+            if self.seen_index is not None:
+                print(f"Incremental: {fresh} new/changed, {scraped - fresh} already seen")
 
             return all_jobs
 
@@ -100,56 +202,250 @@ class BDJobsHotJobsScraper:
             return []
         
         finally:
-            self.driver.quit()
+            self.budget.print_summary()
+            if self.driver is not None:
+                self.network_stats.collect(self.driver)
+                self.network_stats.print_report()
+                self.metrics.gauge('chrome_rss_mb', driver_rss_mb(self.driver))
+            if self.dedup is not None:
+                self.dedup.print_summary()
+                self.dedup.close()
+            if self.job_store is not None:
+                self.job_store.close()
+            if self.enricher is not None:
+                self.enricher.print_summary()
+                self.enricher.close()
+            self.metrics.print_summary()
+            if self.driver is not None:
+                # Keep the browser warm for the next scheduled run
+                self.pool.release(self.driver)
+                self.driver = self.waiter = None
+
+    def payload_cards(self):
+        """
+        Jobs of every card built from the cards' JSON payload (fetched from
+        payload_url, or captured while the home page loads in Chrome), or
+        None once the page is loaded and the cards have to be read from the DOM
+        """
+        if self.payload_url:
+            with self.metrics.timer(PAGE_LOAD, url=self.payload_url):
+                cards = fetch_payload_cards(self.payload_url, self.base_url)
+            if cards is not None:
+                print(f"Hot Jobs payload fetched from {self.payload_url}")
+                return self.card_jobs(cards)
+            print("Hot Jobs payload not recognised, loading the page instead")
+
+        # Load the page
+        self.start_browser()
+        self.capture.clear()
+        with self.metrics.timer(PAGE_LOAD, url=self.base_url):
+            self.driver.get(self.base_url)
+        print("Page loaded, waiting for content...")
+        if not self.fast_path:
+            return None
+
+        with self.metrics.timer(READINESS_WAIT):
+            # The cards' data has arrived once the page's requests are done
+            self.waiter.network_idle()
+        cards = self.capture.cards(self.driver, self.base_url)
+        if cards is None:
+            print("No Hot Jobs payload recognised, reading the cards from the page")
+            return None
+
+        # Only trust the payload if it is what the page rendered its cards from
+        with self.metrics.timer(READINESS_WAIT):
+            self.waiter.stable_count(".c-card")
+        companies = self.driver.execute_script(CARD_COMPANIES_JS) or []
+        if not cards_match_page(cards, companies):
+            print(f"Hot Jobs payload ({len(cards)} cards) does not match the page ({len(companies)} cards), "
+                  f"reading the cards from the page")
+            return None
+        return self.card_jobs(cards)
+
+    def scrape_cards(self):
+        """Read every job card element by element; yields the jobs of each card"""
+        from selenium.webdriver.common.by import By
+
+        # Get all job cards
+        job_cards = self.driver.find_elements(By.CLASS_NAME, "c-card")
+
+        print(f"Found {len(job_cards)} job cards")
+        for card in job_cards:
+            card_jobs = []
+            try:
+                # Get company logo
+                try:
+                    logo = card.find_element(By.CSS_SELECTOR, ".companyLogo img")
+                    logo_url = logo.get_attribute('src')
+                except:
+                    logo_url = 'N/A'
+
+                # Get company name
+                try:
+                    company_name_spans = card.find_elements(By.CSS_SELECTOR, "h3 .wr")
+                    company_name = ' '.join([span.text for span in company_name_spans])
+                except:
+                    company_name = 'N/A'
+
+                # Get job positions
+                job_links = card.find_elements(By.CSS_SELECTOR, ".companyDetails li a")
+                
+                for job_link in job_links:
+                    position_spans = job_link.find_elements(By.CLASS_NAME, "wr")
+                    position = ' '.join([span.text for span in position_spans])
+                    job_url = job_link.get_attribute('href')
+                    
+                    job_data = {
+                        'company_name': company_name,
+                        'company_logo_url': logo_url,
+                        'position': position,
+                        'job_url': job_url,
+                        'scraped_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    }
+                    card_jobs.append(job_data)
+                    print(f"Scraped: {job_data['company_name']} - {job_data['position']}")
+
+            except Exception as e:
+                print(f"Error processing job card: {e}")
+
+            yield card_jobs
+
+    def scrape_cards_batched(self):
+        """Read every job card with a single execute_script round trip; yields the jobs of each card"""
+        return self.card_jobs(self.driver.execute_script(EXTRACT_CARDS_JS) or [])
+
+    @staticmethod
+    def card_jobs(cards):
+        """Yields the job records of each card (as returned by EXTRACT_CARDS_JS)"""
+        print(f"Found {len(cards)} job cards")
+        for card in cards:
+            card_jobs = []
+            for job_link in card['jobs']:
+                job_data = {
+                    'company_name': card['company_name'],
+                    'company_logo_url': card['company_logo_url'],
+                    'position': job_link['position'],
+                    'job_url': job_link['job_url'],
+                    'scraped_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+                card_jobs.append(job_data)
+                print(f"Scraped: {job_data['company_name']} - {job_data['position']}")
+            yield card_jobs
+
+    def commit_seen(self, jobs):
+        """Record delivered (or, in CSV-only runs, saved) jobs in the seen index (incremental mode only)"""
+        if self.seen_index is not None and jobs:
+            self.seen_index.mark_seen(jobs)
 
     def save_to_csv(self, jobs, filename='bdjobs_hot_jobs.csv'):
         """Save scraped data to CSV"""
-        if jobs:
-            df = pd.DataFrame(jobs)
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
-            print(f"\nData saved to {os.path.abspath(filename)}")
-            print(f"Total hot jobs scraped: {len(jobs)}")
-        else:
-            print("No jobs to save")
+        report_saved(filename, write_csv(jobs, filename) if jobs else 0)
+
+
+def report_saved(filename, count):
+    if count:
+        print(f"\nData saved to {os.path.abspath(filename)}")
+        print(f"Total hot jobs scraped: {count}")
+    else:
+        print("No jobs to save")
+
 
 def main():
-    # Initialize scraper
-    scraper = BDJobsHotJobsScraper()
+    # Initialize scraper; this run only writes the CSV, so jobs it has seen
+    # must still reach the API on the next scheduled run
+    scraper = BDJobsHotJobsScraper(seen_namespace='bdjobs_hot_jobs_csv')
     
-    # Scrape hot jobs
+    # Scrape hot jobs, writing the CSV card by card as they are read
     print("Starting the scraping process...")
-    jobs = scraper.scrape_hot_jobs()
-    
-    # Save results to CSV
-    scraper.save_to_csv(jobs)
+    csv_sink = CsvSink('bdjobs_hot_jobs.csv')
+    with RecordPipeline([csv_sink, BatchSink(scraper.commit_seen)]) as sink:
+        scraper.scrape_hot_jobs(sink)
+    report_saved(csv_sink.filename, csv_sink.count)
+    scraper.metrics.close(jobs=csv_sink.count)
+
+
+HOT_JOBS_API_URL = os.environ.get('HOT_JOBS_API_URL', 'https://abdullah007ie.pythonanywhere.com/n8n/send-data/')
 
 
-def send_jobs_to_api(jobs, api_url="https://abdullah007ie.pythonanywhere.com/n8n/send-data/"):
+def send_jobs_to_api(jobs, api_url=HOT_JOBS_API_URL):
     """POST jobs (list) to configured API endpoint."""
     if not jobs:
         print("No jobs to send")
-        return
+        return False
 
-    api_url = api_url or os.environ.get('HOT_JOBS_API_URL', 'https://abdullah007ie.pythonanywhere.com/n8n/send-data/')
+    api_url = api_url or HOT_JOBS_API_URL
     try:
         print(f"Posting {len(jobs)} jobs to {api_url}...")
-        resp = requests.post(api_url, json=jobs, timeout=30)
-        print(f"API response: {resp.status_code} {resp.text}")
+        result = ApiDelivery(api_url, timeout=30).deliver(jobs)
     except Exception as e:
         print(f"Error posting to API: {e}")
+        return False
+
+    return report_delivery(result)
+
+
+def report_delivery(result):
+    """Print an ApiDelivery result; True if every batch was delivered"""
+    print(f"API: sent {result['sent']} jobs in {result['batches']} batches, "
+          f"{result['skipped']} unchanged, created {result['total_created']}, "
+          f"updated {result['total_updated']}, errors {result['total_errors']}")
+    for failure in result['failures']:
+        print(f"Error posting to API: {failure}")
+    return not result['failed_batches']
+
+
+def use_outbox():
+    """Queue jobs in the durable outbox instead of POSTing them inline (OUTBOX=0 disables)"""
+    return os.environ.get('OUTBOX', '1') != '0'
 
 
 def job_runner():
-    """Runner for scheduler: scrape and POST."""
+    """Runner for scheduler: scrape, then queue (or POST) the jobs; returns the job count."""
     print(f"Runner triggered at {datetime.now()}\n")
     scraper = BDJobsHotJobsScraper()
-    jobs = scraper.scrape_hot_jobs()
     # Optionally save locally
-    scraper.save_to_csv(jobs, filename='bdjobs_hot_jobs_latest.csv')
-    send_jobs_to_api(jobs)
+    csv_sink = CsvSink('bdjobs_hot_jobs_latest.csv')
+    sinks = [csv_sink]
+    api_sink = None
+    if use_outbox():
+        # The drainer thread delivers them; an API outage cannot block this run
+        sinks += [OutboxSink(Outbox(), HOT_JOBS_API_URL), BatchSink(scraper.commit_seen)]
+    else:
+        # POST as the cards are read; only delivered jobs are marked seen
+        api_sink = ApiBatchSink(ApiDelivery(HOT_JOBS_API_URL, timeout=30, metrics=scraper.metrics),
+                                on_delivered=scraper.commit_seen)
+        sinks.append(api_sink)
+    # Typed copy (parsed timestamps, canonical URLs; see records.py)
+    # Usage: HOT_JOBS_TYPED_OUTPUT=bdjobs_hot_jobs.parquet python bd_hot_job_selenium.py
+    typed_output = os.environ.get('HOT_JOBS_TYPED_OUTPUT')
+    if typed_output:
+        sinks.append(TypedSink(HotJob, typed_output))
+
+    with RecordPipeline(sinks) as sink:
+        scraper.scrape_hot_jobs(sink)
+    report_saved(csv_sink.filename, csv_sink.count)
+
+    if api_sink is None:
+        if csv_sink.count:
+            print(f"Queued {csv_sink.count} jobs for delivery to {HOT_JOBS_API_URL}")
+    elif api_sink.results:
+        report_delivery(api_sink.summary())
+    else:
+        print("No jobs to send")
+    scraper.metrics.close(jobs=csv_sink.count)
+    return csv_sink.count
 
 
 def schedule_every_5_minutes():
+    from apscheduler.schedulers.blocking import BlockingScheduler
+
+    # Launch the pooled browsers once; every tick then reuses them
+    get_pool(LeanProfile.from_env('HOT_JOBS_')).warm()
+    drainer = None
+    if use_outbox():
+        drainer = OutboxDrainer(Outbox())
+        drainer.start()
+        print(f"Outbox drainer started: delivering every {drainer.interval}s")
     sched = BlockingScheduler()
     # run immediately once, then every 60 minutes
     sched.add_job(job_runner, 'interval', minutes=60, next_run_time=datetime.now())
@@ -158,6 +454,9 @@ def schedule_every_5_minutes():
         sched.start()
     except (KeyboardInterrupt, SystemExit):
         print("Scheduler stopped")
+    finally:
+        if drainer is not None:
+            drainer.stop(timeout=5)
 
 
 if __name__ == "__main__":
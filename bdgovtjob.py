@@ -1,52 +1,210 @@
+import argparse
 import time
-import requests
 import json
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+from urllib.parse import urljoin
 
-class BDGovtJobScraper:
-    def __init__(self):
-        self.base_url = "https://bdgovtjob.net/category/government-jobs-circular/"
-        # Set up Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in headless mode
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        
-        # Initialize the Chrome WebDriver
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=chrome_options
+from browser import driver_rss_mb, get_pool
+from checkpoint import CrawlCheckpoint
+from dedup import DedupIndex
+from delivery import ApiDelivery
+from enrichment import DetailEnricher
+from outbox import Outbox, OutboxDrainer
+from http_cache import HttpPageCache
+from http_headers import DEFAULT_HEADERS
+from job_store import JobStore
+from lean_profile import LeanProfile, NetworkStats
+from metrics import (
+    DRIVER_STARTUP, EXTRACTION, PAGE_LOAD, READINESS_WAIT, SERIALIZATION, Metrics, instrument_driver
+)
+from records import GovtJob
+from seen_index import DETAIL_FIELDS, SeenIndex
+from selector_health import SelectorHealth, SiteStructureChanged
+from shards import ShardedCrawl
+from sinks import (
+    ApiBatchSink, BatchSink, CsvSink, JsonArraySink, OutboxSink, RecordPipeline, TypedSink, write_csv
+)
+from throttle import HostRateLimiter
+from waits import LatencyBudget, ReadinessWaiter
+
+def _has_class(name):
+    """XPath predicate equivalent to the CSS `.name` class selector"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Selectors of the article list and of every listing field, shared by every
+# fetch engine: (CSS, XPath) pairs, primary first, then the fallbacks for
+# other WordPress themes. Selenium uses the CSS, the HTTP engine the XPath
+# equivalent (lxml parses pages without the optional cssselect package).
+# Engines try them in order and report which one matched (by its CSS form);
+# selector_health.py scores the coverage of every field and promotes a
+# fallback that keeps matching where the primary no longer does
+FIELD_SELECTORS = {
+    'article': (
+        ("article.post", f"//article[{_has_class('post')}]"),
+        ("article.type-post", f"//article[{_has_class('type-post')}]"),
+        ("main article", "//main//article"),
+    ),
+    'job_title': (
+        ("h2.entry-title a", f".//h2[{_has_class('entry-title')}]//a"),
+        (".entry-title a", f".//*[{_has_class('entry-title')}]//a"),
+        ("header.entry-header a", f".//header[{_has_class('entry-header')}]//a"),
+    ),
+    'vacancies': (
+        (".job-vacancy .job-value", f".//*[{_has_class('job-vacancy')}]//*[{_has_class('job-value')}]"),
+        (".job-info-box.job-vacancy .job-value",
+         f".//*[{_has_class('job-info-box')} and {_has_class('job-vacancy')}]//*[{_has_class('job-value')}]"),
+    ),
+    'deadline': (
+        (".job-deadline .job-value", f".//*[{_has_class('job-deadline')}]//*[{_has_class('job-value')}]"),
+        (".job-info-box.job-deadline .job-value",
+         f".//*[{_has_class('job-info-box')} and {_has_class('job-deadline')}]//*[{_has_class('job-value')}]"),
+    ),
+    'posted_date': (
+        ("time.published", f".//time[{_has_class('published')}]"),
+        ("time.entry-date", f".//time[{_has_class('entry-date')}]"),
+        (".posted-on time", f".//*[{_has_class('posted-on')}]//time"),
+    ),
+}
+# Text fields read with extract_field (the title link also gives job_url)
+TEXT_FIELDS = ('vacancies', 'deadline', 'posted_date')
+
+# One-round-trip extraction for the Selenium engine: returns the listing fields
+# of every article and the selector that matched each of them,
+# mirroring SeleniumFetchEngine.extract_link_text fallbacks
+# (visible text, then innerText/textContent, then aria-label/title)
+EXTRACT_ARTICLES_JS = """
+const [articleSels, fieldSels, textFields] = arguments;
+function isVisible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function linkText(el) {
+    let t = isVisible(el) ? (el.innerText || '').trim() : '';
+    if (t) return t;
+    for (const prop of ['innerText', 'textContent']) {
+        t = (el[prop] || '').trim();
+        if (t) return t.split(/\\s+/).join(' ');
+    }
+    for (const attr of ['aria-label', 'title']) {
+        t = (el.getAttribute(attr) || '').trim();
+        if (t) return t;
+    }
+    return '';
+}
+function firstMatch(article, sels) {
+    for (let i = 0; i < sels.length; i++) {
+        const el = article.querySelector(sels[i]);
+        if (el) return [el, sels[i]];
+    }
+    return [null, null];
+}
+let articles = [], articleSel = null;
+for (let i = 0; i < articleSels.length && !articles.length; i++) {
+    articles = Array.from(document.querySelectorAll(articleSels[i]));
+    if (articles.length) articleSel = articleSels[i];
+}
+return {selector: articleSel, articles: articles.map(article => {
+    const [title, titleSel] = firstMatch(article, fieldSels.job_title);
+    const record = {
+        job_title: title ? (linkText(title) || 'N/A') : 'N/A',
+        job_url: title ? (title.href || '') : '',
+        selectors: {job_title: titleSel},
+    };
+    for (const field of textFields) {
+        const [el, sel] = firstMatch(article, fieldSels[field]);
+        record[field] = el ? (linkText(el) || 'N/A') : 'N/A';
+        record.selectors[field] = sel;
+    }
+    return record;
+})};
+"""
+
+# Columns of bdgovtjob_data.csv, fixed up front: records replayed from a
+# checkpoint written with other settings (e.g. ENRICH) must fit the header
+CSV_FIELDS = ('job_title', 'job_url', 'vacancies', 'deadline', 'posted_date', 'scraped_at')
+
+# Django API the jobs are delivered to
+# Usage: API_URL=https://.../bdgovjob/send-data/ python bdgovtjob.py
+API_URL = os.environ.get('API_URL', 'https://abdullah007ie.pythonanywhere.com/bdgovjob/send-data/')
+
+
+class FetchError(Exception):
+    """Raised by a fetch engine when a page cannot be loaded"""
+
+
+class SeleniumFetchEngine:
+    """Fetch engine that renders pages in headless Chrome (from the browser pool)"""
+
+    name = 'selenium'
+
+    def __init__(self, budget=None, batch_extract=True, pool=None, profile=None, network_stats=None,
+                 metrics=None, selectors=None):
+        # Extract all articles with one execute_script call instead of ~10
+        # WebDriver round trips per article
+        self.batch_extract = batch_extract
+        # Fallback selectors per field, in the order to try them (see FIELD_SELECTORS)
+        self.selectors = selectors or FIELD_SELECTORS
+        # Article selector that matched on the current page
+        self.article_selector = None
+
+        # Skip images, fonts, media and ad/tracker scripts (see lean_profile.py)
+        self.profile = profile or LeanProfile.from_env('GOVT_JOBS_')
+        self.network_stats = network_stats or NetworkStats()
+
+        # Borrow a warm Chrome session from the shared browser pool
+        self.metrics = metrics or Metrics('bdgovtjob', path='')
+        self.pool = pool or get_pool(self.profile)
+        self.start_browser(budget)
+
+    def start_browser(self, budget):
+        with self.metrics.timer(DRIVER_STARTUP):
+            self.driver = self.pool.acquire()
+        instrument_driver(self.driver, self.metrics)
+        self.profile.apply_session(self.driver)
+        self.waiter = ReadinessWaiter(self.driver, budget, network_stats=self.network_stats)
+
+    def spawn(self):
+        """New engine of the same kind for a concurrent worker (own browser)"""
+        return SeleniumFetchEngine(
+            budget=self.waiter.budget, batch_extract=self.batch_extract, pool=self.pool,
+            profile=self.profile, network_stats=self.network_stats, metrics=self.metrics,
+            selectors=self.selectors
         )
-        
-        self.all_jobs = []
-    
-    def get_page_url(self, page_num):
-        """Generate URL for a specific page number"""
-        if page_num == 1:
-            return self.base_url
-        else:
-            return f"{self.base_url}page/{page_num}/"
 
-    def wait_for_element(self, by, value, timeout=10):
-        """Wait for an element to be present on the page"""
+    def load(self, url):
+        """Navigate the browser to url"""
         try:
-            return WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
-        except TimeoutException:
-            print(f"Timeout waiting for element: {value}")
-            return None
+            self.driver.get(url)
+        except Exception as e:
+            raise FetchError(f"Selenium could not load {url}: {e}") from e
+
+    @property
+    def alive(self):
+        """False once Chrome or chromedriver has crashed"""
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def restart(self):
+        """Replace a crashed browser with a fresh one from the pool"""
+        self.close()
+        self.start_browser(self.waiter.budget)
+
+    @property
+    def page_source(self):
+        return self.driver.page_source
+
+    def wait_for_articles(self, page_num):
+        """Wait until the page is loaded and the article list has stopped growing"""
+        self.waiter.document_ready()
+        articles = ", ".join(css for css, _ in self.selectors['article'])
+        if not self.waiter.stable_count(articles, timeout=15):
+            print(f"⚠ Timeout waiting for articles on page {page_num}")
 
     def extract_link_text(self, el):
         """
@@ -76,75 +234,535 @@ class BDGovtJobScraper:
         # print(f"DEBUG innerHTML: {el.get_attribute('innerHTML')}")
         return ""
     
-    def extract_text_safe(self, element, selector, by=By.CSS_SELECTOR):
-        """Safely extract text from element using multiple methods"""
+    def match(self, element, field):
+        """(elements matched by the first of field's selectors that matches, that selector), or ([], None)"""
+        from selenium.webdriver.common.by import By
+
+        for css, _ in self.selectors[field]:
+            try:
+                found = element.find_elements(By.CSS_SELECTOR, css)
+            except Exception:
+                continue
+            if found:
+                return found, css
+        return [], None
+
+    def extract_field(self, element, field):
+        """(text of field in element or 'N/A', the selector that matched or None)"""
+        found, selector = self.match(element, field)
+        if not found:
+            return 'N/A', None
         try:
-            elem = element.find_element(by, selector)
-            return self.extract_link_text(elem) or 'N/A'
-        except NoSuchElementException:
-            return 'N/A'
-        except Exception as e:
-            return 'N/A'
+            return self.extract_link_text(found[0]) or 'N/A', selector
+        except Exception:
+            return 'N/A', selector
+
+    def find_articles(self):
+        """
+        Article handles for extract_article: WebElements, or in batch mode the
+        field dicts of every article, extracted in a single round trip
+        """
+        if self.batch_extract:
+            result = self.driver.execute_script(
+                EXTRACT_ARTICLES_JS,
+                [css for css, _ in self.selectors['article']],
+                {field: [css for css, _ in selectors] for field, selectors in self.selectors.items()},
+                list(TEXT_FIELDS),
+            ) or {}
+            self.article_selector = result.get('selector')
+            return result.get('articles') or []
+        articles, self.article_selector = self.match(self.driver, 'article')
+        return articles
+
+    def extract_article(self, article):
+        """Return the listing fields of one article element, with the selector each field matched"""
+        if isinstance(article, dict):
+            # Already extracted by EXTRACT_ARTICLES_JS
+            return article
 
-    def extract_attribute_safe(self, element, selector, attribute, by=By.CSS_SELECTOR):
-        """Safely extract attribute from element"""
+        # Extract job title and URL - using improved text extraction
+        titles, title_selector = self.match(article, 'job_title')
         try:
-            elem = element.find_element(by, selector)
-            return elem.get_attribute(attribute)
-        except NoSuchElementException:
-            return 'N/A'
+            job_url = titles[0].get_attribute('href') or ""
+            job_title = self.extract_link_text(titles[0]) or "N/A"
         except Exception as e:
-            return 'N/A'
+            job_url, job_title = "", "N/A"
+
+        fields = {'job_title': job_title, 'job_url': job_url, 'selectors': {'job_title': title_selector}}
+        for field in TEXT_FIELDS:
+            fields[field], fields['selectors'][field] = self.extract_field(article, field)
+        return fields
+
+    def close(self):
+        """Hand the browser back to the pool (it stays warm for the next run)"""
+        self.network_stats.collect(self.driver)
+        self.metrics.gauge('chrome_rss_mb', driver_rss_mb(self.driver))
+        self.pool.release(self.driver)
+
+
+class HttpFetchEngine:
+    """
+    Browserless fetch engine: downloads server-rendered pages with a pooled
+    requests.Session and parses them with lxml
+    """
+
+    name = 'http'
+    # No browser that could crash (see SeleniumFetchEngine.alive)
+    alive = True
+
+    def __init__(self, session=None, timeout=30, pool_size=16, cache=None, selectors=None):
+        # Only close the session if this engine created it
+        self.owns_session = session is None
+        if session is None:
+            # Imported by the engine, not with the module (see cli.py)
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+        self.session = session
+        self.timeout = timeout
+        # Optional HttpPageCache: conditional GETs, and no re-parsing of unchanged pages
+        self.cache = cache
+        self.url = ''
+        self.page_source = ''
+        self.tree = None
+        # Listing fields of the current page when they came from the cache
+        self.cached_articles = None
+        # Fallback selectors per field, in the order to try them (see FIELD_SELECTORS)
+        self.selectors = selectors or FIELD_SELECTORS
+        # Article selector that matched on the current page (None: unknown)
+        self.article_selector = None
+
+    def spawn(self):
+        """New engine for a concurrent worker, sharing this connection pool and cache"""
+        return HttpFetchEngine(session=self.session, timeout=self.timeout, cache=self.cache,
+                               selectors=self.selectors)
+
+    def load(self, url):
+        """Download url and parse it into an lxml tree (or reuse the cached parse)"""
+        import requests
+        from lxml import html as lxml_html
+
+        headers = self.cache.conditional_headers(url) if self.cache else None
+        self.cached_articles = None
+        self.article_selector = None
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise FetchError(f"HTTP request for {url} failed: {e}") from e
+
+        self.url = response.url
+        # WordPress answers 404 past the last page, which is simply an empty page
+        if response.status_code == 404:
+            self.page_source, self.tree = response.text, None
+            return
+        if self.cache:
+            cached = self.cache.lookup(url, response)
+            if cached is not None:
+                body, self.cached_articles = cached
+                self.page_source, self.tree = body.decode('utf-8', 'replace'), None
+                return
+        if response.status_code != 200:
+            raise FetchError(f"HTTP {response.status_code} for {url}")
+
+        self.page_source = response.text
+        self.tree = lxml_html.fromstring(response.content)
+        if self.cache:
+            # Parse now so the fields can be cached with the page
+            self.cached_articles = [self.extract_article(node) for node in self.find_articles()]
+            self.cache.store(url, response, self.cached_articles)
+
+    def wait_for_articles(self, page_num):
+        """Server-rendered HTML is complete once downloaded"""
+        return
+
+    @staticmethod
+    def extract_link_text(el):
+        """
+        Parser counterpart of SeleniumFetchEngine.extract_link_text:
+        normalized text content first, then aria-label / title attributes
+        """
+        t = " ".join(el.text_content().split())
+        if t:
+            return t
+
+        for attr in ("aria-label", "title"):
+            t = (el.get(attr) or "").strip()
+            if t:
+                return t
+
+        return ""
+
+    def match(self, element, field):
+        """(nodes matched by the first of field's selectors that matches, that selector), or ([], None)"""
+        for css, xpath in self.selectors[field]:
+            found = element.xpath(xpath)
+            if found:
+                return found, css
+        return [], None
+
+    def extract_field(self, element, field):
+        """(text of field in element or 'N/A', the selector that matched or None)"""
+        found, selector = self.match(element, field)
+        if not found:
+            return 'N/A', None
+        return self.extract_link_text(found[0]) or 'N/A', selector
+
+    def find_articles(self):
+        """Article nodes, or their field dicts when the page went through the cache"""
+        if self.cached_articles is not None:
+            return self.cached_articles
+        if self.tree is None:
+            return []
+        articles, self.article_selector = self.match(self.tree, 'article')
+        return articles
+
+    def extract_article(self, article):
+        """Return the listing fields of one article node, with the selector each field matched"""
+        if isinstance(article, dict):
+            # Parsed when the page was loaded, or on an earlier run
+            return dict(article)
+
+        titles, title_selector = self.match(article, 'job_title')
+        if titles:
+            href = titles[0].get('href')
+            # Selenium returns the resolved href property, so resolve relative links too
+            job_url = urljoin(self.url, href) if href else ""
+            job_title = self.extract_link_text(titles[0]) or "N/A"
+        else:
+            job_url, job_title = "", "N/A"
+
+        fields = {'job_title': job_title, 'job_url': job_url, 'selectors': {'job_title': title_selector}}
+        for field in TEXT_FIELDS:
+            fields[field], fields['selectors'][field] = self.extract_field(article, field)
+        return fields
+
+    def close(self):
+        if self.owns_session:
+            self.session.close()
+
+
+FETCH_ENGINES = {
+    SeleniumFetchEngine.name: SeleniumFetchEngine,
+    HttpFetchEngine.name: HttpFetchEngine,
+}
+
+
+class BDGovtJobScraper:
+    def __init__(self, engine=None, fallback_engine='selenium', incremental=None, use_http_cache=None, sink=None,
+                 metrics=None, enrich=None, dedup=None, job_store=None, checkpoint=None, selector_health=None):
+        self.base_url = "https://bdgovtjob.net/category/government-jobs-circular/"
+
+        # Pick the fetch engine: 'http' (requests + lxml) or 'selenium' (headless Chrome)
+        # Usage: FETCH_ENGINE=selenium python bdgovtjob.py
+        engine = engine or os.environ.get('FETCH_ENGINE', 'http')
+        if engine not in FETCH_ENGINES:
+            raise ValueError(f"Unknown fetch engine '{engine}', choose from {sorted(FETCH_ENGINES)}")
+        # Shared cap on the time this run may spend waiting for pages to render
+        self.budget = LatencyBudget()
+        # Requests/bytes seen (and blocked) by Selenium engines during this run
+        self.network_stats = NetworkStats()
+        # Per-phase timings, WebDriver call counts and memory (see metrics.py)
+        self.metrics = metrics or Metrics('bdgovtjob')
+        # Usage: BATCH_EXTRACT=0 python bdgovtjob.py (per-element WebDriver calls)
+        self.batch_extract = os.environ.get('BATCH_EXTRACT', '1') != '0'
+        # Conditional-GET page cache for the HTTP engine
+        # Usage: HTTP_CACHE=0 python bdgovtjob.py (always download and parse)
+        if use_http_cache is None:
+            use_http_cache = os.environ.get('HTTP_CACHE', '1') != '0'
+        self.http_cache = HttpPageCache() if use_http_cache else None
+        # Score field coverage per page, abort when the site's markup changed,
+        # and try the selectors that matched last time first (see selector_health.py)
+        # Usage: SELECTOR_HEALTH=0 python bdgovtjob.py to disable
+        if selector_health is None:
+            selector_health = os.environ.get('SELECTOR_HEALTH', '1') != '0'
+        self.selector_health = SelectorHealth('bdgovtjob', metrics=self.metrics) if selector_health else None
+        self.selectors = (self.selector_health.promote(FIELD_SELECTORS) if self.selector_health is not None
+                          else FIELD_SELECTORS)
+        # Set when selector health aborted the crawl
+        self.structure_error = None
+        self.engine = self.make_engine(engine)
+        self.fallback_engine = fallback_engine if fallback_engine != engine else None
+
+        # Delay between sequential page loads, to be polite to the server
+        self.page_delay = float(os.environ.get('PAGE_DELAY', 2))
+        # Politeness limit shared with other crawlers (e.g. the workers of a
+        # sharded crawl, see shards.py); None: page_delay / RATE_LIMIT only
+        self.rate_limiter = None
+        # Save page 1's HTML to debug_bdgovtjob_page.html
+        # Usage: DEBUG_HTML=0 python bdgovtjob.py
+        self.debug_html = os.environ.get('DEBUG_HTML', '1') != '0'
+
+        # Records go to sink (see sinks.py) page by page as they are scraped;
+        # without a sink they are collected in all_jobs
+        self.sink = sink
+        self.all_jobs = []
+        self.jobs_collected = 0
+
+        # Incremental mode: only keep new/changed jobs and stop at the first
+        # page whose jobs were all seen unchanged in an earlier run
+        # Usage: INCREMENTAL=1 python bdgovtjob.py
+        if incremental is None:
+            incremental = os.environ.get('INCREMENTAL') == '1'
+        self.seen_index = SeenIndex('bdgovtjob') if incremental else None
+        self.last_page_unchanged = False
+
+        # History of every job sighting with first/last seen (see job_store.py)
+        # Usage: JOB_STORE=0 python bdgovtjob.py to disable
+        if job_store is None:
+            job_store = os.environ.get('JOB_STORE', '1') != '0'
+        self.job_store = JobStore(run_id=self.metrics.run_id) if job_store else None
+
+        # Drop jobs already scraped under another URL or from another source
+        # Usage: DEDUP=0 python bdgovtjob.py to disable (see dedup.py)
+        if dedup is None:
+            dedup = os.environ.get('DEDUP', '1') != '0'
+        self.dedup = DedupIndex('bdgovtjob') if dedup else None
+
+        # Fetch each (new) job's detail page for organization, text and PDF circulars
+        # Usage: ENRICH=1 python bdgovtjob.py (see enrichment.py)
+        if enrich is None:
+            enrich = os.environ.get('ENRICH') == '1'
+        self.enricher = DetailEnricher(metrics=self.metrics) if enrich else None
+
+        # Persist the last completed page and its records after every page,
+        # so a crashed or killed run can continue with --resume (see checkpoint.py)
+        # Usage: CHECKPOINT=0 python bdgovtjob.py to disable
+        if checkpoint is None:
+            checkpoint = os.environ.get('CHECKPOINT', '1') != '0'
+        self.checkpoint = CrawlCheckpoint('bdgovtjob') if checkpoint else None
+        self.crawl_completed = False
+        self.last_page_scraped = 0
+
+        # Restart a crashed Chrome mid-crawl instead of aborting the run
+        # Usage: MAX_BROWSER_RESTARTS=3 python bdgovtjob.py
+        self.max_browser_restarts = int(os.environ.get('MAX_BROWSER_RESTARTS', 3))
+        self.browser_restarts = 0
+        self.restart_lock = threading.Lock()
+
+    def make_engine(self, name):
+        """Instantiate the fetch engine called name"""
+        if name == SeleniumFetchEngine.name:
+            return SeleniumFetchEngine(
+                budget=self.budget, batch_extract=self.batch_extract, network_stats=self.network_stats,
+                metrics=self.metrics, selectors=self.selectors
+            )
+        if name == HttpFetchEngine.name:
+            return HttpFetchEngine(cache=self.http_cache, selectors=self.selectors)
+        return FETCH_ENGINES[name]()
+
+    @property
+    def driver(self):
+        """WebDriver of the Selenium engine (None for browserless engines)"""
+        return getattr(self.engine, 'driver', None)
+
+    def switch_to_fallback_engine(self, reason):
+        """Replace the current engine with the fallback engine (once)"""
+        if not self.fallback_engine:
+            return False
+        print(f"⚠ {self.engine.name} engine failed ({reason}), falling back to {self.fallback_engine}")
+        self.engine.close()
+        self.engine = self.make_engine(self.fallback_engine)
+        self.fallback_engine = None
+        return True
+
+    def restart_crashed_engine(self, engine):
+        """Restart engine's browser if it has crashed (MAX_BROWSER_RESTARTS per run); True if restarted"""
+        if engine.alive:
+            return False
+        with self.restart_lock:
+            if self.browser_restarts >= self.max_browser_restarts:
+                return False
+            self.browser_restarts += 1
+            restarts = self.browser_restarts
+        print(f"♻ {engine.name} browser crashed, restarting it ({restarts}/{self.max_browser_restarts})")
+        engine.restart()
+        return True
+
+    def load_with_restart(self, engine, page_url):
+        """Load page_url with engine, restarting its browser once if it crashed"""
+        try:
+            engine.load(page_url)
+        except FetchError:
+            if not self.restart_crashed_engine(engine):
+                raise
+            engine.load(page_url)
+
+    def extract_with_restart(self, engine, page_num):
+        """extract_page_jobs(), reloading the page once if the browser crashed while it ran"""
+        jobs_found, jobs, extracted = self.extract_page_jobs(engine, page_num)
+        if not jobs_found and self.restart_crashed_engine(engine):
+            self.load_with_restart(engine, self.get_page_url(page_num))
+            jobs_found, jobs, extracted = self.extract_page_jobs(engine, page_num)
+        return jobs_found, jobs, extracted
+
+    def load_page(self, page_url):
+        """Load page_url with the current engine, falling back if it fails"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(page_url)
+        with self.metrics.timer(PAGE_LOAD, url=page_url):
+            try:
+                self.load_with_restart(self.engine, page_url)
+            except FetchError as e:
+                if not self.switch_to_fallback_engine(e):
+                    raise
+                self.engine.load(page_url)
+    
+    def get_page_url(self, page_num):
+        """Generate URL for a specific page number"""
+        if page_num == 1:
+            return self.base_url
+        else:
+            return f"{self.base_url}page/{page_num}/"
+
+    def wait_for_element(self, by, value, timeout=10):
+        """Wait for an element to be present on the page"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        try:
+            return WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located((by, value))
+            )
+        except TimeoutException:
+            print(f"Timeout waiting for element: {value}")
+            return None
 
     def scrape_page(self, page_num=1):
-        """Scrape a single page of job listings"""
+        """Scrape a single page of job listings; returns its article count, None if extraction failed"""
+        jobs_found, jobs, extracted = self.extract_with_restart(self.engine, page_num)
+        self.check_selectors(page_num, extracted)
+        self.record_sightings(jobs)
+        jobs, self.last_page_unchanged = self.keep_fresh_jobs(jobs)
+        self.emit_jobs(jobs, page_num)
+        return jobs_found
+
+    def emit_jobs(self, jobs, page_num=None):
+        """Pass one page's records on to the sink (or all_jobs) and checkpoint the page"""
+        if self.dedup is not None:
+            jobs = self.dedup.filter(jobs)
+        if self.enricher is not None:
+            jobs = self.enricher.enrich(jobs)
+        self.jobs_collected += len(jobs)
+        if self.sink is not None:
+            with self.metrics.timer(SERIALIZATION, records=len(jobs)):
+                self.sink.write_many(jobs)
+        else:
+            self.all_jobs.extend(jobs)
+        if self.checkpoint is not None and page_num is not None:
+            self.checkpoint.page_done(page_num, jobs)
+
+    def open_checkpoint(self, max_pages, resume=False, first_page=1):
+        """
+        Start checkpointing a crawl of pages first_page..max_pages or, with
+        resume, continue the unfinished crawl of the last run: its records are
+        replayed into the sink (the outbox and delivery ledger make re-sending
+        them harmless) through the same dedup and enrichment as crawled
+        pages, so a job they hold is not emitted again from a later page.
+        A checkpoint of another listing (base_url) is discarded, not resumed.
+        Returns (first page to crawl, max pages)
+        """
+        state = self.checkpoint.load() if resume else None
+        if state is not None and state.get('base_url') != self.base_url:
+            print(f"⚠ Unfinished crawl of {state.get('base_url')} is for another listing than {self.base_url}: "
+                  f"discarding it")
+            state = None
+            resume = False
+        if state is None:
+            if resume:
+                print(f"ℹ No unfinished crawl to resume, starting from page {first_page}")
+            self.checkpoint.start(base_url=self.base_url, max_pages=max_pages)
+            return first_page, max_pages
+
+        print(f"💾 Resuming crawl started {state['started']}: pages 1-{state['last_page']} done, "
+              f"{state['records']} records")
+        batch = []
+        for record in self.checkpoint.records():
+            batch.append(record)
+            if len(batch) >= 500:
+                # Already in the checkpoint: no page_num
+                self.emit_jobs(batch)
+                batch = []
+        if batch:
+            self.emit_jobs(batch)
+        if self.sink is not None:
+            self.sink.flush()
+        self.checkpoint.resume(state)
+        return state['last_page'] + 1, state['max_pages']
+
+    def check_selectors(self, page_num, extracted):
+        """
+        Score a page's extraction (see extract_page_jobs) for selector health;
+        pages must be scored in page order, raises SiteStructureChanged
+        """
+        if self.selector_health is not None:
+            page_fields, article_selector = extracted
+            self.selector_health.check_page(page_num, page_fields, article_selector)
+
+    def record_sightings(self, jobs):
+        """Record the jobs of a page that is part of the crawl's output in the job store"""
+        if self.job_store is not None:
+            self.job_store.record('bdgovtjob', jobs)
+
+    def keep_fresh_jobs(self, jobs):
+        """
+        In incremental mode drop jobs already seen unchanged.
+        Returns (jobs to keep, True if the page had jobs and all were unchanged)
+        """
+        if self.seen_index is None:
+            return jobs, False
+        fresh = self.seen_index.filter_fresh(jobs)
+        if jobs:
+            print(f"🔁 {len(fresh)} new/changed, {len(jobs) - len(fresh)} already seen")
+        return fresh, bool(jobs) and not fresh
+
+    def commit_seen(self, jobs=None):
+        """Record jobs (default: all_jobs) in the seen index (call after they were saved/sent)"""
+        jobs = self.all_jobs if jobs is None else jobs
+        if self.seen_index is not None and jobs:
+            self.seen_index.mark_seen(jobs)
+
+    def extract_page_jobs(self, engine, page_num):
+        """
+        Extract job records from the page currently loaded in engine.
+        Returns (number of articles found, list of job dicts, (field dicts,
+        article selector) for check_selectors). The number is None if
+        extraction failed (a timeout, a WebDriver or parser error), which is
+        not the same as a page without articles
+        """
         print(f"\n{'='*60}")
         print(f"📄 Scraping Page {page_num}")
         print(f"{'='*60}")
         
+        jobs = []
+        page_fields = []
         try:
-            # Wait longer for dynamic content to load
-            time.sleep(5)
-            
-            # Wait for articles to be present
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "article.post"))
-                )
-            except TimeoutException:
-                print(f"⚠ Timeout waiting for articles on page {page_num}")
+            with self.metrics.timer(READINESS_WAIT, page=page_num):
+                engine.wait_for_articles(page_num)
             
+            extraction_started = time.perf_counter()
             # Find all job article elements
-            articles = self.driver.find_elements(By.CSS_SELECTOR, "article.post")
+            articles = engine.find_articles()
             
             if not articles:
                 print(f"⚠ No articles found on page {page_num}")
-                return 0
+                return 0, jobs, (page_fields, engine.article_selector)
             
             print(f"Found {len(articles)} job articles on page {page_num}")
             
             for idx, article in enumerate(articles, 1):
                 try:
-                    # Extract job title and URL - using improved text extraction
-                    job_title = ''
-                    job_url = ''
-                    
-                    # Try multiple selectors
-                    try:
-                        title_elem = article.find_element(By.CSS_SELECTOR, "h2.entry-title a, .entry-title a, header.entry-header a")
-                        job_url = title_elem.get_attribute('href') or ""
-                        job_title = self.extract_link_text(title_elem) or "N/A"
-                    except Exception as e:
-                        job_url, job_title = "", "N/A"
-                    
-                    # Extract posted date - using improved extraction
-                    posted_date = self.extract_text_safe(article, "time.published, time.entry-date, .posted-on time")
-                    
-                    # Extract vacancies - using improved extraction
-                    vacancies = self.extract_text_safe(article, ".job-vacancy .job-value, .job-info-box.job-vacancy .job-value")
-                    
-                    # Extract deadline - using improved extraction
-                    deadline = self.extract_text_safe(article, ".job-deadline .job-value, .job-info-box.job-deadline .job-value")
+                    fields = engine.extract_article(article)
+                    page_fields.append(fields)
+                    job_title = fields['job_title']
+                    job_url = fields['job_url']
+                    vacancies = fields['vacancies']
+                    deadline = fields['deadline']
                     
                     # Skip if no title or URL (critical fields)
                     if not job_title or not job_url:
@@ -157,26 +775,31 @@ class BDGovtJobScraper:
                         'job_url': job_url,
                         'vacancies': vacancies,
                         'deadline': deadline,
-                        'posted_date': posted_date,
+                        'posted_date': fields['posted_date'],
                         'scraped_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                     }
                     
-                    self.all_jobs.append(job_data)
+                    jobs.append(job_data)
                     print(f"  ✓ [{idx}/{len(articles)}] {job_title[:60]}... | V:{vacancies} | D:{deadline[:15]}...")
                     
                 except Exception as e:
                     print(f"  ✗ Error processing article {idx}: {e}")
                     continue
             
+            self.metrics.observe(EXTRACTION, time.perf_counter() - extraction_started, page=page_num)
             print(f"✅ Page {page_num} complete: {len(articles)} jobs extracted")
-            return len(articles)
-            
+            return len(articles), jobs, (page_fields, engine.article_selector)
+
         except Exception as e:
             print(f"❌ Error scraping page {page_num}: {e}")
-            return 0
+            # Not scored: a failed extraction says nothing about the selectors
+            return None, jobs, ([], engine.article_selector)
 
     def find_and_click_next_page(self):
         """Find and click the next page button"""
+        from selenium.common.exceptions import NoSuchElementException
+        from selenium.webdriver.common.by import By
+
         try:
             # Common pagination selectors
             next_selectors = [
@@ -191,14 +814,15 @@ class BDGovtJobScraper:
                 try:
                     next_button = self.driver.find_element(By.CSS_SELECTOR, selector)
                     if next_button:
-                        # Scroll to button
+                        # Scroll to button (scrollIntoView is synchronous, no need to wait)
                         self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-                        time.sleep(1)
                         
                         # Click it
                         next_button.click()
                         print("  ➡ Clicked next page button")
-                        time.sleep(3)  # Wait for page to load
+                        # Wait for the old page to go away and the new one to load
+                        self.engine.waiter.staleness_of(next_button)
+                        self.engine.waiter.document_ready()
                         return True
                 except NoSuchElementException:
                     continue
@@ -210,61 +834,216 @@ class BDGovtJobScraper:
             print(f"  ⚠ Error finding next page: {e}")
             return False
 
-    def scrape_all_pages(self, max_pages=10):
-        """Scrape multiple pages by directly navigating to each page URL"""
+    @staticmethod
+    def is_last_page(page_num, jobs_found):
+        """Termination rule of the crawl: an empty page from page 3 onwards"""
+        return jobs_found == 0 and page_num >= 3
+
+    def load_and_scrape_page(self, page_num):
+        """
+        Load one page with the main engine and scrape it into all_jobs;
+        returns its article count, None if extraction failed
+        """
+        # Generate URL for this page
+        page_url = self.get_page_url(page_num)
+        
+        # Load the page
+        print(f"\n📡 Loading page {page_num}: {page_url}...")
+        self.load_page(page_url)
+        print(f"✅ Page {page_num} loaded!")
+        
+        # Save debug HTML for first page only
+        if page_num == 1 and self.debug_html:
+            try:
+                if self.engine.name == 'selenium':
+                    self.engine.waiter.document_ready()
+                page_source = self.engine.page_source
+                with open('debug_bdgovtjob_page.html', 'w', encoding='utf-8') as f:
+                    f.write(page_source)
+                print("📝 DEBUG: Saved page 1 HTML to 'debug_bdgovtjob_page.html'")
+            except Exception as e:
+                print(f"⚠ Could not save debug HTML: {e}")
+        
+        # Scrape current page
+        jobs_found = self.scrape_page(page_num)
+
+        # An empty first page from the HTTP engine usually means a bot
+        # challenge or a JS-only theme change: retry it in the browser
+        if jobs_found == 0 and page_num == 1 and self.switch_to_fallback_engine("no articles on page 1"):
+            self.load_page(page_url)
+            jobs_found = self.scrape_page(page_num)
+
+        # Rather than crawl on through empty pages until MAX_PAGES. Only when
+        # extraction worked and found nothing: a failed one is not a markup change
+        if jobs_found == 0 and page_num == 1 and self.selector_health is not None:
+            self.selector_health.no_articles(page_num, self.selectors['article'])
+
+        return jobs_found
+
+    def crawl_sequential(self, max_pages, start_page=1):
+        """Visit pages start_page..max_pages one after another; returns the last page scraped"""
+        page_num = start_page - 1
+        # Loop through each page number and navigate directly
+        for page_num in range(start_page, max_pages + 1):
+            jobs_found = self.load_and_scrape_page(page_num)
+
+            if self.last_page_unchanged:
+                print(f"\n🛑 Page {page_num} has no new or changed jobs, stopping incremental crawl.")
+                break
+            
+            if jobs_found == 0:
+                print(f"\n⚠ No jobs found on page {page_num}. This might be the last page.")
+                # Continue to next page instead of breaking
+                # Some pages might be empty but later pages might have data
+                if self.is_last_page(page_num, jobs_found):
+                    print(f"⚠ Stopping as page appears empty.")
+                    break
+            
+            # Small delay between pages to be polite to the server
+            if page_num < max_pages:
+                time.sleep(self.page_delay)
+
+        return page_num
+
+    def crawl_concurrent(self, max_pages, concurrency, rate_limit, start_page=1):
+        """
+        Fetch pages start_page+1..max_pages on a bounded thread pool, each
+        worker with its own engine, and emit the records in page order as soon
+        as every page before them is done.
+        start_page is scraped first on the main engine so the fallback check applies.
+        Returns the last page scraped.
+        """
+        if start_page > max_pages:
+            return start_page - 1
+        jobs_found = self.load_and_scrape_page(start_page)
+        if max_pages == start_page or self.last_page_unchanged:
+            return start_page
+
+        limiter = self.rate_limiter or HostRateLimiter(rate_limit)
+        local = threading.local()
+        worker_engines = []
+        engines_lock = threading.Lock()
+
+        def crawl_page(page_num):
+            engine = getattr(local, 'engine', None)
+            if engine is None:
+                engine = local.engine = self.engine.spawn()
+                with engines_lock:
+                    worker_engines.append(engine)
+            page_url = self.get_page_url(page_num)
+            limiter.wait(page_url)
+            print(f"\n📡 Loading page {page_num}: {page_url}...")
+            with self.metrics.timer(PAGE_LOAD, url=page_url):
+                self.load_with_restart(engine, page_url)
+            return self.extract_with_restart(engine, page_num)
+
+        results = {}
+        stop_at = None
+        next_page = start_page + 1
+        last_page = start_page
+
+        def emit_completed():
+            # Score, record and emit every contiguous page completed so far, in
+            # page order (pages fetched beyond the last page are discarded
+            # before anything is recorded about them)
+            nonlocal last_page
+            while last_page + 1 in results and (stop_at is None or last_page + 1 <= stop_at):
+                page_num = last_page + 1
+                jobs, fresh, extracted = results.pop(page_num)
+                self.check_selectors(page_num, extracted)
+                last_page = page_num
+                self.record_sightings(jobs)
+                self.emit_jobs(fresh, page_num)
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                pending = {}
+                while True:
+                    # Keep the pool full, but never schedule past a detected last page
+                    while len(pending) < concurrency and next_page <= max_pages and stop_at is None:
+                        pending[pool.submit(crawl_page, next_page)] = next_page
+                        next_page += 1
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        page_num = pending.pop(future)
+                        jobs_found, jobs, extracted = future.result()
+                        fresh, unchanged = self.keep_fresh_jobs(jobs)
+                        results[page_num] = (jobs, fresh, extracted)
+                        if self.is_last_page(page_num, jobs_found) or unchanged:
+                            reason = "has no new or changed jobs" if unchanged else "appears empty"
+                            print(f"\n⚠ Page {page_num} {reason}. Stopping.")
+                            stop_at = page_num if stop_at is None else min(stop_at, page_num)
+                    emit_completed()
+        except SiteStructureChanged:
+            # Nothing after the page that aborted the crawl is emitted
+            results.clear()
+            raise
+        finally:
+            emit_completed()
+            for engine in worker_engines:
+                engine.close()
+
+        return last_page
+
+    def scrape_all_pages(self, max_pages=10, concurrency=None, rate_limit=None, resume=False, first_page=1):
+        """
+        Scrape pages first_page..max_pages by directly navigating to each page URL.
+        With concurrency > 1 pages are fetched in parallel by a bounded worker
+        pool limited to rate_limit requests/second per host.
+        With resume the unfinished crawl of an earlier run is continued from
+        its checkpoint.
+        """
+        # Usage: CONCURRENCY=4 RATE_LIMIT=2 python bdgovtjob.py
+        if concurrency is None:
+            concurrency = int(os.environ.get('CONCURRENCY', 1))
+        if rate_limit is None:
+            rate_limit = float(os.environ.get('RATE_LIMIT', 2))
+        start_page = first_page
+        if self.checkpoint is not None:
+            start_page, max_pages = self.open_checkpoint(max_pages, resume, first_page)
+
         print("\n" + "="*60)
         print("🚀 BD GOVT JOB SCRAPER - STARTING")
         print("="*60)
         print(f"Target: {self.base_url}")
         print(f"Max pages: {max_pages}")
-        print(f"Method: Direct URL navigation")
+        if start_page > 1:
+            print(f"Starting at page {start_page}")
+        print(f"Method: Direct URL navigation ({self.engine.name} engine)")
+        if concurrency > 1:
+            print(f"Concurrency: {concurrency} workers, {rate_limit} req/s per host")
         print("="*60)
         
         try:
-            # Loop through each page number and navigate directly
-            for page_num in range(1, max_pages + 1):
-                # Generate URL for this page
-                page_url = self.get_page_url(page_num)
-                
-                # Load the page
-                print(f"\n📡 Loading page {page_num}: {page_url}...")
-                self.driver.get(page_url)
-                print(f"✅ Page {page_num} loaded!")
-                
-                # Save debug HTML for first page only
-                if page_num == 1:
-                    try:
-                        time.sleep(3)
-                        page_source = self.driver.page_source
-                        with open('debug_bdgovtjob_page.html', 'w', encoding='utf-8') as f:
-                            f.write(page_source)
-                        print("📝 DEBUG: Saved page 1 HTML to 'debug_bdgovtjob_page.html'")
-                    except Exception as e:
-                        print(f"⚠ Could not save debug HTML: {e}")
-                
-                # Scrape current page
-                jobs_found = self.scrape_page(page_num)
-                
-                if jobs_found == 0:
-                    print(f"\n⚠ No jobs found on page {page_num}. This might be the last page.")
-                    # Continue to next page instead of breaking
-                    # Some pages might be empty but later pages might have data
-                    if page_num >= 3:  # If we hit 3 empty pages in a row, stop
-                        print(f"⚠ Stopping as page appears empty.")
-                        break
-                
-                # Small delay between pages to be polite to the server
-                if page_num < max_pages:
-                    time.sleep(2)
+            if concurrency > 1:
+                page_num = self.crawl_concurrent(max_pages, concurrency, rate_limit, start_page)
+            else:
+                page_num = self.crawl_sequential(max_pages, start_page)
+            self.crawl_completed = True
+            self.last_page_scraped = page_num
             
             print("\n" + "="*60)
             print(f"✅ SCRAPING COMPLETE!")
             print(f"Total pages scraped: {page_num}")
-            print(f"Total jobs collected: {len(self.all_jobs)}")
+            print(f"Total jobs collected: {self.jobs_collected}")
             print("="*60)
+            self.budget.print_summary()
+            if self.dedup is not None:
+                self.dedup.print_summary()
+            if self.enricher is not None:
+                self.enricher.print_summary()
+            self.metrics.print_summary()
             
             return self.all_jobs
-            
+
+        except SiteStructureChanged as e:
+            self.structure_error = str(e)
+            print(f"\n🚨 SITE STRUCTURE CHANGED, crawl aborted: {e}")
+            return self.all_jobs
+
         except Exception as e:
             print(f"\n❌ Error during scraping: {e}")
             import traceback
@@ -272,14 +1051,31 @@ class BDGovtJobScraper:
             return self.all_jobs
         
         finally:
-            self.driver.quit()
-            print("\n🔒 Browser closed")
+            self.engine.close()
+            print(f"\n🔒 {self.engine.name} engine closed")
+            self.network_stats.print_report()
+            if self.enricher is not None:
+                self.enricher.close()
+            if self.dedup is not None:
+                self.dedup.close()
+            if self.job_store is not None:
+                self.job_store.close()
+            if self.selector_health is not None:
+                self.selector_health.print_summary()
+                self.selector_health.close()
+            if self.checkpoint is not None:
+                if self.crawl_completed:
+                    self.checkpoint.finish()
+                else:
+                    self.checkpoint.close()
+                    state = self.checkpoint.state or {}
+                    print(f"💾 Checkpoint kept after page {state.get('last_page', 0)}: "
+                          f"continue with `python bdgovtjob.py --resume`")
 
     def save_to_csv(self, filename='bdgovtjob_data.csv'):
         """Save scraped data to CSV"""
         if self.all_jobs:
-            df = pd.DataFrame(self.all_jobs)
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
+            write_csv(self.all_jobs, filename)
             print(f"\n✅ CSV saved: {os.path.abspath(filename)}")
             print(f"   Rows: {len(self.all_jobs)}")
             return True
@@ -312,68 +1108,148 @@ class BDGovtJobScraper:
         print('='*60)
         
         try:
-            response = requests.post(
-                api_url,
-                json=self.all_jobs,
-                headers={'Content-Type': 'application/json'},
-                timeout=60
-            )
-            
-            if response.status_code in [200, 201]:
-                result = response.json()
-                print(f"\n✅ API Response Success!")
-                print(f"   Created: {result.get('total_created', 0)} jobs")
-                print(f"   Updated: {result.get('total_updated', 0)} jobs")
-                print(f"   Errors: {result.get('total_errors', 0)}")
-                
-                if result.get('errors'):
-                    print(f"\n⚠ Some errors occurred:")
-                    for error in result['errors'][:3]:  # Show first 3 errors
-                        print(f"   - {error}")
-                
-                return True
-            else:
-                print(f"\n❌ API Error: HTTP {response.status_code}")
-                print(f"   Response: {response.text[:200]}")
-                return False
-                
-        except requests.exceptions.Timeout:
-            print("\n❌ API request timed out (>60s)")
-            print("   The server might be slow or unresponsive")
-            return False
-        except requests.exceptions.ConnectionError:
-            print("\n❌ Cannot connect to API")
-            print("   Make sure the Django server is running:")
-            print("   cd bdjob_api_restframework/django-n8n-api")
-            print("   python manage.py runserver")
-            return False
+            result = ApiDelivery(api_url, timeout=60, metrics=self.metrics).deliver(self.all_jobs)
         except Exception as e:
             print(f"\n❌ Failed to send to API: {e}")
             return False
 
+        return self.report_delivery(result)
+
+    @staticmethod
+    def report_delivery(result):
+        """Print an ApiDelivery result; True if every batch was delivered"""
+        print(f"   Sent: {result['sent']} jobs in {result['batches']} batches "
+              f"({result['skipped']} unchanged since last delivery)")
+        if result['failed_batches']:
+            print(f"\n❌ {result['failed_batches']} of {result['batches']} batches failed:")
+            for failure in result['failures'][:3]:
+                print(f"   - {failure}")
+            if any(f.startswith('cannot connect') for f in result['failures']):
+                print("   Make sure the Django server is running:")
+                print("   cd bdjob_api_restframework/django-n8n-api")
+                print("   python manage.py runserver")
+            return False
+
+        print(f"\n✅ API Response Success!")
+        print(f"   Created: {result['total_created']} jobs")
+        print(f"   Updated: {result['total_updated']} jobs")
+        print(f"   Errors: {result['total_errors']}")
+        
+        if result['errors']:
+            print(f"\n⚠ Some errors occurred:")
+            for error in result['errors'][:3]:  # Show first 3 errors
+                print(f"   - {error}")
+        
+        return True
+
+class JobStats:
+    """Sink that tallies the summary statistics while records stream past"""
+
+    def __init__(self):
+        self.total = 0
+        self.with_vacancies = 0
+        self.total_vacancies = 0
+        self.with_deadline = 0
+
+    def write(self, record):
+        job = GovtJob.from_dict(record)
+        self.total += 1
+        if job.vacancies is not None:
+            self.with_vacancies += 1
+            self.total_vacancies += job.vacancies
+        if job.deadline is not None:
+            self.with_deadline += 1
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
 
-def main():
-    """Main function to run the scraper"""
+
+def main(resume=None):
+    """
+    Main function to run the scraper; returns the number of jobs saved.
+    With resume the crawl a crashed run left unfinished is continued
+    """
     print("\n" + "🔷"*30)
     print("  BD GOVT JOB SCRAPER")
     print("  https://bdgovtjob.net")
     print("🔷"*30 + "\n")
     
+    # Several categories are crawled by a pool of worker processes (see shards.py);
+    # this process then only merges their records into the outputs
+    # Usage: CATEGORIES=government-jobs-circular,bank-jobs,ngo-jobs python bdgovtjob.py
+    categories = [c for c in os.environ.get('CATEGORIES', '').split(',') if c.strip()]
+    # Usage: python bdgovtjob.py --resume (or RESUME=1, e.g. for runner.py)
+    if resume is None:
+        resume = os.environ.get('RESUME') == '1'
+    if resume and categories:
+        # Shard workers do not checkpoint; refuse rather than silently recrawl
+        # from page 1 (and before the outputs are truncated)
+        sys.exit("🚨 --resume/RESUME=1 is not supported with CATEGORIES: "
+                 "unset CATEGORIES to resume the single-category crawl, or RESUME to recrawl the categories")
+
     # Initialize scraper
-    scraper = BDGovtJobScraper()
+    if categories:
+        scraper = BDGovtJobScraper(engine='http', fallback_engine=None, use_http_cache=False, enrich=False,
+                                   dedup=False, job_store=False, checkpoint=False, selector_health=False)
+    else:
+        scraper = BDGovtJobScraper()
+
+    # Send to API (if API_URL is set)
+    api_url = API_URL
+
+    # Records are written, queued and counted page by page as they are
+    # scraped, so memory stays flat and a crash keeps the pages done so far
+    mark_seen = scraper.commit_seen if scraper.seen_index is not None else None
+    stats = JobStats()
+    # Shard workers enrich when ENRICH=1, though this process's scraper does not
+    enriched = scraper.enricher is not None or (categories and os.environ.get('ENRICH') == '1')
+    csv_fields = CSV_FIELDS + (DETAIL_FIELDS if enriched else ())
+    sinks = [CsvSink('bdgovtjob_data.csv', fieldnames=csv_fields), JsonArraySink('bdgovtjob_data.json'), stats]
+    # Typed copy (parsed dates, integer vacancies, canonical URLs; see records.py)
+    # Usage: TYPED_OUTPUT=bdgovtjob_typed.parquet python bdgovtjob.py (.jsonl/.csv/.parquet)
+    typed_output = os.environ.get('TYPED_OUTPUT')
+    if typed_output:
+        sinks.append(TypedSink(GovtJob, typed_output))
+    outbox = api_sink = None
+    if os.environ.get('OUTBOX', '1') != '0':
+        # Queue durably while crawling; one delivery attempt follows the crawl and
+        # whatever fails stays queued for the next run or for `python outbox.py`
+        outbox = Outbox()
+        sinks.append(OutboxSink(outbox, api_url))
+        if mark_seen:
+            sinks.append(BatchSink(mark_seen))
+    else:
+        # POST batch by batch; only remember jobs once they reached the API,
+        # so failed runs are retried
+        api_sink = ApiBatchSink(ApiDelivery(api_url, timeout=60, metrics=scraper.metrics), on_delivered=mark_seen)
+        sinks.append(api_sink)
+    scraper.sink = RecordPipeline(sinks)
     
     # Scrape all pages (default: max 20 pages)
     # Change max_pages value to scrape more/less pages
     # Usage: MAX_PAGES=20 python bdgovtjob.py
     max_pages = int(os.environ.get('MAX_PAGES', 20))
-    jobs = scraper.scrape_all_pages(max_pages=max_pages)
+    try:
+        if categories:
+            crawl = ShardedCrawl(categories, max_pages)
+            crawl.run(scraper.sink)
+            crawl.print_summary()
+        else:
+            scraper.scrape_all_pages(max_pages=max_pages, resume=resume)
+    finally:
+        scraper.sink.close()
+        if categories:
+            scraper.engine.close()
     
-    if jobs:
-        # Save to CSV
-        scraper.save_to_csv(filename='bdgovtjob_data.csv')
-        
-        # Save to JSON
-        scraper.save_to_json(filename='bdgovtjob_data.json')
+    if stats.total:
+        print(f"\n✅ CSV saved: {os.path.abspath('bdgovtjob_data.csv')}")
+        print(f"✅ JSON saved: {os.path.abspath('bdgovtjob_data.json')}")
+        if typed_output:
+            print(f"✅ Typed records saved: {os.path.abspath(typed_output)}")
+        print(f"   Records: {stats.total}")
         
         print("\n" + "="*60)
         print("🎉 SUCCESS! Data saved to:")
@@ -381,39 +1257,56 @@ def main():
         print("   📄 bdgovtjob_data.json")
         print("="*60)
         
-        # Send to API (if API_URL is set)
-        api_url = os.environ.get('API_URL', 'https://abdullah007ie.pythonanywhere.com/bdgovjob/send-data/')
-        scraper.send_jobs_to_api(api_url)
+        if outbox is not None:
+            print(f"\n📬 Queued {stats.total} jobs for {api_url}")
+            # runner.py sets OUTBOX_INLINE_DRAIN=0: its own drainer delivers them,
+            # so this run does not wait for the API
+            if os.environ.get('OUTBOX_INLINE_DRAIN', '1') != '0':
+                OutboxDrainer(outbox, metrics=scraper.metrics).drain_once()
+            else:
+                print("   (delivered by the outbox drainer)")
+        else:
+            print(f"\n{'='*60}")
+            print("📡 Sent data to API...")
+            print(f"   API URL: {api_url}")
+            print('='*60)
+            scraper.report_delivery(api_sink.summary())
+        if scraper.seen_index is not None:
+            print(f"🔁 Seen index updated: {len(scraper.seen_index)} known jobs")
         
         # Print summary statistics
         print("\n📊 SUMMARY:")
-        print(f"   Total jobs: {len(jobs)}")
-        
-        # Count jobs with vacancies
-        with_vacancies = sum(1 for job in jobs if job.get('vacancies') != 'N/A')
-        total_vacancies = 0
-        for job in jobs:
-            vac = job.get('vacancies', '0')
-            try:
-                total_vacancies += int(vac) if vac != 'N/A' else 0
-            except:
-                pass
-        
-        print(f"   Jobs with vacancy info: {with_vacancies}")
-        print(f"   Total vacancies: {total_vacancies}")
+        print(f"   Total jobs: {stats.total}")
+        print(f"   Jobs with vacancy info: {stats.with_vacancies}")
+        print(f"   Total vacancies: {stats.total_vacancies}")
         
         # Show deadline distribution
-        with_deadline = sum(1 for job in jobs if job.get('deadline') != 'N/A')
-        print(f"   Jobs with deadline: {with_deadline}")
+        print(f"   Jobs with deadline: {stats.with_deadline}")
         
+    elif scraper.seen_index is not None:
+        print("\n✅ No new or changed jobs since the last run.")
     else:
         print("\n❌ No jobs were scraped. Please check the website and try again.")
     
+    if scraper.http_cache is not None:
+        print()
+        scraper.http_cache.print_summary()
+    
+    scraper.metrics.close(jobs=stats.total)
+    structure_error = crawl.structure_error if categories else scraper.structure_error
+    if structure_error:
+        # Exit non-zero, so cron and runner.py report the run as failed
+        sys.exit(f"\n🚨 bdgovtjob.net markup changed, crawl aborted: {structure_error}\n"
+                 f"   Update FIELD_SELECTORS in bdgovtjob.py (see selector_health.py)")
     print("\n✅ Scraper finished!\n")
+    return stats.total
 
 
 if __name__ == "__main__":
     # Check if running with custom max pages
     # Usage: MAX_PAGES=5 python bdgovtjob.py
-    main()
+    parser = argparse.ArgumentParser(description="Scrape bdgovtjob.net government job circulars")
+    parser.add_argument('--resume', action='store_true', default=None,
+                        help='continue the crawl a crashed or killed run left unfinished')
+    main(resume=parser.parse_args().resume)
 
@@ -0,0 +1,299 @@
+"""
+Offline benchmark of the scrapers against a local stand-in of the sites.
+
+Serves synthetic pages (or pages recorded from the live sites, see --record)
+from fixture_server.py and runs each scraper mode against them, every mode in
+a fresh worker process so its peak memory is its own. Reports wall time,
+pages/s, records/s, peak Python and Chrome memory and WebDriver round trips;
+with --baseline it fails when a mode got slower or chattier than a saved run.
+
+Modes:
+    http               BDGovtJobScraper, requests + lxml engine
+    selenium           BDGovtJobScraper, Chrome with one-call batch extraction
+    selenium-elements  BDGovtJobScraper, Chrome with per-element WebDriver calls
+    hot-jobs           BDJobsHotJobsScraper, batch extraction
+    hot-jobs-elements  BDJobsHotJobsScraper, per-element WebDriver calls
+    hot-jobs-payload   BDJobsHotJobsScraper, cards' JSON payload over HTTP (no browser)
+
+With --startup the entry points' imports are timed instead, each in a fresh
+interpreter with `python -X importtime`; it fails when one of them imports a
+heavy dependency (Selenium, requests, lxml, APScheduler, ...) it does not
+need yet, or takes longer than --startup-budget-ms.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --pages 20 --latency 0.5 --concurrency 1,2,4,8
+    python benchmark.py --modes http,selenium,hot-jobs --empty-pages 7
+    python benchmark.py --record --fixtures fixtures        # record live pages once
+    python benchmark.py --fixtures fixtures --pages 30      # replay them (cycled to 30 pages)
+    python benchmark.py --save-baseline bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.2
+    python benchmark.py --startup --startup-budget-ms 300
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin
+
+from fixture_server import HOT_JOBS_PAYLOAD_PATH, FixtureSite, RecordedSite, record_fixtures, serve
+from metrics import PAGE_LOAD, Metrics, peak_rss_mb
+
+GOVT_MODES = ('http', 'selenium', 'selenium-elements')
+HOT_JOBS_MODES = ('hot-jobs', 'hot-jobs-elements', 'hot-jobs-payload')
+# Modes of each source registered in runner.py
+SOURCE_MODES = {'govt_jobs': GOVT_MODES, 'hot_jobs': HOT_JOBS_MODES}
+
+# Dependencies only the engine or command that uses them may import
+BROWSER_MODULES = ('selenium', 'webdriver_manager')
+HEAVY_MODULES = BROWSER_MODULES + ('requests', 'lxml', 'apscheduler', 'pandas', 'pyarrow')
+# Entry points timed by --startup: (name, code run in a fresh interpreter, modules it must not import)
+STARTUP_CASES = (
+    ('cli', "import cli", HEAVY_MODULES),
+    ('scrape --dry-run', "import cli; cli.main(['scrape', 'govt_jobs', '--dry-run'])", HEAVY_MODULES),
+    ('runner', "import runner", HEAVY_MODULES),
+    ('deliver', "import outbox", HEAVY_MODULES),
+    ('govt_jobs', "import bdgovtjob", HEAVY_MODULES),
+    ('govt_jobs http engine', "import bdgovtjob; bdgovtjob.HttpFetchEngine().close()",
+     BROWSER_MODULES + ('apscheduler', 'pandas', 'pyarrow')),
+    ('hot_jobs', "import bd_hot_job_selenium", HEAVY_MODULES),
+)
+IMPORT_TIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)')
+
+
+def run_crawl(base_url, max_pages, concurrency, rate_limit, page_delay, engine='http', metrics=None):
+    """Crawl the fixture site once; returns (seconds, jobs)"""
+    from bdgovtjob import BDGovtJobScraper
+
+    # No page cache: every run must actually fetch and parse the pages
+    scraper = BDGovtJobScraper(engine=engine, fallback_engine=None, incremental=False, use_http_cache=False,
+                               metrics=metrics or Metrics('benchmark', path=''), dedup=False,
+                               job_store=False, checkpoint=False, selector_health=False)
+    scraper.base_url = base_url
+    scraper.page_delay = page_delay
+    scraper.debug_html = False
+
+    start = time.perf_counter()
+    # The scraper is chatty; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        jobs = scraper.scrape_all_pages(max_pages=max_pages, concurrency=concurrency, rate_limit=rate_limit)
+    return time.perf_counter() - start, jobs
+
+
+def run_hot_jobs(home_url, batch_extract, metrics, payload_url=None):
+    """Scrape the fixture home page (or its cards' payload) once; returns (seconds, jobs)"""
+    from bd_hot_job_selenium import BDJobsHotJobsScraper
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        # The DOM modes keep measuring the DOM, not the payload capture
+        scraper = BDJobsHotJobsScraper(batch_extract=batch_extract, incremental=False, metrics=metrics,
+                                       dedup=False, job_store=False, fast_path=payload_url is not None)
+        scraper.base_url = home_url
+        scraper.payload_url = payload_url
+        jobs = scraper.scrape_hot_jobs()
+    return time.perf_counter() - start, jobs
+
+
+def run_mode(mode, category_url, max_pages, concurrency, rate_limit, page_delay):
+    """Worker process: run one mode against the fixture site and measure it"""
+    os.environ['BATCH_EXTRACT'] = '0' if mode.endswith('-elements') else '1'
+    metrics = Metrics('benchmark', path='')
+    try:
+        if mode in HOT_JOBS_MODES:
+            payload_url = urljoin(category_url, HOT_JOBS_PAYLOAD_PATH) if mode == 'hot-jobs-payload' else None
+            elapsed, jobs = run_hot_jobs(urljoin(category_url, '/'), mode != 'hot-jobs-elements', metrics,
+                                         payload_url)
+            pages = 1
+        else:
+            engine = 'http' if mode == 'http' else 'selenium'
+            elapsed, jobs = run_crawl(category_url, max_pages, concurrency, rate_limit, page_delay,
+                                      engine=engine, metrics=metrics)
+            pages = metrics.phases.get(PAGE_LOAD, [0])[0]
+    finally:
+        if mode != 'http':
+            from browser import close_pools
+            close_pools()
+
+    webdriver_calls = sum(value for (name, _), value in metrics.counters.items() if name == 'webdriver_calls')
+    chrome_rss = max((value for (name, _), value in metrics.gauges.items() if name == 'chrome_rss_mb'), default=None)
+    peak_rss = peak_rss_mb()
+    return {
+        'mode': mode,
+        'concurrency': concurrency if mode in GOVT_MODES else 1,
+        'seconds': round(elapsed, 3),
+        'pages': pages,
+        'records': len(jobs),
+        'pages_per_second': round(pages / elapsed, 2),
+        'records_per_second': round(len(jobs) / elapsed, 2),
+        'peak_rss_mb': round(peak_rss, 1) if peak_rss is not None else None,
+        'chrome_rss_mb': round(chrome_rss, 1) if chrome_rss is not None else None,
+        'webdriver_calls': webdriver_calls,
+    }
+
+
+def measure(mode, *args):
+    """run_mode in a fresh process, so peak RSS is measured per mode"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(run_mode, mode, *args).result()
+
+
+def result_key(result):
+    return f"{result['mode']}@{result['concurrency']}"
+
+
+def check_baseline(results, baseline, tolerance):
+    """Regressions of results against a saved baseline, as messages"""
+    regressions = []
+    for result in results:
+        before = baseline.get(result_key(result))
+        if not before:
+            continue
+        for field in ('pages_per_second', 'records_per_second'):
+            if before[field] and result[field] < before[field] * (1 - tolerance):
+                regressions.append(f"{result_key(result)}: {field} {result[field]} < baseline {before[field]}")
+        if result['webdriver_calls'] > before['webdriver_calls'] * (1 + tolerance):
+            regressions.append(f"{result_key(result)}: webdriver_calls {result['webdriver_calls']} "
+                               f"> baseline {before['webdriver_calls']}")
+    return regressions
+
+
+def measure_startup(code, repeat=5):
+    """
+    Run code in fresh interpreters with -X importtime; returns (best wall
+    ms, best ms spent importing, names of the modules imported)
+    """
+    best_wall = best_imports = None
+    modules = set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        wall = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"{code!r} failed: {result.stderr.strip().splitlines()[-1]}")
+        imports = 0
+        for match in IMPORT_TIME_LINE.finditer(result.stderr):
+            # Cumulative time of the top-level imports (one space of indentation)
+            if len(match.group(3)) == 1:
+                imports += int(match.group(2))
+            modules.add(match.group(4))
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+        best_imports = imports / 1000 if best_imports is None else min(best_imports, imports / 1000)
+    return best_wall, best_imports, modules
+
+
+def run_startup(repeat=5, budget_ms=None):
+    """Time the imports of every STARTUP_CASES entry point; returns the regressions, as messages"""
+    print(f"{'entry point':<24} {'imports (ms)':>12} {'wall (ms)':>10}  heavy modules imported")
+    regressions = []
+    for name, code, forbidden in STARTUP_CASES:
+        wall, imports, modules = measure_startup(code, repeat)
+        heavy = sorted({module.split('.')[0] for module in modules} & set(HEAVY_MODULES))
+        print(f"{name:<24} {imports:>12.1f} {wall:>10.1f}  {', '.join(heavy) or '-'}")
+        unwanted = [module for module in heavy if module in forbidden]
+        if unwanted:
+            regressions.append(f"{name} imports {', '.join(unwanted)} before it needs them")
+        if budget_ms and imports > budget_ms:
+            regressions.append(f"{name}: imports took {imports:.0f} ms > budget {budget_ms:.0f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='http', help=f"comma separated modes (default: http), "
+                                                        f"from {', '.join(GOVT_MODES + HOT_JOBS_MODES)}")
+    parser.add_argument('--pages', type=int, default=None,
+                        help='category pages on the site (default: 20, or the recorded pages)')
+    parser.add_argument('--latency', type=float, default=0.3, help='server latency per request in seconds (default: 0.3)')
+    parser.add_argument('--empty-pages', default='', help='comma separated page numbers served without articles')
+    parser.add_argument('--concurrency', default='1,2,4,8',
+                        help='comma separated worker counts for the crawl modes (default: 1,2,4,8)')
+    parser.add_argument('--rate-limit', type=float, default=0, help='requests/second per host, 0 = unlimited (default: 0)')
+    parser.add_argument('--page-delay', type=float, default=0, help='sequential delay between pages (default: 0)')
+    parser.add_argument('--fixtures', help='replay pages recorded in this directory instead of synthetic ones')
+    parser.add_argument('--record', action='store_true', help='record live pages into --fixtures and exit')
+    parser.add_argument('--save-baseline', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare with a saved baseline, exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression vs. baseline (default: 0.2)')
+    parser.add_argument('--startup', action='store_true',
+                        help="time the entry points' imports (-X importtime) instead, exit 1 on regression")
+    parser.add_argument('--startup-repeat', type=int, default=5,
+                        help='interpreters started per entry point, the fastest counts (default: 5)')
+    parser.add_argument('--startup-budget-ms', type=float, help='fail when an entry point\'s imports take longer')
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        regressions = run_startup(args.startup_repeat, args.startup_budget_ms)
+        for message in regressions:
+            print(f"❌ Regression: {message}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No startup regressions")
+        return
+
+    if args.record:
+        directory = args.fixtures or 'fixtures'
+        for path in record_fixtures(directory, max_pages=args.pages or 5):
+            print(f"Recorded {path}")
+        return
+
+    modes = [mode.strip() for mode in args.modes.split(',')]
+    unknown = [mode for mode in modes if mode not in GOVT_MODES + HOT_JOBS_MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    empty_pages = [int(p) for p in args.empty_pages.split(',') if p.strip()]
+    if args.fixtures:
+        site = RecordedSite(args.fixtures, pages=args.pages, latency=args.latency, empty_pages=empty_pages)
+    else:
+        site = FixtureSite(pages=args.pages or 20, latency=args.latency, empty_pages=empty_pages)
+    server, category_url = serve(site)
+    # Crawl one page past the end so the empty-page stop rule is exercised
+    max_pages = site.pages + 1
+
+    print(f"Fixture site: {category_url} ({site.pages} pages, {args.latency}s latency)")
+    print(f"{'mode':>18} {'conc':>5} {'wall (s)':>9} {'pages':>6} {'jobs':>6} {'pages/s':>8} {'jobs/s':>8} "
+          f"{'py MB':>7} {'chrome MB':>10} {'WD calls':>9} {'speedup':>8}")
+    results = []
+    try:
+        for mode in modes:
+            levels = [int(c) for c in args.concurrency.split(',')] if mode in GOVT_MODES else [1]
+            baseline_seconds = None
+            for concurrency in levels:
+                r = measure(mode, category_url, max_pages, concurrency, args.rate_limit, args.page_delay)
+                results.append(r)
+                baseline_seconds = baseline_seconds or r['seconds']
+                chrome = f"{r['chrome_rss_mb']:.0f}" if r['chrome_rss_mb'] is not None else '-'
+                python = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+                print(f"{mode:>18} {r['concurrency']:>5} {r['seconds']:>9.2f} {r['pages']:>6} {r['records']:>6} "
+                      f"{r['pages_per_second']:>8.1f} {r['records_per_second']:>8.1f} {python:>7} "
+                      f"{chrome:>10} {r['webdriver_calls']:>9} {baseline_seconds / r['seconds']:>7.1f}x")
+    finally:
+        server.shutdown()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({result_key(r): r for r in results}, f, indent=2)
+        print(f"Baseline saved: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = check_baseline(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"❌ Regression: {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Shared Chrome lifecycle for both scrapers.
+
+Launching Chrome (and resolving chromedriver) is a large part of every run,
+so instead of creating and quitting a browser per scrape, scrapers borrow a
+warm session from a BrowserPool and hand it back when they are done. The pool
+lives for the whole process, so APScheduler ticks reuse the same browsers; it
+health-checks a session before lending it and recycles it after a number of
+uses or when Chrome's memory has grown too much.
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from driver_cache import resolve_chromedriver
+from waits import enable_network_events
+
+
+def chrome_options(profile=None):
+    """Chrome options for a pooled session, with profile's launch settings applied"""
+    # Selenium is imported once a browser is launched, not with the module:
+    # browserless runs also import this module for get_pool (see cli.py)
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless")  # Run in headless mode
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    # Expose CDP network events so scrapers can wait for XHRs to finish
+    enable_network_events(options)
+    if profile is not None:
+        profile.apply_options(options)
+    return options
+
+
+def create_driver(options=None):
+    """Launch a new Chrome WebDriver"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    return webdriver.Chrome(
+        service=Service(resolve_chromedriver()),
+        options=options or chrome_options()
+    )
+
+
+def _children(pid):
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def _rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of pid and all its descendants in MB (Linux only, else None)"""
+    if not os.path.exists(f"/proc/{pid}"):
+        return None
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += _rss_kb(current)
+        stack.extend(_children(current))
+    return total / 1024
+
+
+def driver_rss_mb(driver):
+    """Memory of chromedriver plus the Chrome processes it started, or None"""
+    try:
+        return process_tree_rss_mb(driver.service.process.pid)
+    except AttributeError:
+        return None
+
+
+class PooledBrowser:
+    """A pooled WebDriver with its usage bookkeeping"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.overflow = False
+        self.created_at = time.monotonic()
+        self.baseline_rss_mb = driver_rss_mb(driver)
+
+
+class BrowserPool:
+    """
+    Keeps up to `size` warm Chrome sessions alive across runs.
+
+    acquire() lends a healthy session (launching one if none is idle);
+    release() resets it and puts it back, or quits it once it has served
+    `max_uses` runs or its memory grew by more than `max_rss_growth_mb`.
+    If every pooled session is busy an extra, unpooled session is launched
+    and quit on release, so callers never deadlock waiting for a browser.
+    """
+
+    def __init__(self, size=None, max_uses=None, max_rss_growth_mb=None, factory=create_driver):
+        # Usage: BROWSER_POOL_SIZE=2 BROWSER_MAX_USES=20 python bd_hot_job_selenium.py
+        self.size = size if size is not None else int(os.environ.get('BROWSER_POOL_SIZE', 1))
+        self.max_uses = max_uses if max_uses is not None else int(os.environ.get('BROWSER_MAX_USES', 20))
+        self.max_rss_growth_mb = (
+            max_rss_growth_mb if max_rss_growth_mb is not None
+            else float(os.environ.get('BROWSER_MAX_RSS_GROWTH_MB', 500))
+        )
+        self.factory = factory
+        self._idle = []
+        self._busy = {}
+        self._lock = threading.Lock()
+        self.stats = {'launched': 0, 'reused': 0, 'recycled': 0, 'unhealthy': 0, 'overflow': 0}
+
+    def _launch(self):
+        browser = PooledBrowser(self.factory())
+        with self._lock:
+            self.stats['launched'] += 1
+        return browser
+
+    def warm(self):
+        """Pre-launch sessions until `size` are alive"""
+        while True:
+            with self._lock:
+                if len(self._idle) + len(self._busy) >= self.size:
+                    return
+            browser = self._launch()
+            with self._lock:
+                self._idle.append(browser)
+
+    @staticmethod
+    def is_healthy(browser):
+        try:
+            return browser.driver.execute_script("return 1") == 1
+        except Exception:
+            # WebDriverException, or a connection error once chromedriver itself died
+            return False
+
+    def acquire(self):
+        """Borrow a healthy WebDriver from the pool"""
+        while True:
+            with self._lock:
+                browser = self._idle.pop() if self._idle else None
+                overflow = browser is None and len(self._busy) >= self.size
+            if browser is None:
+                break
+            if self.is_healthy(browser):
+                with self._lock:
+                    self.stats['reused'] += 1
+                break
+            print("⚠ Pooled browser failed its health check, replacing it")
+            with self._lock:
+                self.stats['unhealthy'] += 1
+            self._quit(browser)
+
+        if browser is None:
+            browser = self._launch()
+            if overflow:
+                browser.overflow = True  # retire on release
+                with self._lock:
+                    self.stats['overflow'] += 1
+
+        browser.uses += 1
+        with self._lock:
+            self._busy[id(browser.driver)] = browser
+        return browser.driver
+
+    def release(self, driver):
+        """Return a borrowed WebDriver; it is reset, or quit if due for recycling"""
+        with self._lock:
+            browser = self._busy.pop(id(driver), None)
+        if browser is None:
+            # Not one of ours (e.g. pool was closed meanwhile)
+            self._quit_driver(driver)
+            return
+
+        reason = self._recycle_reason(browser)
+        if reason is None and not self._reset(browser):
+            reason = "reset failed"
+        if reason:
+            with self._lock:
+                self.stats['recycled'] += 1
+            print(f"♻ Recycling browser ({reason})")
+            self._quit(browser)
+            return
+
+        with self._lock:
+            self._idle.append(browser)
+
+    @contextmanager
+    def browser(self):
+        """with pool.browser() as driver: ..."""
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def _recycle_reason(self, browser):
+        if browser.overflow:
+            return "overflow session"
+        if browser.uses >= self.max_uses:
+            return f"{browser.uses} uses"
+        rss = driver_rss_mb(browser.driver)
+        if rss is not None and browser.baseline_rss_mb is not None:
+            if rss - browser.baseline_rss_mb > self.max_rss_growth_mb:
+                return f"memory grew to {rss:.0f} MB"
+        return None
+
+    @staticmethod
+    def _reset(browser):
+        """Clear per-run state so the next borrower starts clean"""
+        driver = browser.driver
+        try:
+            driver.get("about:blank")
+            driver.delete_all_cookies()
+            # Drop buffered CDP events so they don't leak into the next run
+            if 'performance' in driver.log_types:
+                driver.get_log('performance')
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, browser):
+        self._quit_driver(browser.driver)
+
+    @staticmethod
+    def _quit_driver(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every session, idle or borrowed"""
+        with self._lock:
+            browsers = self._idle + list(self._busy.values())
+            self._idle, self._busy = [], {}
+        for browser in browsers:
+            self._quit(browser)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(profile=None):
+    """
+    The process-wide pool shared by BDJobsHotJobsScraper and BDGovtJobScraper.
+    Sessions are only shared between profiles with the same launch settings.
+    """
+    key = profile.launch_key if profile is not None else None
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = BrowserPool(factory=lambda: create_driver(chrome_options(profile)))
+            atexit.register(_pools[key].close)
+        return _pools[key]
+
+
+def close_pools():
+    """Quit the sessions of every pool (atexit does not run in worker processes)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,104 @@
+"""
+Crash-resumable crawl checkpoints.
+
+After every completed page the crawler appends that page's records to
+<CHECKPOINT_DIR>/<name>.jsonl and atomically rewrites <name>.json with the
+crawl state (last completed page, record count, crawl settings). If Chrome
+dies or the process is killed, a run started with --resume replays the
+saved records into the outputs and continues from the next page, so a
+failure costs at most the page that was in flight.
+
+The record count in the state is authoritative: records appended for a page
+whose state update never happened are ignored on resume.
+A checkpoint is only resumed by a crawl of the listing (base_url) it was
+started for; the scraper discards any other.
+
+Usage:
+    python bdgovtjob.py --resume
+    CHECKPOINT_DIR=/var/lib/bdjobs/checkpoints python bdgovtjob.py
+"""
+import json
+import os
+from datetime import datetime
+
+
+class CrawlCheckpoint:
+    """State + records of the crawl in progress, persisted page by page"""
+
+    def __init__(self, name, directory=None):
+        self.directory = directory or os.environ.get('CHECKPOINT_DIR', '.checkpoints')
+        self.state_path = os.path.join(self.directory, f"{name}.json")
+        self.records_path = os.path.join(self.directory, f"{name}.jsonl")
+        self.state = None
+        self._file = None
+
+    def load(self):
+        """Saved state of an unfinished crawl, or None"""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return None if state.get('finished') else state
+
+    def records(self):
+        """Records of the completed pages of the saved crawl"""
+        state = self.load()
+        if state is None or not state['records']:
+            return
+        with open(self.records_path, encoding='utf-8') as f:
+            for count, line in enumerate(f):
+                if count >= state['records']:
+                    break
+                yield json.loads(line)
+
+    def start(self, **settings):
+        """Begin a new crawl, discarding any previous checkpoint"""
+        os.makedirs(self.directory, exist_ok=True)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.state = {'started': now, 'updated': now, 'last_page': 0, 'records': 0, 'finished': False, **settings}
+        self._file = open(self.records_path, 'w', encoding='utf-8')
+        self._save_state()
+
+    def resume(self, state):
+        """Continue the saved crawl described by state (from load())"""
+        self.state = dict(state)
+        # Drop records of a page whose state update never happened
+        with open(self.records_path, 'r+', encoding='utf-8') as f:
+            for _ in range(self.state['records']):
+                f.readline()
+            f.truncate(f.tell())
+        self._file = open(self.records_path, 'a', encoding='utf-8')
+
+    def page_done(self, page_num, records):
+        """Persist a completed page: its records first, then the state pointing past them"""
+        if self.state is None:
+            return
+        self._file.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.state['last_page'] = page_num
+        self.state['records'] += len(records)
+        self.state['updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._save_state()
+
+    def finish(self):
+        """The crawl completed: nothing left to resume"""
+        if self.state is None:
+            return
+        self.state['finished'] = True
+        self._save_state()
+        self.close()
+
+    def _save_state(self):
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
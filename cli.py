@@ -0,0 +1,171 @@
+"""
+Command line entry point for every job source registered in runner.py.
+
+Parsing a command loads only this module, runner.py's registry and the
+standard library. A source's module is imported when the source runs, and
+Selenium, requests, lxml and APScheduler only once the selected engine or
+command uses them, so short runs (RUN_ONCE-style scrapes, dry runs, outbox
+passes, the worker processes of a sharded crawl) do not pay for the
+dependencies of the others. `benchmark startup` times every entry point with
+`python -X importtime` and fails when one of them imports a heavy dependency
+early again.
+
+Usage:
+    python cli.py scrape govt_jobs                       # one source, in this process, then deliver its jobs
+    python cli.py scrape govt_jobs --engine selenium --max-pages 5
+    python cli.py scrape govt_jobs --resume
+    python cli.py scrape govt_jobs --categories bank-jobs,ngo-jobs
+    python cli.py scrape                                 # every source, in parallel (as runner.py)
+    python cli.py scrape hot_jobs --dry-run              # show what would run, import nothing
+    python cli.py deliver                                # one outbox delivery pass
+    python cli.py deliver hot_jobs --loop                # keep delivering one source's jobs
+    python cli.py deliver --status
+    python cli.py schedule [--adaptive]                  # each source on its interval (as runner.py --schedule)
+    python cli.py benchmark govt_jobs --modes http --pages 5
+    python cli.py benchmark startup --startup-budget-ms 300
+"""
+import argparse
+import os
+import sys
+
+from runner import SOURCES, print_report, resolve, run_source, run_sources
+
+# Command line options of `scrape` and the variables they set
+SCRAPE_OPTIONS = (
+    ('engine', 'FETCH_ENGINE'),
+    ('max_pages', 'MAX_PAGES'),
+    ('categories', 'CATEGORIES'),
+    ('concurrency', 'CONCURRENCY'),
+)
+
+
+def source_names(parser, names):
+    """Registered sources named on the command line (default: all)"""
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        parser.error(f"unknown source(s): {', '.join(unknown)} (choose from {', '.join(SOURCES)})")
+    return names or list(SOURCES)
+
+
+def scrape(parser, args):
+    names = source_names(parser, args.sources)
+    settings = {variable: str(getattr(args, option)) for option, variable in SCRAPE_OPTIONS
+                if getattr(args, option) is not None}
+    if args.resume:
+        settings['RESUME'] = '1'
+
+    if args.dry_run:
+        for name in names:
+            source = SOURCES[name]
+            # The source's defaults only apply to variables not set already
+            defaults = {key: value for key, value in source.env.items() if key not in os.environ}
+            print(f"{name}: {source.target}")
+            for key, value in {**defaults, **settings}.items():
+                print(f"   {key}={value}")
+        return 0
+
+    # Set before the source's module is imported; the source's own defaults do not override them
+    os.environ.update(settings)
+    if len(names) > 1:
+        reports = run_sources([SOURCES[name] for name in names], log_dir=args.log_dir)
+    else:
+        # A single source runs in this process: no second interpreter to start
+        source = SOURCES[names[0]]
+        use_outbox = os.environ.get('OUTBOX', '1') != '0'
+        # As with run_sources, the source only queues its jobs and they are delivered after the run
+        env = {'OUTBOX_INLINE_DRAIN': '0', **source.env} if use_outbox else source.env
+        reports = [run_source(source.name, source.target, env, args.log_dir)]
+        if use_outbox:
+            from outbox import Outbox, OutboxDrainer
+            OutboxDrainer(Outbox(), endpoints=[resolve(source.endpoint)]).drain_once()
+        print_report(reports)
+    return 0 if all(report['status'] == 'ok' for report in reports) else 1
+
+
+def deliver(parser, args):
+    from outbox import Outbox, OutboxDrainer
+
+    endpoints = None
+    if args.sources:
+        endpoints = [resolve(SOURCES[name].endpoint) for name in source_names(parser, args.sources)]
+    outbox = Outbox()
+    if args.status:
+        for endpoint, info in outbox.status().items():
+            if endpoints is None or endpoint in endpoints:
+                print(f"{endpoint}: {info['pending']} pending, {info['failing']} failing")
+        return 0
+
+    drainer = OutboxDrainer(outbox, endpoints=endpoints)
+    if not args.loop:
+        drainer.drain_once()
+        return 0
+
+    print(f"Outbox drainer started: every {drainer.interval}s")
+    drainer.start()
+    try:
+        while drainer.is_alive():
+            drainer.join(1)
+    except KeyboardInterrupt:
+        drainer.stop()
+        print("Outbox drainer stopped")
+    return 0
+
+
+def schedule(parser, args):
+    names = source_names(parser, args.sources)
+    run_sources([SOURCES[name] for name in names], schedule=True, adaptive=args.adaptive, log_dir=args.log_dir)
+    return 0
+
+
+def benchmark(parser, args):
+    import benchmark as bench
+
+    if args.target == 'startup':
+        bench.main(['--startup'] + args.options)
+        return 0
+    source_names(parser, [args.target])
+    options = args.options
+    if '--modes' not in options:
+        options = ['--modes', ','.join(bench.SOURCE_MODES[args.target])] + options
+    bench.main(options)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('scrape', help='scrape sources once (one source runs in this process)')
+    command.add_argument('sources', nargs='*', help=f"sources (default: all of {', '.join(SOURCES)})")
+    command.add_argument('--engine', choices=('http', 'selenium'), help='govt_jobs fetch engine (FETCH_ENGINE)')
+    command.add_argument('--max-pages', type=int, help='govt_jobs pages to crawl (MAX_PAGES)')
+    command.add_argument('--categories', help='govt_jobs categories, sharded across processes (CATEGORIES)')
+    command.add_argument('--concurrency', type=int, help='govt_jobs pages fetched in parallel (CONCURRENCY)')
+    command.add_argument('--resume', action='store_true', help='continue the govt_jobs crawl a crashed run left unfinished')
+    command.add_argument('--log-dir', help="write each source's output to <dir>/<source>.log")
+    command.add_argument('--dry-run', action='store_true', help='print what would run and exit')
+    command.set_defaults(handler=scrape)
+
+    command = commands.add_parser('deliver', help="deliver the jobs queued in the outbox")
+    command.add_argument('sources', nargs='*', help="only these sources' endpoints (default: all)")
+    command.add_argument('--loop', action='store_true', help='keep delivering until interrupted')
+    command.add_argument('--status', action='store_true', help='show pending records and exit')
+    command.set_defaults(handler=deliver)
+
+    command = commands.add_parser('schedule', help='run sources on their intervals until interrupted')
+    command.add_argument('sources', nargs='*', help=f"sources (default: all of {', '.join(SOURCES)})")
+    command.add_argument('--adaptive', action='store_true', help="adjust intervals to each source's rate of new jobs")
+    command.add_argument('--log-dir', help="write each source's output to <dir>/<source>.log")
+    command.set_defaults(handler=schedule)
+
+    command = commands.add_parser('benchmark', help="benchmark a source's modes offline, or the startup imports")
+    command.add_argument('target', choices=list(SOURCES) + ['startup'])
+    command.add_argument('options', nargs=argparse.REMAINDER, help='options for benchmark.py')
+    command.set_defaults(handler=benchmark)
+
+    args = parser.parse_args(argv)
+    return args.handler(parser, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
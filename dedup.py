@@ -0,0 +1,219 @@
+"""
+Cross-source deduplication of scraped jobs.
+
+The same circular shows up on bdgovtjob.net and in the bdjobs.com Hot Jobs,
+and a post can appear twice in one bdgovtjob.net crawl when new posts shift
+the pages while it runs. DedupIndex drops such duplicates before anything is
+written or sent:
+
+- exact:  job_url is compared in canonical form (records.canonical_url);
+          every URL is remembered with the job it belongs to
+- near:   a MinHash signature of the normalized title + organisation is
+          bucketed with locality-sensitive hashing (LSH bands),
+          so a lookup only compares against the few jobs sharing a bucket -
+          not the whole history - before the similarity is checked. Jobs
+          with different known deadlines never match, and only jobs of other
+          sources are matched: within one site distinct posts often differ
+          by a word or a number only
+
+The first URL seen for a job is its primary URL. Records carrying the
+primary URL are kept (once per run); records whose URL is an alias of
+another job, or whose content nearly matches another job, are dropped. The
+index is SQLite and shared by all sources.
+
+Usage:
+    python bdgovtjob.py                                   # on by default
+    DEDUP=0 python bdgovtjob.py                           # disable
+    DEDUP_DB=/var/lib/bdjobs/dedup.db DEDUP_THRESHOLD=0.8 python bdgovtjob.py
+"""
+import hashlib
+import os
+import random
+import re
+import sqlite3
+from array import array
+from datetime import datetime
+
+from records import BENGALI_DIGITS, canonical_url, parse_date
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+# Universal hashing (a*x + b) mod p stands in for NUM_PERM random permutations
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+_random = random.Random(20251103)
+PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Words every circular title carries; they would make unrelated jobs look alike
+STOP_WORDS = {'job', 'jobs', 'circular', 'recruitment', 'notice', 'vacancy', 'vacancies', 'govt', 'government'}
+
+
+def normalize_text(text):
+    text = str(text or '').translate(BENGALI_DIGITS).lower()
+    words = re.sub(r'[^\w\s]', ' ', text).split()
+    return ' '.join(word for word in words if word not in STOP_WORDS)
+
+
+def dedup_key_text(record):
+    """
+    Text a record is compared by: the words of its title and organisation,
+    normalized and sorted (one site writes "Sonali Bank Officer", the other
+    "Officer" at "Sonali Bank")
+    """
+    title = record.get('job_title') or record.get('position') or ''
+    organization = record.get('organization') or record.get('company_name') or ''
+    return ' '.join(sorted(set(normalize_text(f"{title} {organization}").split())))
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM 32-bit values) of text's character shingles"""
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+              for s in shingles(text)]
+    return array('I', (min(((a * h + b) % _PRIME) & _MASK for h in hashes) for a, b in PERMUTATIONS))
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def band_buckets(signature):
+    """LSH bucket keys of signature, one per band; similar signatures share at least one"""
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+class DedupIndex:
+    """SQLite-backed exact (canonical URL) + near-duplicate (MinHash LSH) index"""
+
+    def __init__(self, source, path=None, threshold=None):
+        self.source = source
+        self.path = path or os.environ.get('DEDUP_DB', 'dedup.db')
+        if threshold is None:
+            threshold = float(os.environ.get('DEDUP_THRESHOLD', 0.8))
+        self.threshold = threshold
+        # Both scrapers may run at once (runner.py); wait for the other's write lock
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dedup_jobs (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                job_url TEXT NOT NULL UNIQUE,
+                signature BLOB NOT NULL,
+                deadline TEXT,
+                first_seen TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dedup_urls (
+                url TEXT PRIMARY KEY,
+                job_id INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dedup_buckets (
+                bucket TEXT NOT NULL,
+                job_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS dedup_buckets_bucket ON dedup_buckets (bucket);
+        """)
+        self.conn.commit()
+        # Jobs already passed on during this run
+        self.emitted = set()
+        self.stats = {'kept': 0, 'exact': 0, 'near': 0, 'repeat': 0}
+
+    def _job_for_url(self, url):
+        """(job id, primary URL, source) of the job url belongs to, or None"""
+        return self.conn.execute("""
+            SELECT j.id, j.job_url, j.source FROM dedup_urls u JOIN dedup_jobs j ON j.id = u.job_id
+            WHERE u.url = ?
+        """, (url,)).fetchone()
+
+    def _similar_job(self, signature, deadline):
+        """Id of another source's job at least threshold-similar to signature, or None"""
+        buckets = band_buckets(signature)
+        candidates = self.conn.execute(f"""
+            SELECT DISTINCT j.id, j.signature, j.deadline FROM dedup_buckets b JOIN dedup_jobs j ON j.id = b.job_id
+            WHERE b.bucket IN ({','.join('?' * len(buckets))}) AND j.source != ?
+        """, buckets + [self.source])
+        best, best_score = None, self.threshold
+        for job_id, blob, other_deadline in candidates:
+            if deadline and other_deadline and deadline != other_deadline:
+                continue
+            score = similarity(signature, array('I', blob))
+            if score >= best_score:
+                best, best_score = job_id, score
+        return best
+
+    def _add_job(self, url, signature, deadline):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        job_id = self.conn.execute(
+            "INSERT INTO dedup_jobs (source, job_url, signature, deadline, first_seen) VALUES (?, ?, ?, ?, ?)",
+            (self.source, url, signature.tobytes(), deadline, now),
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO dedup_buckets (bucket, job_id) VALUES (?, ?)",
+            [(bucket, job_id) for bucket in band_buckets(signature)],
+        )
+        self._add_url(url, job_id)
+        return job_id
+
+    def _add_url(self, url, job_id):
+        self.conn.execute("INSERT OR IGNORE INTO dedup_urls (url, job_id) VALUES (?, ?)", (url, job_id))
+
+    def check(self, record):
+        """Why record is a duplicate ('exact', 'near' or 'repeat'), or None to keep it (and index it)"""
+        url = canonical_url(record.get('job_url'))
+        if not url:
+            return None
+        known = self._job_for_url(url)
+        if known is None:
+            signature = minhash(dedup_key_text(record))
+            deadline = parse_date(record.get('deadline'))
+            deadline = deadline.isoformat() if deadline else None
+            match = self._similar_job(signature, deadline)
+            if match is not None:
+                # Remember the URL, so the next run resolves it without MinHash
+                self._add_url(url, match)
+                return 'near'
+            job_id = self._add_job(url, signature, deadline)
+        else:
+            job_id, primary_url, source = known
+            if primary_url != url or source != self.source:
+                return 'exact'
+        if job_id in self.emitted:
+            return 'repeat'
+        self.emitted.add(job_id)
+        return None
+
+    def filter(self, records):
+        """The records that are not duplicates, in order"""
+        kept = []
+        with self.conn:
+            for record in records:
+                reason = self.check(record)
+                if reason is None:
+                    kept.append(record)
+                    self.stats['kept'] += 1
+                else:
+                    self.stats[reason] += 1
+        return kept
+
+    def print_summary(self):
+        s = self.stats
+        dropped = s['exact'] + s['near'] + s['repeat']
+        print(f"🧹 Dedup: {dropped} duplicates dropped ({s['exact']} same URL, {s['near']} near-identical, "
+              f"{s['repeat']} repeated in this run), {s['kept']} kept")
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM dedup_jobs").fetchone()[0]
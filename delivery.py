@@ -0,0 +1,200 @@
+"""
+Reliable delivery of scraped jobs to the Django API.
+
+Instead of POSTing the whole job list as one JSON blob, ApiDelivery
+
+- sends only records that are new or changed since the last successful
+  delivery to that endpoint (a SeenIndex ledger, see seen_index.py),
+- splits them into batches bounded by record count and payload size,
+- optionally gzip-compresses each payload (API_GZIP=1), falling back to
+  plain JSON for the rest of the process once the endpoint rejects
+  compressed bodies,
+- reuses one pooled requests.Session for every batch and run,
+- retries timeouts, connection errors, 429 and 5xx with exponential backoff,
+
+and aggregates the API's total_created / total_updated / total_errors
+counts across batches.
+"""
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from contextlib import nullcontext
+
+from metrics import API_POST
+from seen_index import SeenIndex
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Unsupported Media Type: the server does not accept the Content-Encoding
+COMPRESSION_REJECTED_STATUS = 415
+# A 400 only means the gzip body was not understood when the error says so
+# (e.g. Django REST framework: "JSON parse error - 'utf-8' codec can't decode byte 0x8b")
+COMPRESSION_ERROR_MARKERS = ('gzip', 'encoding', 'decode', 'parse error')
+
+# Endpoints that rejected a gzip body in this process: sent plain JSON from then on
+_plain_endpoints = set()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide pooled session, so scheduled runs reuse API connections"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # Imported on first delivery, not with the module (see cli.py)
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+class DeliveryError(Exception):
+    """A batch could not be delivered after all retries"""
+
+
+class ApiDelivery:
+    """Delta-only, batched, compressed delivery of job records to one endpoint"""
+
+    def __init__(self, api_url, timeout=60, batch_size=None, batch_bytes=None, max_retries=None,
+                 backoff=1.0, compress=None, delta=None, session=None, ledger=None, metrics=None):
+        # Usage: API_BATCH_SIZE=100 API_MAX_RETRIES=4 API_GZIP=0 API_DELTA=0 python bdgovtjob.py
+        self.api_url = api_url
+        self.timeout = timeout
+        self.batch_size = batch_size or int(os.environ.get('API_BATCH_SIZE', 100))
+        self.batch_bytes = batch_bytes or int(os.environ.get('API_BATCH_KB', 256)) * 1024
+        self.max_retries = max_retries if max_retries is not None else int(os.environ.get('API_MAX_RETRIES', 4))
+        self.backoff = backoff
+        if compress is None:
+            compress = os.environ.get('API_GZIP') == '1'
+        self.compress = compress and api_url not in _plain_endpoints
+        if delta is None:
+            delta = os.environ.get('API_DELTA', '1') != '0'
+        self.session = session or get_session()
+        # Optional metrics.Metrics: every POST is timed as api_post
+        self.metrics = metrics
+        # Ledger of what this endpoint already accepted
+        # (an empty SeenIndex is falsy: it has a __len__)
+        if ledger is None and delta:
+            ledger = SeenIndex(f"delivered:{api_url}", os.environ.get('DELIVERY_DB', 'delivered_jobs.db'))
+        self.ledger = ledger
+
+    def split_batches(self, jobs):
+        """Split jobs into batches of at most batch_size records / batch_bytes of JSON"""
+        batches, batch, size = [], [], 2
+        for job in jobs:
+            job_size = len(json.dumps(job, ensure_ascii=False).encode('utf-8')) + 1
+            if batch and (len(batch) >= self.batch_size or size + job_size > self.batch_bytes):
+                batches.append(batch)
+                batch, size = [], 2
+            batch.append(job)
+            size += job_size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _post(self, batch, idempotency_key=None):
+        body = json.dumps(batch, ensure_ascii=False).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+        if self.compress:
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        return self.session.post(self.api_url, data=body, headers=headers, timeout=self.timeout)
+
+    @staticmethod
+    def compression_rejected(response):
+        """True if response says the server could not read the gzip request body"""
+        if response.status_code == COMPRESSION_REJECTED_STATUS:
+            return True
+        if response.status_code != 400:
+            return False
+        error = response.text[:500].lower()
+        return any(marker in error for marker in COMPRESSION_ERROR_MARKERS)
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    def post_batch(self, batch, idempotency_key=None):
+        """POST one batch with retries; returns the decoded JSON response (or {})"""
+        import requests
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                timer = self.metrics.timer(API_POST, records=len(batch)) if self.metrics else nullcontext()
+                with timer:
+                    response = self._post(batch, idempotency_key)
+                if response.status_code in (200, 201):
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        data = {}
+                    return data if isinstance(data, dict) else {}
+                if self.compress and self.compression_rejected(response):
+                    print(f"   ⚠ API rejected gzip payload (HTTP {response.status_code}), sending plain JSON")
+                    self.compress = False
+                    _plain_endpoints.add(self.api_url)
+                    continue
+                last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code not in RETRY_STATUSES:
+                    break
+            except requests.exceptions.Timeout:
+                last_error = f"timed out (>{self.timeout}s)"
+            except requests.exceptions.ConnectionError as e:
+                last_error = f"cannot connect: {e}"
+
+            if attempt < self.max_retries:
+                delay = self._delay(attempt, response)
+                print(f"   ↻ Batch failed ({last_error}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        raise DeliveryError(last_error)
+
+    def deliver(self, jobs):
+        """
+        Deliver jobs; returns a summary dict with sent/skipped counts, batch
+        counts, aggregated API totals and the errors of failed batches
+        """
+        fresh = self.ledger.filter_fresh(jobs) if self.ledger is not None else list(jobs)
+        result = {
+            'sent': 0,
+            'skipped': len(jobs) - len(fresh),
+            'batches': 0,
+            'failed_batches': 0,
+            'total_created': 0,
+            'total_updated': 0,
+            'total_errors': 0,
+            'errors': [],
+            'failures': [],
+        }
+
+        for batch in self.split_batches(fresh):
+            result['batches'] += 1
+            try:
+                response = self.post_batch(batch)
+            except DeliveryError as e:
+                result['failed_batches'] += 1
+                result['failures'].append(str(e))
+                continue
+
+            result['sent'] += len(batch)
+            for key in ('total_created', 'total_updated', 'total_errors'):
+                result[key] += int(response.get(key) or 0)
+            result['errors'].extend(response.get('errors') or [])
+            # Remember per batch, so a later failure does not resend these
+            if self.ledger is not None:
+                self.ledger.mark_seen(batch)
+
+        return result
@@ -0,0 +1,164 @@
+"""
+Offline, cached chromedriver resolution.
+
+ChromeDriverManager().install() does a network version lookup on every
+start and fails outright when the driver CDN is slow or unreachable. Instead
+the resolved chromedriver path is pinned in a small JSON manifest and checked
+locally against the installed Chrome's major version; webdriver_manager is
+only consulted when there is no manifest or the versions no longer match.
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from datetime import datetime
+
+# Usage: DRIVER_CACHE_DIR=/var/cache/bdjobs python bdgovtjob.py
+CACHE_DIR = os.environ.get(
+    'DRIVER_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'bdjob_scraper')
+)
+MANIFEST_NAME = 'chromedriver.json'
+
+CHROME_CANDIDATES = [
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser',
+    r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+    r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+
+VERSION_RE = re.compile(r'(\d+)\.(\d+)\.(\d+)\.(\d+)')
+
+_resolved_path = None
+_resolve_lock = threading.Lock()
+
+
+def _run_version(executable):
+    """Output of `executable --version`, or '' if it cannot be run"""
+    try:
+        result = subprocess.run(
+            [executable, '--version'], capture_output=True, text=True, timeout=10
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def parse_version(text):
+    """First dotted four-part version in text, e.g. '120.0.6099.109', or None"""
+    match = VERSION_RE.search(text or '')
+    return match.group(0) if match else None
+
+
+def major(version):
+    return version.split('.')[0] if version else None
+
+
+def detect_chrome_version():
+    """Version of the locally installed Chrome/Chromium, or None"""
+    candidates = [os.environ['CHROME_BINARY']] if os.environ.get('CHROME_BINARY') else CHROME_CANDIDATES
+    for candidate in candidates:
+        executable = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if executable:
+            version = parse_version(_run_version(executable))
+            if version:
+                return version
+    return None
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def load_manifest(cache_dir=CACHE_DIR):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(manifest, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def build_manifest(driver_path, chrome_version):
+    return {
+        'path': driver_path,
+        'driver_version': parse_version(_run_version(driver_path)),
+        'chrome_version': chrome_version,
+        'signature': _file_signature(driver_path),
+        'resolved_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def validate_manifest(manifest, chrome_version):
+    """True if the pinned driver still exists and matches the installed Chrome"""
+    if not manifest or not os.path.isfile(manifest.get('path', '')):
+        return False
+
+    driver_version = manifest.get('driver_version')
+    # Re-read the binary's version only if the file changed since it was pinned
+    if manifest.get('signature') != _file_signature(manifest['path']):
+        driver_version = parse_version(_run_version(manifest['path']))
+    if not driver_version:
+        return False
+
+    # Without a detectable Chrome there is nothing to compare against: trust the pin
+    return chrome_version is None or major(driver_version) == major(chrome_version)
+
+
+def resolve_chromedriver(cache_dir=CACHE_DIR):
+    """
+    Path of a chromedriver matching the installed Chrome.
+
+    Order: CHROMEDRIVER_PATH env var, then the pinned manifest if it still
+    validates, then webdriver_manager (re-pinning its result). If
+    webdriver_manager fails, e.g. offline, a stale pinned driver is used
+    with a warning rather than aborting the run.
+    """
+    global _resolved_path
+    with _resolve_lock:
+        if _resolved_path:
+            return _resolved_path
+
+        pinned = os.environ.get('CHROMEDRIVER_PATH')
+        if pinned:
+            _resolved_path = pinned
+            return pinned
+
+        chrome_version = detect_chrome_version()
+        manifest = load_manifest(cache_dir)
+        if validate_manifest(manifest, chrome_version):
+            _resolved_path = manifest['path']
+            return _resolved_path
+
+        if manifest:
+            print(f"ℹ Cached chromedriver does not match Chrome {chrome_version}, resolving a new one")
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            driver_path = ChromeDriverManager().install()
+        except Exception as e:
+            if manifest and os.path.isfile(manifest.get('path', '')):
+                print(f"⚠ Could not resolve chromedriver ({e}), using cached {manifest['path']}")
+                _resolved_path = manifest['path']
+                return _resolved_path
+            raise
+
+        try:
+            save_manifest(build_manifest(driver_path, chrome_version), cache_dir)
+        except OSError as e:
+            print(f"⚠ Could not write chromedriver manifest: {e}")
+        _resolved_path = driver_path
+        return driver_path
@@ -0,0 +1,236 @@
+"""
+Optional detail-page enrichment of scraped jobs.
+
+The listing pages only carry a title, a link and a few summary fields. A
+DetailEnricher fetches each job's detail page over HTTP - concurrently, with
+a per-host politeness limit - and adds
+
+- organization:      the hiring organisation named on the page
+- detail_text:       the page's main text (trimmed to ENRICH_TEXT_CHARS)
+- circular_pdf_urls: links to PDF circulars, separated by " | "
+
+Results are cached in SQLite by job_url together with a hash of the listing
+record, so a job whose listing did not change is never fetched again. In
+incremental mode only new/changed jobs reach the enricher in the first place.
+
+Usage:
+    ENRICH=1 python bdgovtjob.py
+    ENRICH=1 ENRICH_CONCURRENCY=4 ENRICH_RATE_LIMIT=2 RUN_ONCE=1 python bd_hot_job_selenium.py
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from urllib.parse import urljoin
+
+from http_headers import DEFAULT_HEADERS
+from metrics import ENRICHMENT
+from seen_index import DETAIL_FIELDS, content_hash
+from throttle import HostRateLimiter
+
+# Containers holding the article body, most specific first
+# (WordPress posts on bdgovtjob.net, job pages on hotjobs.bdjobs.com)
+BODY_XPATHS = (
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' entry-content ')]",
+    "//article",
+    "//main",
+    "//body",
+)
+
+BLOCK_TAGS = ('p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article', 'table')
+
+ORGANIZATION_PATTERN = re.compile(
+    r"(?:Organi[sz]ation(?:\s+Name)?|Company(?:\s+Name)?|Department|Employer)\s*[:：]\s*(.+)", re.I
+)
+# Fallback: the first line that looks like the name of a government body or company
+ORGANIZATION_NAME_PATTERN = re.compile(
+    r"^(?:.*\b(?:Ministry|Directorate|Department|Division|Office|Board|Bank|Corporation|Authority|"
+    r"Commission|Council|Institute|University|Hospital|Limited|Ltd\.?|PLC|Company|Foundation)\b.*)$",
+    re.I | re.M,
+)
+
+
+def _normalize(text):
+    return " ".join(text.split())
+
+
+class DetailCache:
+    """SQLite cache: job_url -> extracted detail fields, valid while the listing hash matches"""
+
+    def __init__(self, path=None):
+        # Usage: ENRICH_CACHE_DB=/var/lib/bdjobs/details.db ENRICH=1 python bdgovtjob.py
+        self.path = path or os.environ.get('ENRICH_CACHE_DB', 'job_details.db')
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_details (
+                    job_url TEXT PRIMARY KEY,
+                    listing_hash TEXT NOT NULL,
+                    details TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL
+                )
+            """)
+
+    def get(self, job_url, listing_hash):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT details FROM job_details WHERE job_url = ? AND listing_hash = ?", (job_url, listing_hash)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, job_url, listing_hash, details):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self.conn:
+            self.conn.execute("""
+                INSERT INTO job_details (job_url, listing_hash, details, fetched_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (job_url) DO UPDATE SET
+                    listing_hash = excluded.listing_hash,
+                    details = excluded.details,
+                    fetched_at = excluded.fetched_at
+            """, (job_url, listing_hash, json.dumps(details, ensure_ascii=False), now))
+
+    def close(self):
+        self.conn.close()
+
+
+def extract_details(content, url, max_chars=5000):
+    """Detail fields of one job page (bytes or str of HTML)"""
+    from lxml import html as lxml_html
+
+    tree = lxml_html.fromstring(content)
+    for node in tree.xpath("//script | //style | //noscript"):
+        node.drop_tree()
+
+    body = None
+    for xpath in BODY_XPATHS:
+        found = tree.xpath(xpath)
+        if found:
+            body = found[0]
+            break
+
+    # Keep line breaks between blocks so the organisation regexes see lines
+    if body is not None:
+        for node in body.iter(*BLOCK_TAGS):
+            node.tail = "\n" + (node.tail or "")
+    lines = [_normalize(line) for line in (body.text_content() if body is not None else '').splitlines()]
+    text = "\n".join(line for line in lines if line)
+
+    pdfs = []
+    for href in tree.xpath("//a/@href"):
+        absolute = urljoin(url, href.strip())
+        if re.search(r"\.pdf(?:$|[?#])", absolute, re.I) and absolute not in pdfs:
+            pdfs.append(absolute)
+
+    match = ORGANIZATION_PATTERN.search(text) or ORGANIZATION_NAME_PATTERN.search(text)
+    organization = _normalize(match.group(match.lastindex or 0))[:200] if match else ''
+
+    return {
+        'organization': organization,
+        'detail_text': _normalize(text)[:max_chars],
+        'circular_pdf_urls': " | ".join(pdfs),
+    }
+
+
+class DetailEnricher:
+    """Fetches and extracts the detail pages of jobs, concurrently and politely"""
+
+    def __init__(self, concurrency=None, rate_limit=None, timeout=30, cache=None, session=None, metrics=None):
+        # Usage: ENRICH_CONCURRENCY=4 ENRICH_RATE_LIMIT=2 ENRICH_TEXT_CHARS=5000 python bdgovtjob.py
+        self.concurrency = concurrency or int(os.environ.get('ENRICH_CONCURRENCY', 4))
+        if rate_limit is None:
+            rate_limit = float(os.environ.get('ENRICH_RATE_LIMIT', 2))
+        self.limiter = HostRateLimiter(rate_limit)
+        self.timeout = timeout
+        self.max_chars = int(os.environ.get('ENRICH_TEXT_CHARS', 5000))
+        self.cache = cache or DetailCache()
+        if session is None:
+            # Imported once enrichment is on, not with the module (see cli.py)
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+        self.session = session
+        self.metrics = metrics
+        self.pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='enrich')
+        self.stats = {'fetched': 0, 'cached': 0, 'failed': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def fetch(self, job_url):
+        """Detail fields of job_url, downloaded now"""
+        self.limiter.wait(job_url)
+        response = self.session.get(job_url, timeout=self.timeout)
+        response.raise_for_status()
+        return extract_details(response.content, response.url, self.max_chars)
+
+    def details_for(self, record):
+        """Detail fields of record's job, from the cache or the web ({} if it has no usable URL or fails)"""
+        job_url = record.get('job_url')
+        if not job_url or not job_url.startswith(('http://', 'https://')):
+            return {}
+        listing_hash = content_hash(record)
+        details = self.cache.get(job_url, listing_hash)
+        if details is not None:
+            self._count('cached')
+            return details
+        try:
+            details = self.fetch(job_url)
+        except Exception as e:
+            self._count('failed')
+            print(f"  ⚠ Could not enrich {job_url}: {e}")
+            return {}
+        self._count('fetched')
+        self.cache.put(job_url, listing_hash, details)
+        return details
+
+    def enrich(self, records):
+        """Copies of records with the detail fields added, in the same order"""
+        if not records:
+            return []
+        timer = self.metrics.timer(ENRICHMENT, records=len(records)) if self.metrics else nullcontext()
+        with timer:
+            details = list(self.pool.map(self.details_for, records))
+        # Every record gets the columns, so CSV headers do not depend on the first job
+        empty = dict.fromkeys(DETAIL_FIELDS, '')
+        enriched = []
+        for record, found in zip(records, details):
+            record = {**record, **empty, **found}
+            # Hot Jobs cards already name the company
+            record['organization'] = record['organization'] or record.get('company_name', '')
+            enriched.append(record)
+        return enriched
+
+    def enrich_batches(self, batches, min_size=None):
+        """
+        Enrich a stream of record lists, regrouped so that each enrich() call
+        gets at least min_size records (small batches would leave workers idle)
+        """
+        min_size = min_size or self.concurrency * 4
+        pending = []
+        for batch in batches:
+            pending.extend(batch)
+            if len(pending) >= min_size:
+                yield self.enrich(pending)
+                pending = []
+        if pending:
+            yield self.enrich(pending)
+
+    def print_summary(self):
+        s = self.stats
+        print(f"🔎 Enrichment: {s['fetched']} detail pages fetched, {s['cached']} from cache, {s['failed']} failed")
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.cache.close()
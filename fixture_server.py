@@ -0,0 +1,296 @@
+"""
+Local stand-in for bdgovtjob.net and the bdjobs.com home page used by the
+benchmarks.
+
+FixtureSite serves synthetic WordPress-style category pages (article.post
+listings with .job-vacancy / .job-deadline boxes) and a Hot Jobs home page
+(.c-card company cards) with the JSON payload of those cards, plus a detail
+page for every job circular, from a background thread. RecordedSite replays pages
+recorded from the live sites with record_fixtures(). Both support a
+per-request latency, any number of pages and pages that come back empty, so
+network-bound behaviour can be measured without touching the live sites.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CATEGORY_PATH = "/category/government-jobs-circular/"
+LIVE_CATEGORY_URL = "https://bdgovtjob.net" + CATEGORY_PATH
+LIVE_HOME_URL = "https://bdjobs.com/"
+HOT_JOBS_PAYLOAD_PATH = "/api/hot-jobs"
+
+ARTICLE_TEMPLATE = """
+<article id="post-{post_id}" class="post-{post_id} post type-post status-publish">
+  <header class="entry-header">
+    <h2 class="entry-title"><a href="{base}/{slug}/" rel="bookmark">{title}</a></h2>
+    <div class="entry-meta"><span class="posted-on"><time class="entry-date published" datetime="2025-11-03">{posted}</time></span></div>
+  </header>
+  <div class="job-info-box job-vacancy"><span class="job-label">Vacancies</span><span class="job-value">{vacancies}</span></div>
+  <div class="job-info-box job-deadline"><span class="job-label">Deadline</span><span class="job-value">{deadline}</span></div>
+</article>
+"""
+
+HOT_JOB_CARD_TEMPLATE = """
+<div class="c-card">
+  <div class="companyLogo"><img src="{base}/logos/{card_id}.png" alt=""></div>
+  <h3><span class="wr">Company</span> <span class="wr">{card_id} Ltd.</span></h3>
+  <div class="companyDetails"><ul>{jobs}</ul></div>
+</div>
+"""
+
+HOT_JOB_LINK_TEMPLATE = (
+    '<li><a href="{base}/jobdetails/?id={job_id}"><span class="wr">Senior</span> '
+    '<span class="wr">Officer {job_id}</span></a></li>'
+)
+
+DETAIL_TEMPLATE = """<!DOCTYPE html><html><head><title>{title}</title></head><body><main id="main">
+<article class="post type-post"><h1 class="entry-title">{title}</h1>
+<div class="entry-content">
+<p>Organization: Ministry {post_id}</p>
+<p>Applications are invited for {vacancies} posts. Apply online before the deadline.</p>
+<p><a href="/wp-content/uploads/circular-{post_id}.pdf">Download circular (PDF)</a></p>
+</div></article></main></body></html>
+"""
+
+EMPTY_PAGE = (
+    "<!DOCTYPE html><html><head><title>Government Jobs Circular</title></head>"
+    "<body><main id=\"main\"></main></body></html>"
+)
+
+
+class FixtureSite:
+    """Synthetic category listing: `pages` pages of `articles_per_page` posts"""
+
+    def __init__(self, pages=20, articles_per_page=10, latency=0.0, empty_pages=(), validators=True,
+                 hot_job_cards=40, jobs_per_card=3):
+        self.pages = pages
+        self.articles_per_page = articles_per_page
+        self.hot_job_cards = hot_job_cards
+        self.jobs_per_card = jobs_per_card
+        self.latency = latency
+        self.empty_pages = set(empty_pages)
+        # Send ETag headers and answer If-None-Match with 304, like WordPress caches do
+        self.validators = validators
+        self.requests_served = 0
+        self._lock = threading.Lock()
+
+    def page_number(self, path):
+        """Page number for a request path, or None if it is not a category page"""
+        if path == CATEGORY_PATH:
+            return 1
+        if path.startswith(CATEGORY_PATH + "page/"):
+            try:
+                return int(path[len(CATEGORY_PATH + "page/"):].strip("/"))
+            except ValueError:
+                return None
+        return None
+
+    def render_page(self, page_num, base):
+        articles = []
+        if page_num not in self.empty_pages:
+            for i in range(self.articles_per_page):
+                post_id = page_num * 1000 + i
+                articles.append(ARTICLE_TEMPLATE.format(
+                    post_id=post_id,
+                    base=base,
+                    slug=f"job-circular-{post_id}",
+                    title=f"Ministry {post_id} Job Circular 2025",
+                    posted="3 November, 2025",
+                    vacancies=(post_id % 97) + 1,
+                    deadline="25 November 2025 at 5:00 PM",
+                ))
+        return (
+            "<!DOCTYPE html><html><head><title>Government Jobs Circular</title></head>"
+            "<body><main id=\"main\">" + "".join(articles) + "</main></body></html>"
+        )
+
+    def render_home(self, base):
+        """bdjobs.com-style home page with the Hot Jobs cards, or None"""
+        cards = []
+        for card_id in range(self.hot_job_cards):
+            jobs = "".join(
+                HOT_JOB_LINK_TEMPLATE.format(base=base, job_id=card_id * 100 + j)
+                for j in range(self.jobs_per_card)
+            )
+            cards.append(HOT_JOB_CARD_TEMPLATE.format(base=base, card_id=card_id, jobs=jobs))
+        return (
+            "<!DOCTYPE html><html><head><title>Bdjobs</title></head><body>"
+            "<section><h2 class=\"m-text-center\">Hot Jobs</h2>" + "".join(cards) + "</section>"
+            "</body></html>"
+        )
+
+    def render_hot_jobs_payload(self, base):
+        """JSON the Hot Jobs cards of render_home() are built from, or None"""
+        cards = [
+            {
+                'companyName': f"Company {card_id} Ltd.",
+                'logo': f"/logos/{card_id}.png",
+                'jobs': [
+                    {'jobId': card_id * 100 + j, 'jobTitle': f"Senior Officer {card_id * 100 + j}",
+                     'jobUrl': f"{base}/jobdetails/?id={card_id * 100 + j}"}
+                    for j in range(self.jobs_per_card)
+                ],
+            }
+            for card_id in range(self.hot_job_cards)
+        ]
+        return json.dumps({'status': 'ok', 'data': {'hotJobs': cards}})
+
+    def render_detail(self, path):
+        """Detail page of a job circular, or None if path is not one"""
+        match = re.fullmatch(r"/job-circular-(\d+)/", path)
+        if not match:
+            return None
+        post_id = int(match.group(1))
+        return DETAIL_TEMPLATE.format(title=f"Ministry {post_id} Job Circular 2025", post_id=post_id,
+                                      vacancies=(post_id % 97) + 1)
+
+    def handle(self, path, base):
+        """Return (status, body) for a request path"""
+        with self._lock:
+            self.requests_served += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if path == "/":
+            home = self.render_home(base)
+            if home is not None:
+                return 200, home
+
+        if path == HOT_JOBS_PAYLOAD_PATH:
+            payload = self.render_hot_jobs_payload(base)
+            if payload is not None:
+                return 200, payload
+
+        detail = self.render_detail(path)
+        if detail is not None:
+            return 200, detail
+
+        page_num = self.page_number(path)
+        if page_num is None or page_num > self.pages:
+            return 404, "<html><body><h1>Not Found</h1></body></html>"
+        return 200, self.render_page(page_num, base)
+
+
+class RecordedSite(FixtureSite):
+    """
+    Replays pages recorded by record_fixtures() from `directory`:
+    bdgovtjob/page-<n>.html and bdjobs/home.html. With `pages` larger than
+    the number of recorded pages the recordings are served again in a cycle
+    """
+
+    def __init__(self, directory, pages=None, latency=0.0, empty_pages=(), validators=True):
+        self.recorded_pages = []
+        for path in sorted(glob.glob(os.path.join(directory, 'bdgovtjob', 'page-*.html')),
+                           key=lambda p: int(re.search(r'page-(\d+)', p).group(1))):
+            with open(path, encoding='utf-8') as f:
+                self.recorded_pages.append(f.read())
+        self.home = None
+        home_path = os.path.join(directory, 'bdjobs', 'home.html')
+        if os.path.exists(home_path):
+            with open(home_path, encoding='utf-8') as f:
+                self.home = f.read()
+        if not self.recorded_pages and self.home is None:
+            raise FileNotFoundError(f"No recorded fixtures in {directory} (run: python benchmark.py --record)")
+        super().__init__(pages=pages or len(self.recorded_pages), latency=latency,
+                         empty_pages=empty_pages, validators=validators)
+
+    def render_page(self, page_num, base):
+        if page_num in self.empty_pages or not self.recorded_pages:
+            return EMPTY_PAGE
+        return self.recorded_pages[(page_num - 1) % len(self.recorded_pages)]
+
+    def render_home(self, base):
+        return self.home
+
+    def render_hot_jobs_payload(self, base):
+        return None
+
+
+def strip_live_resources(html):
+    """Drop scripts, stylesheets and frames so a replayed page never reaches the live site"""
+    html = re.sub(r'<script\b.*?</script\s*>', '', html, flags=re.S | re.I)
+    html = re.sub(r'<iframe\b.*?</iframe\s*>', '', html, flags=re.S | re.I)
+    return re.sub(r'<link\b[^>]*>', '', html, flags=re.I)
+
+
+def record_fixtures(directory, max_pages=5, category_url=LIVE_CATEGORY_URL, home_url=LIVE_HOME_URL):
+    """
+    Record live pages for RecordedSite: bdgovtjob.net category pages over
+    HTTP, and the bdjobs.com home page as rendered by Chrome (its Hot Jobs
+    cards are filled in by JavaScript). Returns the files written
+    """
+    import requests
+    from selenium.webdriver.common.by import By
+
+    from bd_hot_job_selenium import BDJobsHotJobsScraper
+    from http_headers import DEFAULT_HEADERS
+    from metrics import Metrics
+
+    written = []
+    os.makedirs(os.path.join(directory, 'bdgovtjob'), exist_ok=True)
+    os.makedirs(os.path.join(directory, 'bdjobs'), exist_ok=True)
+
+    with requests.Session() as session:
+        session.headers.update(DEFAULT_HEADERS)
+        for page_num in range(1, max_pages + 1):
+            url = category_url if page_num == 1 else f"{category_url}page/{page_num}/"
+            response = session.get(url, timeout=30)
+            if response.status_code != 200:
+                break
+            path = os.path.join(directory, 'bdgovtjob', f"page-{page_num}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(strip_live_resources(response.text))
+            written.append(path)
+
+    scraper = BDJobsHotJobsScraper(incremental=False, metrics=Metrics('record', path=''))
+    scraper.base_url = home_url
+    try:
+        scraper.start_browser().get(home_url)
+        scraper.wait_for_element(By.CLASS_NAME, "m-text-center")
+        scraper.waiter.network_idle()
+        scraper.waiter.stable_count(".c-card")
+        path = os.path.join(directory, 'bdjobs', 'home.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(strip_live_resources(scraper.driver.page_source))
+        written.append(path)
+    finally:
+        scraper.pool.release(scraper.driver)
+    return written
+
+
+def serve(site, host="127.0.0.1", port=0):
+    """Start serving site in a daemon thread; returns (server, category_url)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            base = f"http://{self.headers.get('Host')}"
+            status, body = site.handle(self.path.split("?")[0], base)
+            payload = body.encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+            if site.validators and status == 200 and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(status)
+            content_type = "application/json" if self.path.startswith("/api/") else "text/html; charset=UTF-8"
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            if site.validators and status == 200:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}{CATEGORY_PATH}"
@@ -0,0 +1,245 @@
+"""
+Hot Jobs records built from the JSON the bdjobs.com front end renders its
+cards from, instead of walking the rendered .c-card elements.
+
+Two ways to get at that JSON:
+
+- direct:  HOT_JOBS_PAYLOAD_URL names the endpoint; it is fetched over HTTP
+           and no browser is needed at all
+- capture: the home page is loaded in Chrome as before, and the JSON
+           (XHR/fetch) responses it receives from a Hot Jobs endpoint
+           (HOT_JOBS_PAYLOAD_PATTERN) are read back through CDP
+           (Network.getResponseBody), using the performance log the pooled
+           browsers already keep for the readiness waits. The cards built
+           from a captured payload are only used if they match the .c-card
+           elements the page rendered (count and company names)
+
+cards_from_payload() looks for a list of company cards (or a flat list of
+jobs carrying their company) under any of the usual key spellings and
+returns cards in the shape EXTRACT_CARDS_JS produces. Anything it does not
+recognise - no such list, a job without title or link - returns None, and
+the scraper falls back to reading the DOM, so a changed payload costs speed,
+not records. So does a captured payload that disagrees with the page.
+
+Usage:
+    RUN_ONCE=1 python bd_hot_job_selenium.py                       # capture, DOM fallback
+    HOT_JOBS_PAYLOAD_URL=https://... RUN_ONCE=1 python bd_hot_job_selenium.py
+    HOT_JOBS_FAST_PATH=0 RUN_ONCE=1 python bd_hot_job_selenium.py  # DOM only
+    HOT_JOBS_PAYLOAD_PATTERN='api/v2/featured' RUN_ONCE=1 python bd_hot_job_selenium.py
+"""
+import base64
+import json
+import os
+import re
+from collections import Counter
+from urllib.parse import urljoin
+
+from http_headers import DEFAULT_HEADERS
+
+# Accepted spellings of each field, compared lower-case without separators,
+# most specific first. A bare 'name' or 'id' is too common in unrelated JSON
+# (categories, locations, ...) to be taken for a company or a job
+FIELD_ALIASES = {
+    'company': ('companyname', 'compname', 'comname', 'employername', 'organizationname', 'company'),
+    'logo': ('companylogourl', 'companylogo', 'logourl', 'logopath', 'logo', 'imageurl', 'image', 'img'),
+    'jobs': ('jobs', 'joblist', 'hotjobs', 'jobpositions', 'positions', 'items'),
+    'position': ('jobtitle', 'jobtitlename', 'positionname', 'position', 'designation', 'title'),
+    'url': ('joburl', 'jobdetailsurl', 'detailsurl', 'url', 'link', 'href'),
+    'job_id': ('jobid', 'jobno'),
+}
+
+# Captured responses are only read if their URL matches this (case-insensitive)
+# regular expression
+# Usage: HOT_JOBS_PAYLOAD_PATTERN='api/v2/featured' RUN_ONCE=1 python bd_hot_job_selenium.py
+PAYLOAD_URL_PATTERN = os.environ.get('HOT_JOBS_PAYLOAD_PATTERN', r'hot[-_]?jobs')
+
+# Detail page of a job known only by its id
+# Usage: HOT_JOBS_JOB_URL_TEMPLATE='https://jobs.bdjobs.com/jobdetails.asp?id={job_id}'
+JOB_URL_TEMPLATE = os.environ.get('HOT_JOBS_JOB_URL_TEMPLATE', 'https://jobs.bdjobs.com/jobdetails.asp?id={job_id}')
+
+
+def _normalize_key(key):
+    return re.sub(r'[^a-z0-9]', '', str(key).lower())
+
+
+def _field(item, field):
+    """Value of field in the dict item under any of its aliases, or None"""
+    keys = {_normalize_key(key): value for key, value in item.items()}
+    for alias in FIELD_ALIASES[field]:
+        value = keys.get(alias)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _text(value):
+    return ' '.join(str(value).split()) if value is not None else ''
+
+
+def _job(item, base_url):
+    """{'position', 'job_url'} of a job dict, or None if either is missing"""
+    position = _text(_field(item, 'position'))
+    url = _field(item, 'url')
+    if url is None:
+        job_id = _field(item, 'job_id')
+        url = JOB_URL_TEMPLATE.format(job_id=job_id) if job_id is not None else None
+    if not position or not isinstance(url, str) or not url.strip():
+        return None
+    return {'position': position, 'job_url': urljoin(base_url, url.strip())}
+
+
+def _card(item, jobs, base_url):
+    logo = _field(item, 'logo')
+    return {
+        'company_name': _text(_field(item, 'company')),
+        'company_logo_url': urljoin(base_url, logo.strip()) if isinstance(logo, str) and logo.strip() else 'N/A',
+        'jobs': jobs,
+    }
+
+
+def _cards_from_list(items, base_url):
+    """Cards of a list of company dicts with a jobs list, or of flat job dicts; None if neither"""
+    if not items or not all(isinstance(item, dict) for item in items):
+        return None
+
+    nested = [_field(item, 'jobs') for item in items]
+    if all(isinstance(jobs, list) for jobs in nested) and any(nested):
+        cards = []
+        for item, job_items in zip(items, nested):
+            if not _field(item, 'company') or not all(isinstance(job, dict) for job in job_items):
+                return None
+            jobs = [_job(job, base_url) for job in job_items]
+            if None in jobs:
+                return None
+            cards.append(_card(item, jobs, base_url))
+        return cards
+
+    # Flat: one dict per job, consecutive jobs of a company form its card
+    cards = []
+    for item in items:
+        job = _job(item, base_url)
+        if job is None or not _field(item, 'company'):
+            return None
+        card = _card(item, [job], base_url)
+        if cards and (cards[-1]['company_name'], cards[-1]['company_logo_url']) == \
+                (card['company_name'], card['company_logo_url']):
+            cards[-1]['jobs'].append(job)
+        else:
+            cards.append(card)
+    return cards
+
+
+def cards_from_payload(payload, base_url):
+    """
+    Hot Jobs cards ({'company_name', 'company_logo_url', 'jobs': [{'position',
+    'job_url'}]}) found anywhere in a decoded JSON payload, or None if the
+    payload does not have a recognisable shape
+    """
+    if isinstance(payload, list):
+        cards = _cards_from_list(payload, base_url)
+        if cards:
+            return cards
+        children = payload
+    elif isinstance(payload, dict):
+        children = payload.values()
+    else:
+        return None
+    for child in children:
+        if isinstance(child, (dict, list)):
+            cards = cards_from_payload(child, base_url)
+            if cards:
+                return cards
+    return None
+
+
+def _company_key(name):
+    return ' '.join(str(name or '').split()).casefold()
+
+
+def cards_match_page(cards, company_names):
+    """
+    Whether cards built from a payload are the cards the page rendered: as
+    many cards, under the same company names (company_names, one per .c-card)
+    """
+    if len(cards) != len(company_names):
+        return False
+    return Counter(_company_key(card['company_name']) for card in cards) == \
+        Counter(_company_key(name) for name in company_names)
+
+
+def fetch_payload_cards(url, base_url, session=None, timeout=30):
+    """Cards from the JSON at url, or None if it cannot be fetched or is not recognised"""
+    import requests
+
+    try:
+        response = (session or requests).get(url, headers={**DEFAULT_HEADERS, 'Accept': 'application/json'},
+                                             timeout=timeout)
+        response.raise_for_status()
+        payload = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"⚠ Hot Jobs payload unavailable ({e})")
+        return None
+    return cards_from_payload(payload, base_url)
+
+
+class PayloadCapture:
+    """
+    Remembers the JSON responses among the CDP Network events it is given,
+    and passes every event on to network_stats. Hand it to ReadinessWaiter
+    in place of the NetworkStats so it sees the events network_idle() drains
+    """
+
+    def __init__(self, network_stats):
+        self.network_stats = network_stats
+        self.responses = {}
+        self.finished = []
+
+    def consume(self, messages):
+        messages = list(messages)
+        if self.network_stats is not None:
+            self.network_stats.consume(messages)
+        for message in messages:
+            method = message.get('method', '')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if params.get('type') in ('XHR', 'Fetch') and 'json' in response.get('mimeType', ''):
+                    self.responses[params.get('requestId')] = response.get('url', '')
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.responses:
+                self.finished.append(params['requestId'])
+
+    def payloads(self, driver, url_pattern=None):
+        """
+        (url, decoded JSON) of every JSON response that finished loading, in
+        order; only those whose URL matches the compiled url_pattern, if given
+        """
+        for request_id in self.finished:
+            if url_pattern is not None and not url_pattern.search(self.responses[request_id]):
+                continue
+            try:
+                body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                text = body['body']
+                if body.get('base64Encoded'):
+                    text = base64.b64decode(text).decode('utf-8')
+                yield self.responses[request_id], json.loads(text)
+            except Exception:
+                # Evicted from Chrome's buffer, or not JSON after all
+                continue
+
+    def cards(self, driver, base_url, url_pattern=None):
+        """
+        Cards from the first captured response from a Hot Jobs endpoint (URL
+        matching url_pattern, PAYLOAD_URL_PATTERN by default) with a
+        recognisable shape, or None
+        """
+        url_pattern = re.compile(url_pattern or PAYLOAD_URL_PATTERN, re.I)
+        for url, payload in self.payloads(driver, url_pattern):
+            cards = cards_from_payload(payload, base_url)
+            if cards:
+                print(f"Hot Jobs payload captured from {url}")
+                return cards
+        return None
+
+    def clear(self):
+        self.responses.clear()
+        self.finished.clear()
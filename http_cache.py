@@ -0,0 +1,221 @@
+"""
+On-disk HTTP page cache for the browserless fetch engine.
+
+For every page URL the cache keeps the ETag / Last-Modified validators, the
+response body, a hash of that body and the listing fields parsed from it.
+The next run sends a conditional GET; on `304 Not Modified` - or a 200 whose
+body hashes to the same value - the previously parsed fields are reused and
+the page is not parsed again. Entries are evicted least-recently-used once
+the cache grows past its size limit.
+
+Sharded crawls (see shards.py) share the cache directory, so each process
+merges its changes into index.json under a file lock instead of overwriting
+the other processes' entries, and the size limit applies to all of them.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Exclusive lock on the file at path, held across processes"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class HttpPageCache:
+    """Size-bounded LRU cache of pages and their parsed listing fields"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        # Usage: HTTP_CACHE_DIR=.http_cache HTTP_CACHE_MAX_MB=50 python bdgovtjob.py
+        self.directory = directory or os.environ.get('HTTP_CACHE_DIR', '.http_cache')
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('HTTP_CACHE_MAX_MB', 50)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self.lock_path = self.index_path + '.lock'
+        # Changes not yet merged into index.json: url -> stored entry (None
+        # if forgotten), and url -> time of last access
+        self._changes = {}
+        self._accessed = {}
+        self.stats = {'not_modified': 0, 'unchanged_body': 0, 'misses': 0, 'evictions': 0, 'bytes_downloaded': 0}
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        """
+        Merge this process's changes into index.json as other processes left
+        it, evict over the merged index and save it (lock held)
+        """
+        with _file_lock(self.lock_path):
+            index = self._load_index()
+            for url, entry in self._changes.items():
+                if entry is None:
+                    index.pop(url, None)
+                else:
+                    index[url] = entry
+            for url, accessed in self._accessed.items():
+                if url in index:
+                    index[url]['last_access'] = max(index[url]['last_access'], accessed)
+            self._evict(index)
+
+            # Per process: sharded crawls share the cache directory
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self.index_path)
+        self.index = index
+        self._changes.clear()
+        self._accessed.clear()
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _path(self, url, suffix):
+        return os.path.join(self.directory, self._key(url) + suffix)
+
+    @staticmethod
+    def body_hash(content):
+        return hashlib.sha256(content).hexdigest()
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for a cached url"""
+        with self._lock:
+            entry = self.index.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def lookup(self, url, response):
+        """
+        (body, articles) from the cache if response shows the page did not
+        change since it was cached - a 304, or a 200 with the same body -
+        otherwise None
+        """
+        with self._lock:
+            entry = self.index.get(url)
+        if not entry:
+            if response.status_code == 200:
+                self._count('misses', len(response.content))
+            return None
+
+        if response.status_code == 304:
+            stat = 'not_modified'
+        elif response.status_code == 200 and self.body_hash(response.content) == entry['body_hash']:
+            stat = 'unchanged_body'
+        else:
+            self._count('misses', len(response.content))
+            return None
+
+        try:
+            with open(self._path(url, '.html'), 'rb') as f:
+                body = f.read()
+            with open(self._path(url, '.json'), encoding='utf-8') as f:
+                articles = json.load(f)
+        except (OSError, ValueError):
+            # Entry without its files (e.g. deleted by hand): treat as a miss
+            self.forget(url)
+            self._count('misses', len(response.content))
+            return None
+
+        self._count(stat, len(response.content))
+        with self._lock:
+            self._accessed[url] = time.time()
+            self._save_index()
+        return body, articles
+
+    def store(self, url, response, articles):
+        """Cache a 200 response and the listing fields parsed from it"""
+        content = response.content
+        payload = json.dumps(articles, ensure_ascii=False).encode('utf-8')
+        with open(self._path(url, '.html'), 'wb') as f:
+            f.write(content)
+        with open(self._path(url, '.json'), 'wb') as f:
+            f.write(payload)
+
+        with self._lock:
+            self._changes[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'body_hash': self.body_hash(content),
+                'size': len(content) + len(payload),
+                'last_access': time.time(),
+            }
+            self._save_index()
+
+    def forget(self, url):
+        with self._lock:
+            self._changes[url] = None
+            self._remove_files(url)
+            self._save_index()
+
+    def _remove_files(self, url):
+        for suffix in ('.html', '.json'):
+            try:
+                os.remove(self._path(url, suffix))
+            except OSError:
+                pass
+
+    def _evict(self, index):
+        """Drop least recently used entries of index until the cache fits (lock held)"""
+        total = sum(entry['size'] for entry in index.values())
+        for url, entry in sorted(index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= entry['size']
+            del index[url]
+            self._remove_files(url)
+            self.stats['evictions'] += 1
+
+    def _count(self, stat, downloaded):
+        with self._lock:
+            self.stats[stat] += 1
+            self.stats['bytes_downloaded'] += downloaded
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats['hits'] = stats['not_modified'] + stats['unchanged_body']
+        stats['entries'] = len(self.index)
+        return stats
+
+    def print_summary(self):
+        s = self.summary()
+        print(f"📦 HTTP cache: {s['hits']} hits ({s['not_modified']} not modified, "
+              f"{s['unchanged_body']} unchanged body), {s['misses']} misses, "
+              f"{s['evictions']} evictions, {s['bytes_downloaded'] / 1024:.0f} KB downloaded")
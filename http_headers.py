@@ -0,0 +1,16 @@
+"""
+Request headers shared by every plain HTTP client: the listing fetch engine
+(bdgovtjob.py), detail-page enrichment, the Hot Jobs payload fetch and the
+fixture recorder. Kept free of other imports so any of them can use it
+without pulling in a scraper.
+"""
+
+# Browser-like headers for plain HTTP requests
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
@@ -0,0 +1,246 @@
+"""
+Historical store of every job ever scraped.
+
+The CSV/JSON files are rewritten on every run, so they only show the latest
+run. JobStore keeps the history in SQLite: every time a job is listed on a
+crawled page, a sighting is appended (append-only), and the jobs table holds
+each job's latest content with its first-seen / last-seen times and parsed,
+indexed deadline. Typical questions are then single indexed queries instead
+of diffing whole files:
+
+    store = JobStore()
+    store.open_jobs(days=7)                      # deadline within a week
+    store.new_since('2025-11-03 00:00:00')       # first seen since then
+
+Sightings are recorded before the incremental and dedup filters, so a job
+that is listed again but not re-sent still gets its last_seen updated (in
+incremental mode only for the pages actually crawled).
+
+Usage:
+    python job_store.py open --days 7
+    python job_store.py new --since "2025-11-03 00:00:00" --source bdgovtjob
+    python job_store.py search "bank" --format csv
+    python job_store.py history https://bdgovtjob.net/bangladesh-bank-job/
+    python job_store.py stats
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+
+from records import canonical_url, parse_date, parse_int
+from seen_index import content_hash
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Columns returned by the queries (data holds the latest scraped record as JSON)
+JOB_COLUMNS = ('source', 'job_url', 'title', 'organization', 'vacancies', 'deadline', 'posted_date',
+               'first_seen', 'last_seen', 'sightings')
+
+
+class JobStore:
+    """SQLite store: jobs (latest content, first/last seen) + append-only sightings"""
+
+    def __init__(self, path=None, run_id=None):
+        # Usage: JOB_STORE_DB=/var/lib/bdjobs/jobs.db python bdgovtjob.py
+        self.path = path or os.environ.get('JOB_STORE_DB', 'jobs.db')
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        # Both scrapers may write at once (runner.py); wait for the other's lock
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                job_url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                organization TEXT NOT NULL,
+                vacancies INTEGER,
+                deadline TEXT,
+                posted_date TEXT,
+                content_hash TEXT NOT NULL,
+                data TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                sightings INTEGER NOT NULL DEFAULT 1,
+                UNIQUE (source, job_url)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_deadline ON jobs (deadline);
+            CREATE INDEX IF NOT EXISTS jobs_first_seen ON jobs (first_seen);
+            CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen);
+            CREATE TABLE IF NOT EXISTS sightings (
+                job_id INTEGER NOT NULL,
+                run_id TEXT NOT NULL,
+                seen_at TEXT NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sightings_job ON sightings (job_id, seen_at);
+            CREATE INDEX IF NOT EXISTS sightings_seen_at ON sightings (seen_at);
+        """)
+        self.conn.commit()
+
+    def record(self, source, records, seen_at=None):
+        """Append a sighting of each record and upsert its job; returns the number recorded"""
+        seen_at = seen_at or datetime.now().strftime(TIMESTAMP_FORMAT)
+        recorded = 0
+        with self.conn:
+            for record in records:
+                url = canonical_url(record.get('job_url'))
+                if not url:
+                    continue
+                deadline = parse_date(record.get('deadline'))
+                posted = parse_date(record.get('posted_date'))
+                digest = content_hash(record)
+                row = self.conn.execute("""
+                    INSERT INTO jobs (source, job_url, title, organization, vacancies, deadline, posted_date,
+                                      content_hash, data, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (source, job_url) DO UPDATE SET
+                        title = excluded.title,
+                        organization = excluded.organization,
+                        vacancies = excluded.vacancies,
+                        deadline = excluded.deadline,
+                        posted_date = excluded.posted_date,
+                        content_hash = excluded.content_hash,
+                        data = excluded.data,
+                        last_seen = excluded.last_seen,
+                        sightings = jobs.sightings + 1
+                    RETURNING id
+                """, (
+                    source, url,
+                    record.get('job_title') or record.get('position') or '',
+                    record.get('organization') or record.get('company_name') or '',
+                    parse_int(record.get('vacancies')),
+                    deadline.isoformat() if deadline else None,
+                    posted.isoformat() if posted else None,
+                    digest, json.dumps(record, ensure_ascii=False), seen_at, seen_at,
+                )).fetchone()
+                self.conn.execute(
+                    "INSERT INTO sightings (job_id, run_id, seen_at, content_hash) VALUES (?, ?, ?, ?)",
+                    (row[0], self.run_id, seen_at, digest),
+                )
+                recorded += 1
+        return recorded
+
+    def _select(self, where, params, order, limit=None):
+        sql = f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE {' AND '.join(where) or '1'} ORDER BY {order}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def open_jobs(self, days=7, source=None, today=None, limit=None):
+        """Jobs whose deadline is today or within the next `days` days, soonest first"""
+        today = today or date.today()
+        where, params = ["deadline BETWEEN ? AND ?"], [today.isoformat(), (today + timedelta(days=days)).isoformat()]
+        if source:
+            where.append("source = ?")
+            params.append(source)
+        return self._select(where, params, "deadline, title", limit)
+
+    def new_since(self, since, source=None, limit=None):
+        """Jobs first seen at or after `since` ('YYYY-MM-DD[ HH:MM:SS]'), newest first"""
+        where, params = ["first_seen >= ?"], [since]
+        if source:
+            where.append("source = ?")
+            params.append(source)
+        return self._select(where, params, "first_seen DESC", limit)
+
+    def count_new_since(self, since, source=None):
+        """Number of jobs first seen at or after `since`"""
+        sql, params = "SELECT COUNT(*) FROM jobs WHERE first_seen >= ?", [since]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def search(self, text, source=None, limit=None):
+        """Jobs whose title or organisation contains text, most recently seen first"""
+        where, params = ["(title LIKE ? OR organization LIKE ?)"], [f"%{text}%", f"%{text}%"]
+        if source:
+            where.append("source = ?")
+            params.append(source)
+        return self._select(where, params, "last_seen DESC", limit)
+
+    def history(self, job_url):
+        """Every sighting of job_url (any source): seen_at, run_id, content_hash, source"""
+        return [dict(row) for row in self.conn.execute("""
+            SELECT s.seen_at, s.run_id, s.content_hash, j.source FROM sightings s JOIN jobs j ON j.id = s.job_id
+            WHERE j.job_url = ? ORDER BY s.seen_at
+        """, (canonical_url(job_url),))]
+
+    def stats(self):
+        """Per source: jobs, sightings, first and last sighting"""
+        return [dict(row) for row in self.conn.execute("""
+            SELECT source, COUNT(*) AS jobs, SUM(sightings) AS sightings,
+                   MIN(first_seen) AS first_seen, MAX(last_seen) AS last_seen
+            FROM jobs GROUP BY source ORDER BY source
+        """)]
+
+    def close(self):
+        self.conn.close()
+
+
+def print_rows(rows, fmt='table'):
+    if fmt == 'json':
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    if not rows:
+        print("No jobs found")
+        return
+    if fmt == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    columns = list(rows[0])
+    widths = {c: min(60, max(len(c), *(len(str(r[c] if r[c] is not None else '')) for r in rows))) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print('  '.join(str(row[c] if row[c] is not None else '')[:widths[c]].ljust(widths[c]) for c in columns))
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--db', help='store file (default: JOB_STORE_DB or jobs.db)')
+    common.add_argument('--format', choices=('table', 'json', 'csv'), default='table')
+    parser = argparse.ArgumentParser(description="Query the historical job store")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    open_cmd = commands.add_parser('open', parents=[common], help='jobs with a deadline in the next N days')
+    open_cmd.add_argument('--days', type=int, default=7)
+    new_cmd = commands.add_parser('new', parents=[common], help='jobs first seen since a timestamp')
+    new_cmd.add_argument('--since', required=True, help="'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'")
+    search_cmd = commands.add_parser('search', parents=[common], help='jobs whose title or organisation contains text')
+    search_cmd.add_argument('text')
+    for command in (open_cmd, new_cmd, search_cmd):
+        command.add_argument('--source', help='bdgovtjob or bdjobs_hot_jobs')
+        command.add_argument('--limit', type=int)
+    history_cmd = commands.add_parser('history', parents=[common], help='every sighting of one job')
+    history_cmd.add_argument('job_url')
+    commands.add_parser('stats', parents=[common], help='jobs and sightings per source')
+    args = parser.parse_args()
+
+    store = JobStore(args.db)
+    try:
+        if args.command == 'open':
+            rows = store.open_jobs(args.days, source=args.source, limit=args.limit)
+        elif args.command == 'new':
+            rows = store.new_since(args.since, source=args.source, limit=args.limit)
+        elif args.command == 'search':
+            rows = store.search(args.text, source=args.source, limit=args.limit)
+        elif args.command == 'history':
+            rows = store.history(args.job_url)
+        else:
+            rows = store.stats()
+        print_rows(rows, args.format)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
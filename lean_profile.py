@@ -0,0 +1,177 @@
+"""
+"Lean" Chrome profile for scraping.
+
+We only read text and attribute strings, so images, web fonts, media and ad /
+analytics scripts are pure overhead on every page load. A LeanProfile turns
+them off: launch options (image loading disabled, `eager` page-load strategy)
+plus per-session CDP URL blocking by resource type and domain pattern.
+NetworkStats reads the CDP Network events of a run to report how many
+requests were blocked and roughly how many bytes that saved.
+"""
+import json
+import os
+import threading
+from collections import Counter
+
+# URL patterns (Network.setBlockedURLs wildcards) per resource type
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.ogg*', '*.m3u8*'],
+    'stylesheet': ['*.css*'],
+}
+
+# Ad, analytics and tracker hosts seen on the scraped sites
+DEFAULT_BLOCKED_DOMAINS = [
+    '*googletagmanager.com*',
+    '*google-analytics.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*adservice.google.com*',
+    '*googleadservices.com*',
+    '*connect.facebook.net*',
+    '*hotjar.com*',
+    '*clarity.ms*',
+    '*scorecardresearch.com*',
+    '*adnxs.com*',
+    '*taboola.com*',
+    '*outbrain.com*',
+]
+
+# Typical transfer size per CDP resource type, used to estimate bytes saved
+# by requests that were blocked (and therefore never measured)
+TYPICAL_BYTES = {
+    'Image': 25_000,
+    'Font': 35_000,
+    'Media': 500_000,
+    'Script': 30_000,
+    'Stylesheet': 15_000,
+}
+DEFAULT_TYPICAL_BYTES = 10_000
+
+
+def _env(prefix, name, default=None):
+    """Per-scraper env var (e.g. HOT_JOBS_LEAN_PROFILE) falling back to the global one"""
+    return os.environ.get(prefix + name, os.environ.get(name, default))
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class LeanProfile:
+    """Which resources a scraper's browser should not load"""
+
+    def __init__(self, enabled=True, block_types=('image', 'font', 'media'), block_domains=None,
+                 disable_images=True, page_load_strategy='eager'):
+        self.enabled = enabled
+        self.block_types = tuple(block_types)
+        self.block_domains = list(DEFAULT_BLOCKED_DOMAINS if block_domains is None else block_domains)
+        self.disable_images = disable_images
+        self.page_load_strategy = page_load_strategy
+
+    @classmethod
+    def from_env(cls, prefix=''):
+        """
+        Profile configured by environment variables, optionally per scraper:
+        LEAN_PROFILE=0 turns it off, LEAN_BLOCK_TYPES=image,font,media,
+        LEAN_BLOCK_DOMAINS adds domain patterns, PAGE_LOAD_STRATEGY=eager.
+        Prefix them (HOT_JOBS_, GOVT_JOBS_) to configure one scraper only.
+        """
+        if _env(prefix, 'LEAN_PROFILE', '1') == '0':
+            return cls(enabled=False, block_types=(), block_domains=[], disable_images=False,
+                       page_load_strategy=_env(prefix, 'PAGE_LOAD_STRATEGY', 'normal'))
+
+        block_types = _split(_env(prefix, 'LEAN_BLOCK_TYPES', 'image,font,media'))
+        return cls(
+            block_types=block_types,
+            block_domains=DEFAULT_BLOCKED_DOMAINS + _split(_env(prefix, 'LEAN_BLOCK_DOMAINS', '')),
+            disable_images='image' in block_types,
+            page_load_strategy=_env(prefix, 'PAGE_LOAD_STRATEGY', 'eager'),
+        )
+
+    @property
+    def launch_key(self):
+        """Launch-time settings; sessions can only be shared between equal keys"""
+        return (self.disable_images, self.page_load_strategy)
+
+    def apply_options(self, options):
+        """Set the launch-time part of the profile on Chrome options"""
+        options.page_load_strategy = self.page_load_strategy
+        if self.disable_images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option(
+                'prefs', {'profile.managed_default_content_settings.images': 2}
+            )
+        return options
+
+    def url_patterns(self):
+        if not self.enabled:
+            return []
+        patterns = []
+        for resource_type in self.block_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+        return patterns + self.block_domains
+
+    def apply_session(self, driver):
+        """Install this profile's URL blocklist on a (possibly reused) session"""
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.url_patterns()})
+
+
+class NetworkStats:
+    """Requests, bytes and blocked requests of a run, from CDP Network events"""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes_transferred = 0
+        self.blocked = Counter()
+        self._types = {}
+        self._lock = threading.Lock()
+
+    def consume(self, messages):
+        """Account a batch of CDP messages ({'method': ..., 'params': ...})"""
+        with self._lock:
+            for message in messages:
+                method = message.get('method', '')
+                params = message.get('params', {})
+                if method == 'Network.requestWillBeSent':
+                    self.requests += 1
+                    self._types[params.get('requestId')] = params.get('type', 'Other')
+                elif method == 'Network.loadingFinished':
+                    self.bytes_transferred += int(params.get('encodedDataLength') or 0)
+                elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                    resource_type = params.get('type') or self._types.get(params.get('requestId'), 'Other')
+                    self.blocked[resource_type] += 1
+
+    def collect(self, driver):
+        """Drain the driver's performance log into these stats"""
+        try:
+            if 'performance' not in driver.log_types:
+                return
+            entries = driver.get_log('performance')
+        except Exception:
+            return
+        self.consume(json.loads(entry['message'])['message'] for entry in entries)
+
+    def report(self):
+        with self._lock:
+            blocked = dict(self.blocked)
+            saved = sum(TYPICAL_BYTES.get(t, DEFAULT_TYPICAL_BYTES) * n for t, n in blocked.items())
+            return {
+                'requests': self.requests,
+                'bytes_transferred': self.bytes_transferred,
+                'requests_blocked': sum(blocked.values()),
+                'blocked_by_type': blocked,
+                'estimated_bytes_saved': saved,
+            }
+
+    def print_report(self):
+        r = self.report()
+        if not r['requests']:
+            return
+        print(f"🪶 Network: {r['requests']} requests, {r['bytes_transferred'] / 1024:.0f} KB transferred")
+        if r['requests_blocked']:
+            by_type = ', '.join(f"{t}: {n}" for t, n in sorted(r['blocked_by_type'].items()))
+            print(f"   Blocked {r['requests_blocked']} requests ({by_type}), "
+                  f"~{r['estimated_bytes_saved'] / 1024:.0f} KB saved")
@@ -0,0 +1,250 @@
+"""
+Per-phase timing and resource metrics of a scrape run.
+
+A Metrics object times the phases of a run (driver startup, page load,
+readiness wait, extraction, serialization, API POST, detail enrichment), counts WebDriver
+commands and records gauges such as Chrome's memory. Every timing is
+appended to a JSON-lines file as it happens, a run summary line is written
+when the run ends, and optionally the totals are written in Prometheus text
+format for node_exporter's textfile collector - enough to tell whether a slow
+run was spent in Chrome, on the site or on the API.
+
+    metrics = Metrics('bdgovtjob')
+    with metrics.timer('page_load', page=3):
+        engine.load(url)
+    metrics.close(jobs=120)
+
+The JSON-lines file is rotated when a run starts writing to it and it has
+grown past METRICS_MAX_MB (metrics.jsonl -> metrics.jsonl.1 -> ... up to
+METRICS_BACKUPS files), so scheduled runs do not fill the disk.
+
+Usage:
+    METRICS_FILE=metrics.jsonl python bdgovtjob.py            # default; '' disables
+    METRICS_MAX_MB=20 METRICS_BACKUPS=3 python bdgovtjob.py   # rotation (0 MB: never rotate)
+    METRICS_PROM_FILE=/var/lib/node_exporter/{source}.prom python bdgovtjob.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Phase names used by the scrapers
+DRIVER_STARTUP = 'driver_startup'
+PAGE_LOAD = 'page_load'
+READINESS_WAIT = 'readiness_wait'
+EXTRACTION = 'extraction'
+SERIALIZATION = 'serialization'
+API_POST = 'api_post'
+ENRICHMENT = 'enrichment'
+
+
+def peak_rss_mb():
+    """Peak resident memory of this Python process in MB, or None where it is not available (Windows)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def rotate(path, max_bytes, backups):
+    """Shift path to path.1 (path.1 to path.2, ...) once it is max_bytes or larger; True if rotated"""
+    try:
+        if not max_bytes or os.path.getsize(path) < max_bytes:
+            return False
+        for n in range(backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{n}"):
+                os.replace(f"{path}.{n}", f"{path}.{n + 1}")
+        if backups:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+    except OSError:
+        # Missing, or rotated by another process at the same time
+        return False
+    return True
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _prom_labels(labels):
+    return '{' + ','.join(f'{k}="{str(v)}"' for k, v in labels) + '}'
+
+
+class Metrics:
+    """Timers, counters and gauges of one run of one source (thread-safe)"""
+
+    def __init__(self, source, path=None, prom_path=None):
+        self.source = source
+        self.run_id = uuid.uuid4().hex[:12]
+        self.path = os.environ.get('METRICS_FILE', 'metrics.jsonl') if path is None else path
+        # Rotate the file past this size, keeping this many old files
+        self.max_bytes = float(os.environ.get('METRICS_MAX_MB', 20)) * 1024 * 1024
+        self.backups = int(os.environ.get('METRICS_BACKUPS', 3))
+        prom_path = os.environ.get('METRICS_PROM_FILE', '') if prom_path is None else prom_path
+        # One file per source when the path contains {source}
+        self.prom_path = prom_path.format(source=source) if prom_path else ''
+        self.started = time.time()
+        # phase -> [count, total seconds, max seconds]
+        self.phases = {}
+        self.counters = Counter()
+        self.gauges = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _write(self, event):
+        if not self.path:
+            return
+        line = json.dumps({'ts': round(time.time(), 3), 'run': self.run_id, 'source': self.source, **event},
+                          ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                rotate(self.path, self.max_bytes, self.backups)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    @contextmanager
+    def timer(self, phase, **labels):
+        """Time the enclosed block as one occurrence of phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start, **labels)
+
+    def timed_iter(self, iterable, phase, **labels):
+        """
+        Yield from iterable, timing only the time spent producing items (not
+        the caller's work in between); recorded once, when it is exhausted
+        """
+        spent = 0.0
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                spent += time.perf_counter() - start
+            yield item
+        self.observe(phase, spent, **labels)
+
+    def observe(self, phase, seconds, **labels):
+        """Record one occurrence of phase that took seconds"""
+        with self._lock:
+            count, total, longest = self.phases.get(phase, (0, 0.0, 0.0))
+            self.phases[phase] = [count + 1, total + seconds, max(longest, seconds)]
+        self._write({'type': 'timer', 'phase': phase, 'seconds': round(seconds, 4), **labels})
+
+    def count(self, name, n=1, **labels):
+        """Add n to a counter (aggregated; written with the run summary)"""
+        with self._lock:
+            self.counters[(name, _label_key(labels))] += n
+
+    def gauge(self, name, value, **labels):
+        """Record the current value of something, e.g. Chrome's RSS"""
+        if value is None:
+            return
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+        self._write({'type': 'gauge', 'name': name, 'value': value, **labels})
+
+    def summary(self):
+        with self._lock:
+            phases = {
+                phase: {'count': count, 'seconds': round(total, 3), 'max_seconds': round(longest, 3)}
+                for phase, (count, total, longest) in self.phases.items()
+            }
+            counters = {}
+            for (name, labels), value in self.counters.items():
+                key = name + (_prom_labels(labels) if labels else '')
+                counters[key] = value
+        return {'phases': phases, 'counters': counters, 'duration_seconds': round(time.time() - self.started, 3)}
+
+    def close(self, **fields):
+        """End of the run: write the summary line (plus fields, e.g. jobs=) and the Prometheus file"""
+        peak = peak_rss_mb()
+        if peak is not None:
+            self.gauge('python_peak_rss_mb', round(peak, 1))
+        self._write({'type': 'run', **self.summary(), **fields})
+        if self.prom_path:
+            self.write_prometheus(self.prom_path, **fields)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def write_prometheus(self, path, **fields):
+        """Totals of this run in Prometheus text exposition format (atomic replace)"""
+        source = (('source', self.source),)
+        lines = [
+            '# TYPE scraper_phase_seconds_total counter',
+            '# TYPE scraper_phase_count_total counter',
+            '# TYPE scraper_phase_max_seconds gauge',
+        ]
+        with self._lock:
+            for phase, (count, total, longest) in sorted(self.phases.items()):
+                labels = _prom_labels(source + (('phase', phase),))
+                lines.append(f'scraper_phase_seconds_total{labels} {total:.6f}')
+                lines.append(f'scraper_phase_count_total{labels} {count}')
+                lines.append(f'scraper_phase_max_seconds{labels} {longest:.6f}')
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f'scraper_{name}_total{_prom_labels(source + labels)} {value}')
+            for (name, labels), value in sorted(self.gauges.items()):
+                lines.append(f'scraper_{name}{_prom_labels(source + labels)} {value}')
+        for name, value in sorted(fields.items()):
+            if isinstance(value, (int, float)):
+                lines.append(f'scraper_run_{name}{_prom_labels(source)} {value}')
+        lines.append(f'scraper_run_duration_seconds{_prom_labels(source)} {time.time() - self.started:.3f}')
+        lines.append(f'scraper_run_finished_timestamp_seconds{_prom_labels(source)} {time.time():.0f}')
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        s = self.summary()
+        if not s['phases']:
+            return
+        phases = ', '.join(f"{phase} {info['seconds']}s ({info['count']}x)"
+                           for phase, info in sorted(s['phases'].items(), key=lambda item: -item[1]['seconds']))
+        print(f"📈 Phases: {phases}")
+        calls = sum(v for (name, _), v in self.counters.items() if name == 'webdriver_calls')
+        if calls:
+            print(f"   WebDriver calls: {calls}")
+
+
+def instrument_driver(driver, metrics):
+    """
+    Count every WebDriver command driver sends into metrics as
+    webdriver_calls{command=...}. Pooled drivers are instrumented once; a
+    later call only points the counts at the new run's metrics
+    """
+    driver._metrics = metrics
+    if getattr(driver, '_counts_calls', False):
+        return driver
+    execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        current = getattr(driver, '_metrics', None)
+        if current is not None:
+            current.count('webdriver_calls', command=driver_command)
+        return execute(driver_command, params)
+
+    driver.execute = counting_execute
+    driver._counts_calls = True
+    return driver
@@ -0,0 +1,258 @@
+"""
+Durable outbox between scrape runs and the API.
+
+Scrape runs only enqueue their records into a local SQLite outbox, which is
+quick and never touches the network; an OutboxDrainer thread delivers them
+in the background with ApiDelivery. A record leaves the outbox only after
+the API accepted it (at-least-once). Every record has an idempotency key
+derived from its job_url, so re-enqueuing a job replaces the pending copy
+instead of queueing it twice, and each POST carries an Idempotency-Key
+header computed from the keys in the batch. Claimed records are leased to
+the drainer that claimed them (OUTBOX_LEASE_SECONDS), so drainers in other
+threads or processes skip them until they are acked, nacked or the lease
+expires. A record changed while it is leased replaces the claimed copy and
+is released at once; acking or nacking the old copy leaves it queued.
+
+Usage:
+    python outbox.py            # drain continuously
+    python outbox.py --once     # one delivery pass, e.g. from cron
+    python outbox.py --status   # pending records per endpoint
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from delivery import ApiDelivery
+from seen_index import content_hash
+
+
+def idempotency_key(record):
+    """Key identifying a job across runs: its job_url, or its content if it has none"""
+    url = record.get('job_url')
+    basis = f"url:{url}" if url else f"content:{content_hash(record)}"
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+
+class Outbox:
+    """SQLite queue of records waiting to be delivered, per API endpoint"""
+
+    def __init__(self, path=None, lease=None):
+        # Usage: OUTBOX_DB=/var/lib/bdjobs/outbox.db python bd_hot_job_selenium.py
+        self.path = path or os.environ.get('OUTBOX_DB', 'outbox.db')
+        # Seconds a claim holds its records: longer than delivering them may take
+        self.lease = lease or float(os.environ.get('OUTBOX_LEASE_SECONDS', 600))
+        self._lock = threading.Lock()
+        # Drainers in several processes share the database
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    endpoint TEXT NOT NULL,
+                    idempotency_key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    leased_until REAL NOT NULL DEFAULT 0,
+                    UNIQUE (endpoint, idempotency_key)
+                )
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(outbox)")]
+            if 'leased_until' not in columns:
+                # Outboxes created before claims were leased
+                self.conn.execute("ALTER TABLE outbox ADD COLUMN leased_until REAL NOT NULL DEFAULT 0")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (endpoint, next_attempt_at)")
+
+    def enqueue(self, endpoint, records):
+        """
+        Queue records for endpoint; a pending record with the same key is
+        replaced, and released if it was claimed with a different payload
+        """
+        now = time.time()
+        rows = [
+            (endpoint, idempotency_key(r), json.dumps(r, ensure_ascii=False), now, now)
+            for r in records
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO outbox (endpoint, idempotency_key, payload, enqueued_at, next_attempt_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (endpoint, idempotency_key) DO UPDATE SET
+                    leased_until = CASE WHEN payload = excluded.payload THEN leased_until ELSE 0 END,
+                    payload = excluded.payload,
+                    enqueued_at = excluded.enqueued_at,
+                    attempts = 0,
+                    next_attempt_at = excluded.next_attempt_at,
+                    last_error = NULL
+            """, rows)
+        return len(rows)
+
+    def endpoints_due(self):
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT endpoint FROM outbox WHERE next_attempt_at <= ? AND leased_until <= ?", (now, now)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def claim(self, endpoint, limit=500):
+        """
+        Oldest due records of endpoint that nobody else holds, as
+        [(claim, key, record)]; they are leased to the caller until ack(),
+        nack() or `lease` seconds have passed. Pass the claims to ack() and
+        nack(): they only apply while the record is the one claimed
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            # Take the write lock before reading, so no other process claims the same rows
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute("""
+                SELECT id, idempotency_key, payload FROM outbox
+                WHERE endpoint = ? AND next_attempt_at <= ? AND leased_until <= ?
+                ORDER BY id LIMIT ?
+            """, (endpoint, now, now, limit)).fetchall()
+            self.conn.executemany("UPDATE outbox SET leased_until = ? WHERE id = ?",
+                                  [(now + self.lease, row_id) for row_id, _, _ in rows])
+        return [((row_id, payload), key, json.loads(payload)) for row_id, key, payload in rows]
+
+    def ack(self, claims):
+        """Delivered: remove from the outbox, unless re-enqueued with a new payload since the claim"""
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM outbox WHERE id = ? AND payload = ?", claims)
+
+    def nack(self, claims, error, base_delay=60, max_delay=3600):
+        """
+        Failed: keep, and retry after an exponentially growing delay (a record
+        re-enqueued with a new payload since the claim is due now instead)
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                UPDATE outbox SET
+                    attempts = attempts + 1,
+                    last_error = ?,
+                    next_attempt_at = ? + MIN(?, ? * (1 << MIN(attempts, 16))),
+                    leased_until = 0
+                WHERE id = ? AND payload = ?
+            """, [(error, now, max_delay, base_delay, row_id, payload) for row_id, payload in claims])
+
+    def status(self):
+        """{endpoint: {'pending': n, 'failing': n, 'oldest': epoch}}"""
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT endpoint, COUNT(*), SUM(attempts > 0), MIN(enqueued_at)
+                FROM outbox GROUP BY endpoint
+            """).fetchall()
+        return {ep: {'pending': n, 'failing': failing or 0, 'oldest': oldest} for ep, n, failing, oldest in rows}
+
+    def close(self):
+        self.conn.close()
+
+
+class OutboxDrainer(threading.Thread):
+    """Background thread that delivers due outbox records every `interval` seconds"""
+
+    def __init__(self, outbox, interval=None, timeout=60, metrics=None, endpoints=None):
+        super().__init__(name='outbox-drainer', daemon=True)
+        self.outbox = outbox
+        # Only deliver to these endpoints (default: all)
+        self.endpoints = endpoints
+        # Usage: OUTBOX_DRAIN_INTERVAL=30 python bd_hot_job_selenium.py
+        self.interval = interval if interval is not None else float(os.environ.get('OUTBOX_DRAIN_INTERVAL', 30))
+        self.timeout = timeout
+        self.metrics = metrics
+        self._stop_event = threading.Event()
+        self._deliveries = {}
+
+    def delivery_for(self, endpoint):
+        if endpoint not in self._deliveries:
+            # Few in-call retries: records that still fail wait in the outbox instead
+            self._deliveries[endpoint] = ApiDelivery(endpoint, timeout=self.timeout, max_retries=1,
+                                                      metrics=self.metrics)
+        return self._deliveries[endpoint]
+
+    def drain_once(self):
+        """Deliver everything currently due; returns (delivered, failed) record counts"""
+        delivered = failed = 0
+        for endpoint in self.outbox.endpoints_due():
+            if self.endpoints is not None and endpoint not in self.endpoints:
+                continue
+            delivery = self.delivery_for(endpoint)
+            claimed = self.outbox.claim(endpoint)
+            while claimed:
+                records = [record for _, _, record in claimed]
+                # Unchanged since the endpoint last accepted them: nothing to send
+                fresh = delivery.ledger.filter_fresh(records) if delivery.ledger is not None else records
+                fresh_keys = {idempotency_key(r) for r in fresh}
+                self.outbox.ack([claim for claim, key, _ in claimed if key not in fresh_keys])
+
+                claims_by_key = {key: claim for claim, key, _ in claimed}
+                for batch in delivery.split_batches(fresh):
+                    keys = sorted(idempotency_key(r) for r in batch)
+                    batch_key = hashlib.sha1(''.join(keys).encode('utf-8')).hexdigest()
+                    claims = [claims_by_key[k] for k in keys]
+                    try:
+                        delivery.post_batch(batch, idempotency_key=batch_key)
+                    except Exception as e:
+                        self.outbox.nack(claims, str(e))
+                        failed += len(batch)
+                        print(f"⚠ Outbox: {len(batch)} records for {endpoint} not delivered ({e}), will retry")
+                        continue
+                    if delivery.ledger is not None:
+                        delivery.ledger.mark_seen(batch)
+                    self.outbox.ack(claims)
+                    delivered += len(batch)
+                claimed = self.outbox.claim(endpoint)
+        if delivered or failed:
+            print(f"📬 Outbox: delivered {delivered}, failed {failed}")
+        return delivered, failed
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.drain_once()
+            except Exception as e:
+                print(f"⚠ Outbox drainer error: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver queued jobs from the outbox")
+    parser.add_argument('--once', action='store_true', help='one delivery pass, then exit')
+    parser.add_argument('--status', action='store_true', help='show pending records and exit')
+    args = parser.parse_args()
+
+    outbox = Outbox()
+    if args.status:
+        for endpoint, info in outbox.status().items():
+            print(f"{endpoint}: {info['pending']} pending, {info['failing']} failing")
+        return
+
+    drainer = OutboxDrainer(outbox)
+    if args.once:
+        drainer.drain_once()
+        return
+
+    print(f"Outbox drainer started: every {drainer.interval}s")
+    drainer.start()
+    try:
+        while drainer.is_alive():
+            drainer.join(1)
+    except KeyboardInterrupt:
+        drainer.stop()
+        print("Outbox drainer stopped")
+
+
+if __name__ == "__main__":
+    main()
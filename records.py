@@ -0,0 +1,294 @@
+"""
+Typed, normalized job records.
+
+The scrapers emit plain dicts of display strings ('N/A', '25 November 2025 at
+5:00 PM', '65'), which is also what the CSV/JSON files and the API receive.
+GovtJob and HotJob are the typed view of those dicts: parsed dates (English
+or Bengali numerals and month names), integer vacancies, a canonical job_url
+and a stable content hash. They are slotted dataclasses, so a list of them
+takes a fraction of the memory of the same dicts, and comparing two records
+is a hash comparison.
+
+    job = GovtJob.from_dict(record)
+    job.vacancies, job.deadline, job.content_hash
+    write_records([job, ...], 'bdgovtjob_typed.parquet')
+
+Typed rows (ISO dates, integers) can be written as JSON Lines, CSV or Parquet
+(Parquet needs pyarrow: pip install pyarrow).
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+import typing
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+MISSING = ('', 'N/A', 'n/a', 'None', None)
+
+BENGALI_DIGITS = str.maketrans('০১২৩৪৫৬৭৮৯', '0123456789')
+
+MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    # Bengali month names, with the common spelling variants
+    'জানুয়ারি': 1, 'জানুয়ারী': 1, 'ফেব্রুয়ারি': 2, 'ফেব্রুয়ারী': 2, 'মার্চ': 3, 'এপ্রিল': 4,
+    'মে': 5, 'জুন': 6, 'জুলাই': 7, 'আগস্ট': 8, 'আগষ্ট': 8, 'সেপ্টেম্বর': 9, 'অক্টোবর': 10,
+    'নভেম্বর': 11, 'ডিসেম্বর': 12,
+}
+
+# "25 November 2025", "3 November, 2025", "২৫ নভেম্বর ২০২৫"
+# (month names as "anything but digits and separators": Bengali vowel signs are not \w)
+DAY_MONTH_YEAR = re.compile(r'(\d{1,2})(?:st|nd|rd|th)?\s+([^\s\d,.]+)\.?,?\s+(\d{4})')
+# "November 25, 2025"
+MONTH_DAY_YEAR = re.compile(r'([^\s\d,.]+)\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})')
+# "2025-11-25"
+YEAR_MONTH_DAY = re.compile(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})')
+# "25-11-2025", "25/11/2025" (day first, as written in Bangladesh)
+NUMERIC_DAY_FIRST = re.compile(r'(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})')
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|ref|mc_cid|mc_eid)$', re.I)
+
+
+def _make_date(year, month, day):
+    try:
+        return date(int(year), int(month), int(day))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_date(text):
+    """First date in text (English or Bengali), or None"""
+    if text in MISSING:
+        return None
+    text = str(text).translate(BENGALI_DIGITS)
+    # Zero-width (non-)joiners sometimes sit inside Bengali month names
+    text = text.replace('\u200c', '').replace('\u200d', '')
+
+    for match in DAY_MONTH_YEAR.finditer(text):
+        month = MONTHS.get(match.group(2).lower())
+        if month:
+            return _make_date(match.group(3), month, match.group(1))
+    for match in MONTH_DAY_YEAR.finditer(text):
+        month = MONTHS.get(match.group(1).lower())
+        if month:
+            return _make_date(match.group(3), month, match.group(2))
+    match = YEAR_MONTH_DAY.search(text)
+    if match:
+        return _make_date(*match.groups())
+    match = NUMERIC_DAY_FIRST.search(text)
+    if match:
+        return _make_date(match.group(3), match.group(2), match.group(1))
+    return None
+
+
+def parse_datetime(text, fmt="%Y-%m-%d %H:%M:%S"):
+    """Timestamp written by the scrapers (scraped_at / scraped_date), or None"""
+    if text in MISSING:
+        return None
+    try:
+        return datetime.strptime(str(text), fmt)
+    except ValueError:
+        return None
+
+
+def parse_int(text):
+    """First whole number in text ("65", "১২৫ জন", "1,200 posts"), or None"""
+    if text in MISSING:
+        return None
+    if isinstance(text, int):
+        return text
+    match = re.search(r'\d[\d,]*', str(text).translate(BENGALI_DIGITS))
+    return int(match.group().replace(',', '')) if match else None
+
+
+def canonical_url(url):
+    """
+    job_url in one canonical spelling: lower-case scheme and host, no default
+    port, fragment or tracking parameters, remaining parameters sorted
+    """
+    if url in MISSING:
+        return ''
+    parts = urlsplit(str(url).strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def _text(value):
+    return '' if value in MISSING else ' '.join(str(value).split())
+
+
+def _row_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    return value
+
+
+class JobRecord:
+    """Shared behaviour of the typed records (subclasses are slotted dataclasses)"""
+
+    __slots__ = ()
+
+    # Fields that change on every scrape and are left out of content_hash
+    VOLATILE = ()
+
+    def to_row(self):
+        """Typed values as JSON/CSV friendly scalars (ISO dates, ints, None)"""
+        return {f.name: _row_value(getattr(self, f.name)) for f in fields(self)}
+
+    @property
+    def content_hash(self):
+        """Stable hash of the normalized content (scrape time excluded)"""
+        row = {k: v for k, v in self.to_row().items() if k not in self.VOLATILE}
+        payload = json.dumps(row, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass(slots=True)
+class GovtJob(JobRecord):
+    """One bdgovtjob.net circular"""
+
+    VOLATILE = ('scraped_at',)
+
+    job_title: str
+    job_url: str
+    vacancies: int | None
+    deadline: date | None
+    posted_date: date | None
+    scraped_at: datetime | None
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(
+            job_title=_text(record.get('job_title')),
+            job_url=canonical_url(record.get('job_url')),
+            vacancies=parse_int(record.get('vacancies')),
+            deadline=parse_date(record.get('deadline')),
+            posted_date=parse_date(record.get('posted_date')),
+            scraped_at=parse_datetime(record.get('scraped_at')),
+        )
+
+
+@dataclass(slots=True)
+class HotJob(JobRecord):
+    """One job link of a bdjobs.com Hot Jobs card"""
+
+    VOLATILE = ('scraped_date',)
+
+    company_name: str
+    company_logo_url: str
+    position: str
+    job_url: str
+    scraped_date: datetime | None
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(
+            company_name=_text(record.get('company_name')),
+            company_logo_url=_text(record.get('company_logo_url')),
+            position=_text(record.get('position')),
+            job_url=canonical_url(record.get('job_url')),
+            scraped_date=parse_datetime(record.get('scraped_date')),
+        )
+
+
+def _arrow_schema(record_type):
+    """Parquet schema of record_type: int64, date32 and timestamp columns for the parsed fields"""
+    import pyarrow as pa
+
+    columns = []
+    for f in fields(record_type):
+        kinds = typing.get_args(f.type) or (f.type,)
+        if datetime in kinds:
+            arrow_type = pa.timestamp('s')
+        elif date in kinds:
+            arrow_type = pa.date32()
+        elif int in kinds:
+            arrow_type = pa.int64()
+        else:
+            arrow_type = pa.string()
+        columns.append(pa.field(f.name, arrow_type))
+    return pa.schema(columns)
+
+
+class RecordWriter:
+    """
+    Batch writer of typed records to .jsonl, .csv or .parquet (picked by the
+    file extension). write_batch() can be called repeatedly; Parquet gets one
+    row group per batch
+    """
+
+    FORMATS = ('.jsonl', '.csv', '.parquet')
+
+    def __init__(self, filename, record_type):
+        self.filename = filename
+        self.record_type = record_type
+        self.format = os.path.splitext(filename)[1].lower()
+        if self.format not in self.FORMATS:
+            raise ValueError(f"Unsupported output '{filename}', use one of {', '.join(self.FORMATS)}")
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write_batch(self, records):
+        if not records:
+            return
+        if self.format == '.parquet':
+            self._write_parquet(records)
+        else:
+            if self._file is None:
+                self._file = open(self.filename, 'w', newline='', encoding='utf-8')
+            rows = [record.to_row() for record in records]
+            if self.format == '.jsonl':
+                self._file.write(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+            else:
+                if self._writer is None:
+                    self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0]), lineterminator=os.linesep)
+                    self._writer.writeheader()
+                self._writer.writerows(rows)
+        self.count += len(records)
+
+    def _write_parquet(self, records):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from None
+        schema = _arrow_schema(self.record_type)
+        columns = {name: [getattr(record, name) for record in records] for name in schema.names}
+        table = pa.Table.from_pydict(columns, schema=schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.filename, schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self.format == '.parquet':
+            if self._writer is not None:
+                self._writer.close()
+        elif self._file is not None:
+            self._file.close()
+        self._file = None
+        self._writer = None
+
+
+def write_records(records, filename):
+    """Write a list of typed records to filename in one go; returns the count"""
+    records = list(records)
+    if not records:
+        return 0
+    writer = RecordWriter(filename, type(records[0]))
+    try:
+        writer.write_batch(records)
+    finally:
+        writer.close()
+    return writer.count
@@ -1,6 +1,6 @@
 #!/bin/bash
 # Run both BDJobs and BD Govt Job scrapers
-# This script runs both scrapers sequentially
+# Both run in parallel, one process each (see runner.py)
 
 echo "╔════════════════════════════════════════════════════════════╗"
 echo "║          RUNNING ALL JOB SCRAPERS                          ║"
@@ -21,30 +21,39 @@ else
 fi
 
 echo ""
-echo "═══════════════════════════════════════════════════════════"
-echo "1/2: Scraping BDJobs.com (Private Sector Jobs)"
-echo "═══════════════════════════════════════════════════════════"
+echo "Scraping BDJobs.com (Private Sector Jobs) and BDGovtJob.net (Government Jobs) in parallel"
 echo ""
 
-# Run BDJobs scraper
-RUN_ONCE=1 $PYTHON bd_hot_job_selenium.py
+# BDJobs: CSV only (bdjobs_hot_jobs.csv), as this script always did; the
+# runner's hot_jobs source would also deliver the jobs to the API
+RUN_ONCE=1 $PYTHON bd_hot_job_selenium.py &
+HOT_JOBS_PID=$!
 
-echo ""
-echo "═══════════════════════════════════════════════════════════"
-echo "2/2: Scraping BDGovtJob.net (Government Jobs)"
-echo "═══════════════════════════════════════════════════════════"
-echo ""
+# BD Govt Job in parallel (10 pages, see runner.py); extra arguments go to
+# runner.py (e.g. --log-dir logs)
+GOVT_JOBS_STATUS=0
+$PYTHON runner.py --sources govt_jobs "$@" || GOVT_JOBS_STATUS=$?
 
-# Run BD Govt Job scraper (10 pages by default)
-MAX_PAGES=10 $PYTHON bdgovtjob.py
+HOT_JOBS_STATUS=0
+wait "$HOT_JOBS_PID" || HOT_JOBS_STATUS=$?
 
 echo ""
+if [ "$HOT_JOBS_STATUS" -ne 0 ] || [ "$GOVT_JOBS_STATUS" -ne 0 ]; then
+    echo "╔════════════════════════════════════════════════════════════╗"
+    echo "║               SOME SCRAPERS FAILED! ❌                      ║"
+    echo "╚════════════════════════════════════════════════════════════╝"
+    echo ""
+    [ "$HOT_JOBS_STATUS" -ne 0 ] && echo "   - BDJobs scraper exited with status $HOT_JOBS_STATUS"
+    [ "$GOVT_JOBS_STATUS" -ne 0 ] && echo "   - BD Govt Job scraper exited with status $GOVT_JOBS_STATUS"
+    exit 1
+fi
+
 echo "╔════════════════════════════════════════════════════════════╗"
 echo "║               ALL SCRAPERS COMPLETED! ✅                    ║"
 echo "╚════════════════════════════════════════════════════════════╝"
 echo ""
 echo "📊 Output Files:"
-echo "   - bdjobs_hot_jobs_latest.csv     (Private sector jobs)"
+echo "   - bdjobs_hot_jobs.csv            (Private sector jobs)"
 echo "   - bdgovtjob_data.csv             (Government jobs)"
 echo "   - bdgovtjob_data.json            (Government jobs)"
 echo ""
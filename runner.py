@@ -0,0 +1,320 @@
+"""
+Run every job source from one entry point.
+
+Sources are listed in a registry (SOURCES) and each run executes in its own
+worker process, so the hot-jobs scraper and the government-jobs crawl work in
+parallel - with their own Chrome and their own memory - and a run of both
+takes about as long as the slower one. Every source has its own schedule and
+a limit on how many of its runs may overlap; a combined report with the job
+count, duration and status of every source is printed after each pass.
+
+Usage:
+    python runner.py                         # run all sources once, in parallel
+    python runner.py --sources govt_jobs     # only some sources
+    python runner.py --schedule              # keep running each source on its own interval
+    python runner.py --schedule --adaptive   # intervals follow each source's rate of new jobs
+    python runner.py --list                  # show the registry
+
+cli.py offers the same per source (scrape / deliver / schedule / benchmark).
+
+Per-source settings use the source's env prefix, e.g.
+    HOT_JOBS_INTERVAL_MINUTES=60 GOVT_JOBS_INTERVAL_MINUTES=480 python runner.py --schedule
+    GOVT_JOBS_MAX_INSTANCES=1 python runner.py --schedule
+    HOT_JOBS_MIN_INTERVAL_MINUTES=15 HOT_JOBS_MAX_INTERVAL_MINUTES=240 python runner.py --schedule --adaptive
+    SCHEDULE_JITTER_SECONDS=60 python runner.py --schedule
+"""
+import argparse
+import contextlib
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+# Random delay added to every scheduled start, so runs do not start in lockstep
+JITTER_SECONDS = int(os.environ.get('SCHEDULE_JITTER_SECONDS', 30))
+
+
+class Source:
+    """
+    A registered job source. target is 'module:function'; the function runs
+    one complete scrape (save + deliver) and returns the number of jobs.
+    endpoint is 'module:attribute' of the API URL the source delivers to.
+    store_source is the source's name in the job store (job_store.py), used
+    to count its new jobs in adaptive mode
+    """
+
+    def __init__(self, name, target, env_prefix, interval_minutes, max_instances=1, env=None,
+                 min_interval_minutes=None, max_interval_minutes=None, store_source=None, endpoint=None):
+        self.name = name
+        self.target = target
+        self.endpoint = endpoint
+        self.env_prefix = env_prefix
+        self.interval_minutes = float(os.environ.get(env_prefix + 'INTERVAL_MINUTES', interval_minutes))
+        # Bounds of the interval in adaptive mode
+        self.min_interval_minutes = float(os.environ.get(env_prefix + 'MIN_INTERVAL_MINUTES',
+                                                         min_interval_minutes or self.interval_minutes / 4))
+        self.max_interval_minutes = float(os.environ.get(env_prefix + 'MAX_INTERVAL_MINUTES',
+                                                         max_interval_minutes or self.interval_minutes * 4))
+        self.store_source = store_source
+        # Overlapping runs of this source allowed in scheduled mode
+        self.max_instances = int(os.environ.get(env_prefix + 'MAX_INSTANCES', max_instances))
+        # Defaults for the worker process; variables already set win
+        self.env = env or {}
+
+
+SOURCES = {}
+
+
+def register_source(name, target, env_prefix, interval_minutes, max_instances=1, env=None,
+                    min_interval_minutes=None, max_interval_minutes=None, store_source=None, endpoint=None):
+    """Add a source to the registry"""
+    SOURCES[name] = Source(name, target, env_prefix, interval_minutes, max_instances, env,
+                           min_interval_minutes, max_interval_minutes, store_source, endpoint)
+    return SOURCES[name]
+
+
+register_source('hot_jobs', 'bd_hot_job_selenium:job_runner', 'HOT_JOBS_', interval_minutes=60,
+                min_interval_minutes=15, max_interval_minutes=240, store_source='bdjobs_hot_jobs',
+                endpoint='bd_hot_job_selenium:HOT_JOBS_API_URL')
+register_source('govt_jobs', 'bdgovtjob:main', 'GOVT_JOBS_', interval_minutes=480, env={'MAX_PAGES': '10'},
+                min_interval_minutes=60, max_interval_minutes=1440, store_source='bdgovtjob',
+                endpoint='bdgovtjob:API_URL')
+
+
+def resolve(reference):
+    """The object a 'module:attribute' reference names (the module is imported only now)"""
+    module_name, attribute = reference.split(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def run_source(name, target, env, log_dir=None):
+    """Worker process entry point: run one source and return its report"""
+    for key, value in env.items():
+        os.environ.setdefault(key, value)
+
+    report = {'source': name, 'started': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+              'status': 'ok', 'jobs': 0, 'error': None}
+    start = time.perf_counter()
+    log = open(os.path.join(log_dir, f"{name}.log"), 'a', encoding='utf-8') if log_dir else None
+    try:
+        with contextlib.redirect_stdout(log) if log else contextlib.nullcontext():
+            jobs = resolve(target)()
+        report['jobs'] = jobs or 0
+    except BaseException as e:
+        report['status'] = 'failed'
+        report['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if log:
+            log.close()
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+class Runner:
+    """Executes registered sources in a process pool"""
+
+    def __init__(self, sources, log_dir=None, model=None, drains_outbox=False):
+        self.sources = sources
+        self.log_dir = log_dir
+        # The runner delivers the outbox itself, so sources only queue their jobs
+        self.env = {'OUTBOX_INLINE_DRAIN': '0'} if drains_outbox else {}
+        # ChangeRateModel in adaptive scheduled mode (see adaptive.py)
+        self.model = model
+        self.scheduler = None
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        # One worker per run that may be in flight at the same time. Fresh
+        # (spawned) interpreters: each source imports only what it needs
+        workers = sum(source.max_instances for source in sources)
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self._running = {source.name: 0 for source in sources}
+        self._lock = threading.Lock()
+
+    def submit(self, source):
+        """Start a run of source unless max_instances runs are already in flight; returns the future or None"""
+        with self._lock:
+            if self._running[source.name] >= source.max_instances:
+                print(f"⏭ {source.name}: {self._running[source.name]} run(s) still in progress, skipping")
+                return None
+            self._running[source.name] += 1
+        future = self.pool.submit(run_source, source.name, source.target, {**self.env, **source.env}, self.log_dir)
+        future.add_done_callback(lambda _: self._finished(source))
+        return future
+
+    def _finished(self, source):
+        with self._lock:
+            self._running[source.name] -= 1
+
+    def run_once(self):
+        """Run every source once, in parallel; returns their reports"""
+        start = time.perf_counter()
+        futures = {}
+        for source in self.sources:
+            future = self.submit(source)
+            if future is not None:
+                futures[future] = source
+        reports = []
+        for future in as_completed(futures):
+            report = self.result(future, futures[future])
+            print(f"✓ {report['source']} finished: {report['status']}, {report['jobs']} jobs in {report['seconds']:.1f}s")
+            reports.append(report)
+        print_report(reports, time.perf_counter() - start)
+        return reports
+
+    @staticmethod
+    def result(future, source):
+        try:
+            return future.result()
+        except Exception as e:
+            # The worker process itself died (e.g. killed for memory)
+            return {'source': source.name, 'status': 'failed', 'jobs': 0, 'seconds': 0.0, 'error': str(e)}
+
+    def run_scheduled(self, source):
+        """Scheduler job: one run of source, reported when it completes"""
+        future = self.submit(source)
+        if future is not None:
+            report = self.result(future, source)
+            print_report([report])
+            if self.model is not None and report['status'] == 'ok':
+                self.adapt(source, report)
+
+    def new_jobs(self, source, report):
+        """Jobs of source first seen during the run of report (its job count without a job store)"""
+        if not source.store_source or os.environ.get('JOB_STORE', '1') == '0':
+            return report['jobs']
+        from job_store import JobStore
+
+        store = JobStore()
+        try:
+            return store.count_new_since(report['started'], source.store_source)
+        finally:
+            store.close()
+
+    def interval(self, source, at=None):
+        """Minutes until source's next run: learned in adaptive mode, else its fixed interval"""
+        if self.model is None:
+            return source.interval_minutes
+        return self.model.next_interval(source.name, at or datetime.now(), source.interval_minutes,
+                                        source.min_interval_minutes, source.max_interval_minutes)
+
+    def adapt(self, source, report):
+        """Record the run's new jobs and reschedule source accordingly"""
+        new_jobs = self.new_jobs(source, report)
+        started = datetime.strptime(report['started'], "%Y-%m-%d %H:%M:%S")
+        self.model.record(source.name, started, new_jobs, source.interval_minutes)
+        minutes = self.interval(source)
+        self.scheduler.reschedule_job(source.name, trigger='interval', minutes=minutes, jitter=JITTER_SECONDS)
+        print(f"🧭 {source.name}: {new_jobs} new jobs, next run in ~{minutes:.0f} minutes")
+
+    def schedule(self):
+        """Run each source now and then every interval (fixed or adaptive), until interrupted"""
+        from apscheduler.schedulers.blocking import BlockingScheduler
+
+        # coalesce: runs missed while busy or asleep collapse into one
+        self.scheduler = BlockingScheduler(job_defaults={'coalesce': True})
+        for source in self.sources:
+            minutes = self.interval(source)
+            self.scheduler.add_job(self.run_scheduled, 'interval', args=[source], id=source.name,
+                                   minutes=minutes, next_run_time=datetime.now(),
+                                   max_instances=source.max_instances, jitter=JITTER_SECONDS)
+            if self.model is not None:
+                print(f"🕒 {source.name}: adaptive, {source.min_interval_minutes:g}-{source.max_interval_minutes:g} "
+                      f"minutes (now {minutes:.0f}; max {source.max_instances} at a time)")
+            else:
+                print(f"🕒 {source.name}: every {minutes:g} minutes (max {source.max_instances} at a time)")
+        self.scheduler.start()
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def print_report(reports, wall_seconds=None):
+    """Combined report of a pass over the sources"""
+    print("\n" + "=" * 60)
+    print(f"📊 RUN REPORT - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+    print(f"{'source':<14} {'status':<8} {'jobs':>6} {'seconds':>9}")
+    for report in sorted(reports, key=lambda r: r['source']):
+        print(f"{report['source']:<14} {report['status']:<8} {report['jobs']:>6} {report['seconds']:>9.1f}")
+        if report['error']:
+            print(f"   ❌ {report['error']}")
+    if wall_seconds is not None and reports:
+        sequential = sum(r['seconds'] for r in reports)
+        print(f"Total: {sum(r['jobs'] for r in reports)} jobs in {wall_seconds:.1f}s "
+              f"(sequential would take ~{sequential:.1f}s)")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sources', help=f"comma separated sources (default: all of {', '.join(SOURCES)})")
+    parser.add_argument('--schedule', action='store_true', help='run each source on its own interval')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='with --schedule: adjust intervals to each source\'s rate of new jobs')
+    parser.add_argument('--log-dir', help='write each source\'s output to <dir>/<source>.log')
+    parser.add_argument('--list', action='store_true', help='list registered sources and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for source in SOURCES.values():
+            print(f"{source.name:<12} {source.target:<32} every {source.interval_minutes:g} min "
+                  f"(adaptive {source.min_interval_minutes:g}-{source.max_interval_minutes:g}), "
+                  f"max {source.max_instances} at a time")
+        return
+
+    names = args.sources.split(',') if args.sources else list(SOURCES)
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        parser.error(f"unknown source(s): {', '.join(unknown)}")
+
+    if args.adaptive and not args.schedule:
+        parser.error("--adaptive needs --schedule")
+
+    reports = run_sources([SOURCES[name] for name in names], schedule=args.schedule, adaptive=args.adaptive,
+                          log_dir=args.log_dir)
+    if any(report['status'] != 'ok' for report in reports):
+        raise SystemExit(1)
+
+
+def run_sources(sources, schedule=False, adaptive=False, log_dir=None):
+    """
+    Run sources once in parallel, then deliver the outbox; or with schedule
+    keep running each on its interval (learned with adaptive) until
+    interrupted. Returns the reports of the single pass
+    """
+    from outbox import Outbox, OutboxDrainer
+
+    model = None
+    if adaptive:
+        from adaptive import ChangeRateModel
+        model = ChangeRateModel()
+    use_outbox = os.environ.get('OUTBOX', '1') != '0'
+    runner = Runner(sources, log_dir=log_dir, model=model, drains_outbox=use_outbox)
+    drainer = None
+    reports = []
+    try:
+        if schedule:
+            if use_outbox:
+                # Sources only queue their jobs; deliver them from here
+                drainer = OutboxDrainer(Outbox())
+                drainer.start()
+                print(f"Outbox drainer started: delivering every {drainer.interval}s")
+            runner.schedule()
+        else:
+            reports = runner.run_once()
+            if use_outbox:
+                OutboxDrainer(Outbox()).drain_once()
+    except KeyboardInterrupt:
+        print("Runner stopped")
+    finally:
+        if drainer is not None:
+            drainer.stop(timeout=5)
+        runner.close()
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Persistent index of already-seen jobs for incremental runs.
+
+Every job is keyed by (source, job_url) and stored with a hash of its
+content fields, so a run can tell new, changed and unchanged records apart
+with one query per page. Scrapers only pass new/changed records on to
+CSV/JSON/API, and bdgovtjob.py stops crawling at the first page made up
+entirely of unchanged jobs (the category is reverse-chronological).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+# Fields that describe when a record was scraped, not what it says
+VOLATILE_FIELDS = ('scraped_at', 'scraped_date')
+# Added by enrichment.py from the detail page; whether a job changed is decided by its listing
+DETAIL_FIELDS = ('organization', 'detail_text', 'circular_pdf_urls')
+
+
+def content_hash(record):
+    """Stable hash of a record's listing content (volatile timestamp and detail fields excluded)"""
+    content = {k: v for k, v in record.items() if k not in VOLATILE_FIELDS and k not in DETAIL_FIELDS}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class SeenIndex:
+    """SQLite-backed job_url -> content hash index, one namespace per source"""
+
+    def __init__(self, source, path=None):
+        # Usage: INCREMENTAL=1 SEEN_INDEX_DB=/var/lib/bdjobs/seen.db python bdgovtjob.py
+        self.source = source
+        self.path = path or os.environ.get('SEEN_INDEX_DB', 'seen_jobs.db')
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_jobs (
+                source TEXT NOT NULL,
+                job_url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_changed TEXT NOT NULL,
+                PRIMARY KEY (source, job_url)
+            )
+        """)
+        self.conn.commit()
+
+    def classify(self, records):
+        """Status (NEW / CHANGED / UNCHANGED) of each record, in order"""
+        urls = [r.get('job_url') for r in records]
+        known = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT job_url, content_hash FROM seen_jobs WHERE source = ? AND job_url IN ({placeholders})",
+                [self.source] + chunk,
+            )
+            known.update(rows)
+
+        statuses = []
+        for record in records:
+            previous = known.get(record.get('job_url'))
+            if previous is None:
+                statuses.append(NEW)
+            elif previous != content_hash(record):
+                statuses.append(CHANGED)
+            else:
+                statuses.append(UNCHANGED)
+        return statuses
+
+    def filter_fresh(self, records):
+        """Only the new or changed records"""
+        return [r for r, status in zip(records, self.classify(records)) if status != UNCHANGED]
+
+    def mark_seen(self, records):
+        """Remember records (call once they have been saved/delivered)"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO seen_jobs (source, job_url, content_hash, first_seen, last_changed)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source, job_url) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    last_changed = excluded.last_changed
+                WHERE seen_jobs.content_hash != excluded.content_hash
+            """, [(self.source, r['job_url'], content_hash(r), now, now) for r in records if r.get('job_url')])
+
+    def __len__(self):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM seen_jobs WHERE source = ?", (self.source,)
+        ).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
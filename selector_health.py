@@ -0,0 +1,222 @@
+"""
+Selector health: notices when bdgovtjob.net changes its markup.
+
+After a theme change the article selector matches nothing, or every field
+comes back 'N/A', and a crawl used to "succeed" anyway - after MAX_PAGES
+page loads - with a CSV full of N/A. SelectorHealth scores every scraped
+page instead:
+
+- coverage:  the share of a page's articles each field (job_title, job_url,
+             vacancies, deadline, posted_date) was extracted for. A field
+             has collapsed on a page when its coverage drops below
+             SELECTOR_MIN_RATIO of its usual coverage, learned from earlier
+             healthy runs. Fields most posts lack are not judged
+- abort:     SiteStructureChanged is raised once fields collapsed on
+             SELECTOR_ABORT_PAGES pages in a row, or straight away when page
+             1 has no articles at all, so the run fails with an alert
+             instead of loading more pages
+- promotion: the engines report which of each field's fallback selectors
+             matched (FIELD_SELECTORS in bdgovtjob.py). The last run's
+             matches are kept per selector and the next run tries the
+             selector that matched most first, so a fallback that took over
+             from the primary becomes the fast primary
+
+Usage:
+    python bdgovtjob.py                                   # on by default
+    SELECTOR_HEALTH=0 python bdgovtjob.py                 # disable
+    SELECTOR_MIN_RATIO=0.5 SELECTOR_ABORT_PAGES=2 SELECTOR_HEALTH_DB=/var/lib/bdjobs/selectors.db python bdgovtjob.py
+"""
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+
+# Fields scored on every page, and their coverage before a healthy run was seen
+FIELDS = ('job_title', 'job_url', 'vacancies', 'deadline', 'posted_date')
+DEFAULT_COVERAGE = {'job_title': 1.0, 'job_url': 1.0, 'vacancies': 0.5, 'deadline': 0.5, 'posted_date': 0.5}
+# Fields with a lower usual coverage are optional on the site and not judged
+MIN_JUDGED_COVERAGE = 0.5
+# Weight of the latest run in the usual coverage
+SMOOTHING = 0.3
+MISSING = ('', 'N/A', None)
+
+
+class SiteStructureChanged(Exception):
+    """Raised when extraction coverage collapsed: the site's markup has most likely changed"""
+
+
+class SelectorHealth:
+    """Per-page field coverage, early abort when it collapses, and fallback selector promotion"""
+
+    def __init__(self, source, path=None, min_ratio=None, abort_pages=None, metrics=None):
+        self.source = source
+        # Usage: SELECTOR_HEALTH_DB=/var/lib/bdjobs/selectors.db python bdgovtjob.py
+        self.path = path or os.environ.get('SELECTOR_HEALTH_DB', 'selector_health.db')
+        # A field collapsed when its coverage is below min_ratio x its usual coverage
+        if min_ratio is None:
+            min_ratio = float(os.environ.get('SELECTOR_MIN_RATIO', 0.5))
+        self.min_ratio = min_ratio
+        # Consecutive pages with collapsed fields before the crawl is aborted
+        self.abort_pages = abort_pages or int(os.environ.get('SELECTOR_ABORT_PAGES', 2))
+        self.metrics = metrics
+        # Sharded crawls open the database from several processes
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS field_coverage (
+                    source TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    coverage REAL NOT NULL,
+                    updated TEXT NOT NULL,
+                    PRIMARY KEY (source, field)
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS selector_matches (
+                    source TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    selector TEXT NOT NULL,
+                    matches INTEGER NOT NULL,
+                    updated TEXT NOT NULL,
+                    PRIMARY KEY (source, field, selector)
+                )
+            """)
+        self.usual = dict(DEFAULT_COVERAGE)
+        self.usual.update(self.conn.execute(
+            "SELECT field, coverage FROM field_coverage WHERE source = ?", (self.source,)
+        ))
+        self.primary = {}
+        self.matches = Counter()
+        self.pages = []
+        self.collapsed_streak = 0
+        self.aborted = False
+        self._lock = threading.Lock()
+
+    def promote(self, selectors):
+        """
+        selectors ({field: ((css, xpath), ...)}) reordered for this run: the
+        selectors that matched most in the last run first, the rest in their
+        given order
+        """
+        self.primary = {field: options[0][0] for field, options in selectors.items()}
+        last_run = {}
+        for field, selector, matches in self.conn.execute(
+                "SELECT field, selector, matches FROM selector_matches WHERE source = ?", (self.source,)):
+            last_run[(field, selector)] = matches
+        promoted = {}
+        for field, options in selectors.items():
+            promoted[field] = tuple(sorted(options, key=lambda option: -last_run.get((field, option[0]), 0)))
+            if promoted[field][0] != options[0]:
+                print(f"🩺 Trying '{promoted[field][0][0]}' first for {field} "
+                      f"(it matched in the last run, '{options[0][0]}' did not)")
+        return promoted
+
+    def check_page(self, page_num, articles, article_selector=None):
+        """
+        Score the field dicts of a page's articles (as returned by the
+        engines' extract_article) and count the selectors they matched.
+        Returns {field: coverage}; raises SiteStructureChanged once fields
+        collapsed on abort_pages pages in a row
+        """
+        if not articles:
+            # Empty pages are the crawl's end-of-listing rule (see no_articles for page 1)
+            return {}
+        coverage = {
+            field: sum(fields.get(field) not in MISSING for fields in articles) / len(articles)
+            for field in FIELDS
+        }
+        collapsed = [
+            field for field in FIELDS
+            if self.usual[field] >= MIN_JUDGED_COVERAGE and coverage[field] < self.min_ratio * self.usual[field]
+        ]
+        with self._lock:
+            if article_selector:
+                self.matches[('article', article_selector)] += 1
+            for fields in articles:
+                for field, selector in (fields.get('selectors') or {}).items():
+                    if selector:
+                        self.matches[(field, selector)] += 1
+            self.pages.append((page_num, coverage, collapsed))
+            self.collapsed_streak = self.collapsed_streak + 1 if collapsed else 0
+            streak = self.collapsed_streak
+
+        if collapsed:
+            print(f"🩺 Page {page_num}: extraction collapsed for " + ", ".join(
+                f"{field} ({coverage[field]:.0%}, usually {self.usual[field]:.0%})" for field in collapsed
+            ))
+        if streak >= self.abort_pages:
+            self.aborted = True
+            raise SiteStructureChanged(
+                f"{', '.join(collapsed)} missing on {streak} pages in a row (last: page {page_num}); "
+                f"the selectors in FIELD_SELECTORS no longer match the site's markup"
+            )
+        return coverage
+
+    def no_articles(self, page_num, selectors):
+        """Page 1 of a listing always has posts: none found means the article selectors broke"""
+        self.aborted = True
+        raise SiteStructureChanged(
+            f"no articles on page {page_num}; none of the article selectors matched: "
+            + ", ".join(f"'{css}'" for css, _ in selectors)
+        )
+
+    def average_coverage(self, healthy_only=False):
+        """{field: mean coverage over the scored pages}"""
+        pages = [coverage for _, coverage, collapsed in self.pages if not (healthy_only and collapsed)]
+        if not pages:
+            return {}
+        return {field: sum(coverage[field] for coverage in pages) / len(pages) for field in FIELDS}
+
+    def fallback_matches(self):
+        """[(field, selector, matches)] of the selectors other than the primary that matched this run"""
+        return sorted(
+            (field, selector, matches) for (field, selector), matches in self.matches.items()
+            if selector != self.primary.get(field)
+        )
+
+    def print_summary(self):
+        if not self.pages:
+            return
+        average = self.average_coverage()
+        collapsed_pages = sum(1 for _, _, collapsed in self.pages if collapsed)
+        print(f"\n🩺 Selector health: {len(self.pages)} pages scored, {collapsed_pages} with collapsed fields")
+        for field in FIELDS:
+            print(f"   {field:<12} {average[field]:>5.0%} extracted (usually {self.usual[field]:.0%})")
+        for field, selector, matches in self.fallback_matches():
+            print(f"   ↪ {field}: fallback '{selector}' matched {matches}x instead of '{self.primary.get(field)}'")
+        if self.metrics is not None:
+            for field, value in average.items():
+                self.metrics.gauge('selector_coverage', round(value, 3), field=field)
+
+    def close(self):
+        """
+        Save this run's selector matches and, unless it was aborted, fold its
+        healthy pages into the usual coverage of every field
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.conn:
+            for field in {field for field, _ in self.matches}:
+                # The last run that saw the field decides the order of its selectors
+                self.conn.execute("DELETE FROM selector_matches WHERE source = ? AND field = ?",
+                                  (self.source, field))
+                self.conn.executemany(
+                    "INSERT INTO selector_matches (source, field, selector, matches, updated) VALUES (?, ?, ?, ?, ?)",
+                    [(self.source, f, selector, matches, now)
+                     for (f, selector), matches in self.matches.items() if f == field]
+                )
+            average = {} if self.aborted else self.average_coverage(healthy_only=True)
+            known = dict(self.conn.execute(
+                "SELECT field, coverage FROM field_coverage WHERE source = ?", (self.source,)
+            ))
+            self.conn.executemany("""
+                INSERT INTO field_coverage (source, field, coverage, updated) VALUES (?, ?, ?, ?)
+                ON CONFLICT (source, field) DO UPDATE SET
+                    coverage = excluded.coverage,
+                    updated = excluded.updated
+            """, [
+                (self.source, field,
+                 value if field not in known else (1 - SMOOTHING) * known[field] + SMOOTHING * value, now)
+                for field, value in average.items()
+            ])
+        self.conn.close()
@@ -0,0 +1,189 @@
+"""
+Sharded crawl of several bdgovtjob.net categories across worker processes.
+
+Each category (government jobs, bank jobs, NGO jobs, defence, ...) is split
+into shards of SHARD_PAGES pages, and the shards are crawled by a pool of
+worker processes, each with its own fetch engine (and Chrome, for the
+Selenium engine). All workers share one politeness limit per host
+(RATE_LIMIT requests/second across the whole pool), so adding workers never
+hits the site harder than a single crawler with the same limit.
+
+When a shard finds the last page of its category, the category's later
+shards that have not started yet are cancelled. The parent process merges
+the shards' records into the outputs as they finish, drops jobs already
+listed in another category, and prints pages, jobs and time per category.
+
+Usage:
+    CATEGORIES=government-jobs-circular,bank-jobs,ngo-jobs python bdgovtjob.py
+    CATEGORIES=bank-jobs,https://bdgovtjob.net/category/defence-jobs/ SHARD_WORKERS=4 python bdgovtjob.py
+    CATEGORIES=... MAX_PAGES=30 SHARD_PAGES=10 RATE_LIMIT=2 SHARD_LOG_DIR=logs python bdgovtjob.py
+"""
+import contextlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from urllib.parse import urljoin
+
+from metrics import Metrics
+from records import canonical_url
+from throttle import SharedHostRateLimiter
+
+SITE_URL = "https://bdgovtjob.net/"
+
+
+def category_url(category):
+    """Category page URL of a category slug ('bank-jobs') or URL"""
+    category = category.strip()
+    if '://' not in category:
+        category = urljoin(SITE_URL, f"category/{category.strip('/')}/")
+    return category if category.endswith('/') else category + '/'
+
+
+def category_name(url):
+    """Short name of a category URL, for reports and log files"""
+    return url.rstrip('/').rsplit('/', 1)[-1]
+
+
+def plan_shards(categories, max_pages, shard_pages):
+    """
+    [(category URL, first page, last page)]: every category's pages
+    1..max_pages in shard_pages chunks. The first shards of all categories
+    come first, so later shards usually start after their category's end is
+    known and can be cancelled
+    """
+    return [
+        (url, first_page, min(first_page + shard_pages - 1, max_pages))
+        for first_page in range(1, max_pages + 1, shard_pages)
+        for url in categories
+    ]
+
+
+def crawl_shard(url, first_page, last_page, limiter=None, concurrency=1, log_dir=None):
+    """Worker process entry point: crawl pages first_page..last_page of the category at url"""
+    from bdgovtjob import BDGovtJobScraper
+
+    report = {'category': url, 'first_page': first_page, 'last_page': last_page, 'pages': 0,
+              'reached_end': False, 'records': [], 'error': None, 'structure_error': None}
+    start = time.perf_counter()
+    log = (open(os.path.join(log_dir, f"{category_name(url)}-{first_page}.log"), 'a', encoding='utf-8')
+           if log_dir else None)
+    try:
+        with contextlib.redirect_stdout(log) if log else contextlib.nullcontext():
+            # Resuming is per crawl, not per shard
+            scraper = BDGovtJobScraper(metrics=Metrics('bdgovtjob', path=''), checkpoint=False)
+            scraper.base_url = url
+            scraper.rate_limiter = limiter
+            if scraper.enricher is not None:
+                # Detail pages count against the same per-host limit
+                scraper.enricher.limiter = limiter
+            scraper.page_delay = 0
+            scraper.debug_html = False
+            report['records'] = scraper.scrape_all_pages(max_pages=last_page, concurrency=concurrency,
+                                                         first_page=first_page)
+            report['structure_error'] = scraper.structure_error
+            if not scraper.crawl_completed:
+                report['error'] = scraper.structure_error or "crawl failed (see the shard's output)"
+            report['pages'] = max(scraper.last_page_scraped - first_page + 1, 0)
+            report['reached_end'] = scraper.crawl_completed and scraper.last_page_scraped < last_page
+    except BaseException as e:
+        report['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if log:
+            log.close()
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+class ShardedCrawl:
+    """Crawls several categories' shards in a process pool and merges their records"""
+
+    def __init__(self, categories, max_pages, workers=None, shard_pages=None, rate_limit=None, concurrency=None,
+                 log_dir=None):
+        self.categories = [category_url(category) for category in categories]
+        self.max_pages = max_pages
+        # Usage: SHARD_PAGES=5 CATEGORIES=... python bdgovtjob.py (default: whole category per shard)
+        self.shard_pages = shard_pages or int(os.environ.get('SHARD_PAGES', max_pages))
+        self.shards = plan_shards(self.categories, max_pages, self.shard_pages)
+        # Usage: SHARD_WORKERS=4 CATEGORIES=... python bdgovtjob.py
+        self.workers = workers or int(os.environ.get('SHARD_WORKERS', min(len(self.shards), os.cpu_count() or 1)))
+        # Requests/second per host across all workers
+        if rate_limit is None:
+            rate_limit = float(os.environ.get('RATE_LIMIT', 2))
+        self.rate_limit = rate_limit
+        # Threads per worker (see BDGovtJobScraper.crawl_concurrent)
+        self.concurrency = concurrency or int(os.environ.get('CONCURRENCY', 1))
+        self.log_dir = log_dir or os.environ.get('SHARD_LOG_DIR')
+        if self.log_dir:
+            os.makedirs(self.log_dir, exist_ok=True)
+        self.stats = {
+            url: {'shards': 0, 'pages': 0, 'jobs': 0, 'duplicates': 0, 'failed': 0, 'cancelled': 0, 'seconds': 0.0}
+            for url in self.categories
+        }
+        self.seen_urls = set()
+        # First shard abort by selector health (see selector_health.py)
+        self.structure_error = None
+
+    def merge(self, report, sink):
+        """Pass a finished shard's records on to sink, minus jobs another shard already passed on"""
+        stats = self.stats[report['category']]
+        stats['shards'] += 1
+        stats['pages'] += report['pages']
+        stats['seconds'] += report['seconds']
+        if report['error']:
+            stats['failed'] += 1
+            print(f"❌ Shard {category_name(report['category'])} pages {report['first_page']}-"
+                  f"{report['last_page']}: {report['error']}")
+        if report['structure_error'] and self.structure_error is None:
+            self.structure_error = f"{category_name(report['category'])}: {report['structure_error']}"
+        jobs = []
+        for record in report['records']:
+            url = canonical_url(record.get('job_url'))
+            if url in self.seen_urls:
+                stats['duplicates'] += 1
+                continue
+            self.seen_urls.add(url)
+            jobs.append(record)
+        stats['jobs'] += len(jobs)
+        if jobs:
+            sink.write_many(jobs)
+        return len(jobs)
+
+    def run(self, sink):
+        """Crawl every shard, writing the records to sink as shards finish; returns the number written"""
+        print(f"🧩 Sharded crawl: {len(self.categories)} categories, {len(self.shards)} shards of up to "
+              f"{self.shard_pages} pages, {self.workers} workers, {self.rate_limit} req/s per host")
+        written = 0
+        # Fresh (spawned) interpreters, as in runner.py: each worker gets its own engine
+        context = multiprocessing.get_context('spawn')
+        with context.Manager() as manager:
+            limiter = SharedHostRateLimiter(self.rate_limit, manager)
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                pending = {
+                    pool.submit(crawl_shard, url, first_page, last_page, limiter, self.concurrency,
+                                self.log_dir): (url, first_page)
+                    for url, first_page, last_page in self.shards
+                }
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.pop(future)
+                        report = future.result()
+                        written += self.merge(report, sink)
+                        if report['reached_end']:
+                            self.cancel_after(pending, report['category'], report['last_page'])
+        return written
+
+    def cancel_after(self, pending, url, page_num):
+        """Cancel the not yet started shards of category url beyond page_num"""
+        for future, (shard_url, first_page) in list(pending.items()):
+            if shard_url == url and first_page > page_num and future.cancel():
+                pending.pop(future)
+                self.stats[url]['cancelled'] += 1
+
+    def print_summary(self):
+        print(f"\n{'category':<40} {'shards':>6} {'skipped':>7} {'pages':>6} {'jobs':>6} {'dupes':>6} "
+              f"{'failed':>6} {'seconds':>8}")
+        for url, s in self.stats.items():
+            print(f"{category_name(url):<40} {s['shards']:>6} {s['cancelled']:>7} {s['pages']:>6} {s['jobs']:>6} "
+                  f"{s['duplicates']:>6} {s['failed']:>6} {s['seconds']:>8.1f}")
@@ -0,0 +1,245 @@
+"""
+Streaming record sinks.
+
+Scrapers push every record into a RecordPipeline as soon as it is extracted
+instead of collecting all of them in memory first. Each sink writes or ships
+records incrementally, so memory stays flat however many pages are crawled
+and the records of completed pages are already on disk if a run crashes.
+
+    with RecordPipeline([CsvSink('jobs.csv'), JsonLinesSink('jobs.jsonl')]) as pipeline:
+        BDGovtJobScraper(sink=pipeline).scrape_all_pages(max_pages=20)
+"""
+import csv
+import json
+import os
+
+from records import RecordWriter
+
+
+class CsvSink:
+    """
+    Incremental CSV writer. The header is fieldnames (missing values are
+    left empty, other keys left out) or else the first record's keys
+    """
+
+    def __init__(self, filename, encoding='utf-8-sig', fieldnames=None):
+        self.filename = filename
+        self.encoding = encoding
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, record):
+        if self._writer is None:
+            self._file = open(self.filename, 'w', newline='', encoding=self.encoding)
+            # Same layout pandas' DataFrame.to_csv produced before
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames or list(record),
+                                          extrasaction='ignore' if self.fieldnames else 'raise',
+                                          lineterminator=os.linesep)
+            self._writer.writeheader()
+        self._writer.writerow(record)
+        self.count += 1
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class JsonLinesSink:
+    """One JSON object per line"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.count = 0
+        self._file = None
+
+    def write(self, record):
+        if self._file is None:
+            self._file = open(self.filename, 'w', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class JsonArraySink:
+    """
+    Streams records into an indented JSON array, byte-for-byte what
+    json.dump(records, f, ensure_ascii=False, indent=2) writes for the list
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.count = 0
+        self._file = None
+
+    def write(self, record):
+        if self._file is None:
+            self._file = open(self.filename, 'w', encoding='utf-8')
+            self._file.write('[\n')
+        else:
+            self._file.write(',\n')
+        body = json.dumps(record, ensure_ascii=False, indent=2)
+        self._file.write('\n'.join('  ' + line for line in body.split('\n')))
+        self.count += 1
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.write('\n]')
+            self._file.close()
+            self._file = None
+
+
+class BatchSink:
+    """Buffers records and hands them to `handler(batch)` batch_size at a time"""
+
+    def __init__(self, handler, batch_size=100):
+        self.handler = handler
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch = []
+
+    def write(self, record):
+        self._batch.append(record)
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self._hand_off()
+
+    def _hand_off(self):
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self.handler(batch)
+
+    def flush(self):
+        self._hand_off()
+
+    def close(self):
+        self._hand_off()
+
+
+class OutboxSink(BatchSink):
+    """Enqueues records into the durable outbox for endpoint as they arrive"""
+
+    def __init__(self, outbox, endpoint, batch_size=100):
+        super().__init__(lambda batch: outbox.enqueue(endpoint, batch), batch_size)
+
+
+class ApiBatchSink(BatchSink):
+    """
+    Delivers records to the API batch by batch with an ApiDelivery;
+    on_delivered(batch) is called for every batch the API fully accepted
+    """
+
+    def __init__(self, delivery, batch_size=None, on_delivered=None):
+        super().__init__(self._deliver, batch_size or delivery.batch_size)
+        self.delivery = delivery
+        self.on_delivered = on_delivered
+        self.results = []
+
+    def flush(self):
+        # Only full batches are POSTed while crawling, the rest on close()
+        pass
+
+    def _deliver(self, batch):
+        result = self.delivery.deliver(batch)
+        self.results.append(result)
+        if self.on_delivered and not result['failed_batches']:
+            self.on_delivered(batch)
+
+    def summary(self):
+        """ApiDelivery.deliver() result of all batches added up"""
+        total = {}
+        for result in self.results:
+            for key, value in result.items():
+                total[key] = total.get(key, type(value)()) + value
+        return total
+
+
+class TypedSink(BatchSink):
+    """
+    Converts records to record_type (see records.py) and writes the typed rows
+    to filename (.jsonl, .csv or .parquet) batch_size at a time
+    """
+
+    def __init__(self, record_type, filename, batch_size=500):
+        self.writer = RecordWriter(filename, record_type)
+        self.record_type = record_type
+        super().__init__(self.writer.write_batch, batch_size)
+
+    @property
+    def filename(self):
+        return self.writer.filename
+
+    def write(self, record):
+        super().write(self.record_type.from_dict(record))
+
+    def flush(self):
+        # Fewer, larger Parquet row groups
+        pass
+
+    def close(self):
+        try:
+            self._hand_off()
+        finally:
+            self.writer.close()
+
+
+def write_csv(records, filename, encoding='utf-8-sig'):
+    """Write a list of records to filename in one go; returns the row count"""
+    sink = CsvSink(filename, encoding)
+    try:
+        for record in records:
+            sink.write(record)
+    finally:
+        sink.close()
+    return sink.count
+
+
+class RecordPipeline:
+    """Fans every record out to a list of sinks"""
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        self.count = 0
+
+    def write(self, record):
+        for sink in self.sinks:
+            sink.write(record)
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+        # A page is complete: make it durable before the next one is fetched
+        self.flush()
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,66 @@
+"""
+ChangeRateModel: intervals shorten in busy posting hours, lengthen in quiet
+ones, stay within the source's bounds and forget old history.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from adaptive import ChangeRateModel
+
+DEFAULT, MIN, MAX = 60, 15, 240
+
+
+@pytest.fixture
+def model(tmp_path):
+    model = ChangeRateModel(path=str(tmp_path / 'schedule.db'), history_days=28, target=1)
+    yield model
+    model.close()
+
+
+def record_hourly(model, start, days, new_jobs_at):
+    """A run every hour for days, finding new_jobs_at(hour of the run) new jobs"""
+    at = start
+    while at < start + timedelta(days=days):
+        model.record('hot_jobs', at, new_jobs_at(at.hour), DEFAULT)
+        at += timedelta(hours=1)
+    return at
+
+
+def interval(model, at):
+    return model.next_interval('hot_jobs', at, DEFAULT, MIN, MAX)
+
+
+def test_without_history_the_default_interval_is_used(model):
+    assert interval(model, datetime(2025, 11, 3, 10)) == pytest.approx(DEFAULT)
+
+
+def test_intervals_follow_the_posting_hours(model):
+    # Four new jobs an hour during office hours, none at night
+    end = record_hourly(model, datetime(2025, 11, 3), 14, lambda hour: 4 if 10 <= hour < 18 else 0)
+    day = end.replace(hour=0)
+    busy, evening, night = (interval(model, day.replace(hour=hour)) for hour in (12, 19, 3))
+    # About 15 minutes for one new job
+    assert busy == pytest.approx(MIN, abs=2)
+    assert night == MAX
+    assert busy < evening <= night
+
+
+def test_a_single_busy_run_does_not_swing_the_schedule(model):
+    end = record_hourly(model, datetime(2025, 11, 3), 14, lambda hour: 0)
+    model.record('hot_jobs', end, 20, DEFAULT)
+    assert interval(model, end + timedelta(hours=1)) > DEFAULT
+
+
+def test_old_history_is_forgotten(model):
+    end = record_hourly(model, datetime(2025, 9, 1), 7, lambda hour: 0)
+    assert interval(model, end) == MAX
+    # Five weeks later only the prior remains
+    assert interval(model, end + timedelta(days=35)) == pytest.approx(DEFAULT)
+
+
+def test_long_outages_are_capped(model):
+    model.record('hot_jobs', datetime(2025, 11, 3, 10), 0, DEFAULT)
+    model.record('hot_jobs', datetime(2025, 12, 3, 10), 3, DEFAULT)
+    hours = [row[0] for row in model.conn.execute("SELECT covered_hours FROM polls ORDER BY polled_at")]
+    assert hours == [DEFAULT / 60, 7 * 24]
@@ -0,0 +1,92 @@
+"""
+Crash and --resume on the fixture site: the completed pages are replayed
+(through dedup) and the crawl continues after them; a checkpoint of another
+listing is not resumed.
+"""
+import json
+
+import pytest
+
+from bdgovtjob import BDGovtJobScraper
+from fixture_server import FixtureSite, serve
+from metrics import Metrics
+
+
+class ListSink:
+    """Collects the records written to it; raises once more than crash_after were written"""
+
+    def __init__(self, crash_after=None):
+        self.records = []
+        self.crash_after = crash_after
+
+    def write_many(self, records):
+        self.records.extend(records)
+        if self.crash_after is not None and len(self.records) > self.crash_after:
+            raise RuntimeError("killed")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def site_url(tmp_path, monkeypatch):
+    # Checkpoints and the dedup index live in the working directory
+    monkeypatch.chdir(tmp_path)
+    server, url = serve(FixtureSite(pages=4, articles_per_page=3))
+    yield url
+    server.shutdown()
+
+
+def crawl(url, sink, resume=False):
+    scraper = BDGovtJobScraper(engine='http', fallback_engine=None, incremental=False, use_http_cache=False,
+                               metrics=Metrics('test', path=''), enrich=False, dedup=True, job_store=False,
+                               checkpoint=True, selector_health=False, sink=sink)
+    scraper.base_url = url
+    scraper.page_delay = 0
+    scraper.debug_html = False
+    scraper.scrape_all_pages(max_pages=4, resume=resume)
+    return scraper
+
+
+def test_resume_replays_completed_pages_through_dedup(site_url, tmp_path):
+    crashed = ListSink(crash_after=6)
+    scraper = crawl(site_url, crashed)
+    assert not scraper.crawl_completed
+    state = json.loads((tmp_path / '.checkpoints' / 'bdgovtjob.json').read_text(encoding='utf-8'))
+    assert (state['last_page'], state['records'], state['base_url']) == (2, 6, site_url)
+
+    records_path = tmp_path / '.checkpoints' / 'bdgovtjob.jsonl'
+    lines = records_path.read_text(encoding='utf-8').splitlines()
+    page_3 = crashed.records[6:]
+    # A replayed record that is also on page 3 (the listing shifted), and
+    # records of page 3 written before the state update that never happened
+    lines[5] = json.dumps(page_3[0])
+    records_path.write_text('\n'.join(lines + [json.dumps(record) for record in page_3]) + '\n', encoding='utf-8')
+
+    resumed = ListSink()
+    scraper = crawl(site_url, resumed, resume=True)
+    assert scraper.crawl_completed
+    urls = [record['job_url'] for record in resumed.records]
+    assert len(urls) == len(set(urls)) == 11
+    assert urls[5] == page_3[0]['job_url']
+    assert scraper.jobs_collected == 11
+    assert len(records_path.read_text(encoding='utf-8').splitlines()) == 11
+
+
+def test_checkpoint_of_another_listing_is_discarded(site_url):
+    crawl(site_url, ListSink(crash_after=6))
+
+    server, other_url = serve(FixtureSite(pages=4, articles_per_page=3))
+    try:
+        other = ListSink()
+        scraper = crawl(other_url, other, resume=True)
+    finally:
+        server.shutdown()
+    # Nothing replayed from the other listing; this one is crawled from page 1
+    assert scraper.crawl_completed
+    assert len(other.records) == 12
+    other_site = other_url.split('/category/')[0]
+    assert all(record['job_url'].startswith(other_site) for record in other.records)
@@ -0,0 +1,52 @@
+"""
+`cli.py scrape` of a single source: the source runs in this process, only
+queues its jobs, and the outbox is delivered for its endpoint afterwards.
+"""
+import os
+
+import pytest
+
+import cli
+import outbox
+import runner
+
+ENDPOINT = "http://127.0.0.1:8000/bdgovjob/send-data/"
+seen = {}
+
+
+def queue_jobs():
+    """Source target: what a scraper with OUTBOX on does"""
+    seen['inline_drain'] = os.environ.get('OUTBOX_INLINE_DRAIN')
+    outbox.Outbox().enqueue(ENDPOINT, [{'job_title': 'Officer', 'job_url': 'https://bdgovtjob.net/officer/'}])
+    return 1
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setenv('OUTBOX_DB', str(tmp_path / 'outbox.db'))
+    monkeypatch.delenv('OUTBOX', raising=False)
+    monkeypatch.delenv('OUTBOX_INLINE_DRAIN', raising=False)
+    monkeypatch.setitem(runner.SOURCES, 'queued', runner.Source('queued', f"{__name__}:queue_jobs", 'QUEUED_', 60,
+                                                                 endpoint=f"{__name__}:ENDPOINT"))
+    drained = []
+    monkeypatch.setattr(outbox.OutboxDrainer, 'drain_once',
+                        lambda drainer: drained.append((drainer.endpoints, drainer.outbox.status())) or (1, 0))
+    seen.clear()
+    yield drained
+    # Set by the run for the source's module, as in a worker process
+    os.environ.pop('OUTBOX_INLINE_DRAIN', None)
+
+
+def test_single_source_run_delivers_its_outbox(source):
+    assert cli.main(['scrape', 'queued']) == 0
+    assert seen['inline_drain'] == '0'
+    [(endpoints, status)] = source
+    assert endpoints == [ENDPOINT]
+    assert status[ENDPOINT]['pending'] == 1
+
+
+def test_single_source_run_without_outbox_does_not_drain(source, monkeypatch):
+    monkeypatch.setenv('OUTBOX', '0')
+    assert cli.main(['scrape', 'queued']) == 0
+    assert seen['inline_drain'] is None
+    assert source == []
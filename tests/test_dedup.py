@@ -0,0 +1,93 @@
+"""
+DedupIndex: near-identical jobs of another source are dropped, distinct jobs
+are kept, and URL repeats are counted apart from near matches.
+"""
+import pytest
+
+from dedup import DedupIndex
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / 'dedup.db')
+
+
+def hot_job(position, url, company='Bangladesh Krishi Bank'):
+    return {'position': position, 'company_name': company, 'job_url': url}
+
+
+def govt_job(title, url, deadline='N/A'):
+    return {'job_title': title, 'job_url': url, 'deadline': deadline}
+
+
+def run(source, path, records):
+    """Records kept by one run of source, and its stats"""
+    index = DedupIndex(source, path=path)
+    try:
+        return index.filter(records), index.stats
+    finally:
+        index.close()
+
+
+def test_near_identical_jobs_of_another_source_are_dropped(index_path):
+    run('bdjobs_hot_jobs', index_path, [
+        hot_job('Senior Officer (General)', 'https://jobs.bdjobs.com/jobdetails.asp?id=1'),
+        hot_job('Senior Officers', 'https://jobs.bdjobs.com/jobdetails.asp?id=2',
+                company='Bangladesh Shipping Corporation'),
+    ])
+    kept, stats = run('bdgovtjob', index_path, [
+        # Same words in another order, and a plural: both the same circular
+        govt_job('Bangladesh Krishi Bank Senior Officer (General) Job Circular', 'https://bdgovtjob.net/bkb-so/'),
+        govt_job('Bangladesh Shipping Corporation Senior Officer Job Circular', 'https://bdgovtjob.net/bsc-so/'),
+    ])
+    assert kept == []
+    assert (stats['near'], stats['exact'], stats['kept']) == (2, 0, 0)
+
+    # The next run resolves the alias by URL, without MinHash
+    _, stats = run('bdgovtjob', index_path, [govt_job('Renamed', 'https://bdgovtjob.net/bkb-so/')])
+    assert (stats['exact'], stats['near']) == (1, 0)
+
+
+def test_distinct_jobs_are_kept(index_path):
+    run('bdjobs_hot_jobs', index_path, [
+        hot_job('Senior Officer', 'https://jobs.bdjobs.com/jobdetails.asp?id=1'),
+        {**hot_job('Assistant Engineer', 'https://jobs.bdjobs.com/jobdetails.asp?id=2'),
+         'deadline': '30 November 2025'},
+    ])
+    kept, stats = run('bdgovtjob', index_path, [
+        # Another post of the same employer
+        govt_job('Bangladesh Krishi Bank Senior Principal Officer Job Circular', 'https://bdgovtjob.net/bkb-spo/'),
+        # Same words, but a different deadline: another round of the circular
+        govt_job('Bangladesh Krishi Bank Assistant Engineer', 'https://bdgovtjob.net/bkb-ae/', '15 December 2025'),
+        govt_job('Bangladesh Railway Job Circular', 'https://bdgovtjob.net/railway/'),
+    ])
+    assert len(kept) == 3
+    assert stats == {'kept': 3, 'exact': 0, 'near': 0, 'repeat': 0}
+
+
+def test_similar_posts_of_the_same_site_are_kept(index_path):
+    kept, stats = run('bdgovtjob', index_path, [
+        govt_job('Bangladesh Krishi Bank Senior Officer Job Circular', 'https://bdgovtjob.net/bkb-so/'),
+        govt_job('Bangladesh Krishi Bank Senior Officers Job Circular', 'https://bdgovtjob.net/bkb-so-2/'),
+    ])
+    assert len(kept) == 2 and stats['near'] == 0
+
+
+def test_url_repeats_are_counted_apart_from_near_matches(index_path):
+    url = 'https://bdgovtjob.net/bkb-so/'
+    kept, stats = run('bdgovtjob', index_path, [
+        govt_job('Bangladesh Krishi Bank Senior Officer', url),
+        # The same post again later in the crawl (the listing shifted), tracking parameters and all
+        govt_job('Bangladesh Krishi Bank Senior Officer', url + '?utm_source=facebook'),
+    ])
+    assert [job['job_url'] for job in kept] == [url]
+    assert (stats['repeat'], stats['exact'], stats['near']) == (1, 0, 0)
+
+    # A later run of the same source keeps its own job once more
+    kept, _ = run('bdgovtjob', index_path, [govt_job('Bangladesh Krishi Bank Senior Officer', url)])
+    assert len(kept) == 1
+
+    # Another source listing the same URL
+    kept, stats = run('bdjobs_hot_jobs', index_path, [hot_job('Senior Officer', url)])
+    assert kept == []
+    assert (stats['exact'], stats['near']) == (1, 0)
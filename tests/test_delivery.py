@@ -0,0 +1,201 @@
+"""
+ApiDelivery against a local stand-in for the Django API: delta skipping,
+batch splitting, gzip fallback, retries and the aggregated totals.
+"""
+import gzip
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import delivery
+from delivery import ApiDelivery
+from seen_index import SeenIndex
+
+
+class StandInApi:
+    """
+    Records every POST (decoded records, headers) and answers with the queued
+    responses, then with 200 and the API's created/updated/errors totals
+    """
+
+    def __init__(self, accept_gzip=True):
+        self.accept_gzip = accept_gzip
+        self.posts = []
+        self.responses = deque()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                gzipped = self.headers.get('Content-Encoding') == 'gzip'
+                api.posts.append({'gzip': gzipped, 'headers': dict(self.headers), 'bytes': len(body)})
+                if api.responses:
+                    status, payload, headers = api.responses.popleft()
+                elif gzipped and not api.accept_gzip:
+                    # What Django REST framework answers when it parses a gzip body as JSON
+                    status, payload, headers = 400, {
+                        'detail': "JSON parse error - 'utf-8' codec can't decode byte 0x8b in position 1"
+                    }, {}
+                else:
+                    records = json.loads(gzip.decompress(body) if gzipped else body)
+                    api.posts[-1]['records'] = records
+                    status, headers = 200, {}
+                    payload = {'total_created': len(records), 'total_updated': 0, 'total_errors': 0,
+                               'errors': []}
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.url = f"http://{host}:{port}/bdgovjob/send-data/"
+
+    @property
+    def delivered(self):
+        return [post['records'] for post in self.posts if 'records' in post]
+
+
+@pytest.fixture
+def api():
+    api = StandInApi()
+    yield api
+    api.server.shutdown()
+    delivery._plain_endpoints.discard(api.url)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays, recorded instead of slept"""
+    delays = []
+    monkeypatch.setattr(delivery.time, 'sleep', delays.append)
+    return delays
+
+
+def jobs(count, **extra):
+    return [{'job_title': f"Job {i}", 'job_url': f"https://bdgovtjob.net/job-{i}/", 'vacancies': str(i), **extra}
+            for i in range(count)]
+
+
+def make_delivery(api, tmp_path, **options):
+    options.setdefault('compress', False)
+    options.setdefault('ledger', SeenIndex(f"delivered:{api.url}", str(tmp_path / 'delivered_jobs.db')))
+    return ApiDelivery(api.url, timeout=5, session=requests.Session(), **options)
+
+
+def test_only_new_or_changed_jobs_are_resent(api, tmp_path):
+    first = make_delivery(api, tmp_path).deliver(jobs(5))
+    assert (first['sent'], first['skipped']) == (5, 0)
+
+    changed = jobs(5)
+    changed[2]['vacancies'] = '200'
+    second = make_delivery(api, tmp_path).deliver(changed + jobs(6)[5:])
+    assert (second['sent'], second['skipped']) == (2, 4)
+    assert [job['job_url'] for job in api.delivered[-1]] == [changed[2]['job_url'], jobs(6)[5]['job_url']]
+
+    third = make_delivery(api, tmp_path).deliver(changed)
+    assert (third['sent'], third['skipped'], third['batches']) == (0, 5, 0)
+    assert len(api.posts) == 2
+
+
+def test_failed_batches_are_not_recorded_as_delivered(api, tmp_path, sleeps):
+    api.responses.append((500, {'detail': 'boom'}, {}))
+    result = make_delivery(api, tmp_path, max_retries=0).deliver(jobs(3))
+    assert (result['sent'], result['failed_batches']) == (0, 1)
+    assert make_delivery(api, tmp_path).deliver(jobs(3))['sent'] == 3
+
+
+def test_batches_are_split_by_record_count(api, tmp_path):
+    result = make_delivery(api, tmp_path, batch_size=3).deliver(jobs(7))
+    assert result['batches'] == 3
+    assert [len(batch) for batch in api.delivered] == [3, 3, 1]
+
+
+def test_batches_are_split_by_payload_size(api, tmp_path):
+    records = jobs(6, description='x' * 400)
+    record_bytes = len(json.dumps(records[0]).encode('utf-8'))
+    result = make_delivery(api, tmp_path, batch_size=100, batch_bytes=2 * record_bytes + 10).deliver(records)
+    assert result['batches'] == 3
+    assert [len(batch) for batch in api.delivered] == [2, 2, 2]
+    assert all(post['bytes'] <= 2 * record_bytes + 10 for post in api.posts)
+
+
+def test_gzip_is_opt_in(api, tmp_path, monkeypatch):
+    monkeypatch.delenv('API_GZIP', raising=False)
+    make_delivery(api, tmp_path, compress=None).deliver(jobs(2))
+    assert api.posts[-1]['gzip'] is False
+
+    monkeypatch.setenv('API_GZIP', '1')
+    make_delivery(api, tmp_path, compress=None).deliver(jobs(3))
+    assert api.posts[-1]['gzip'] is True
+    assert len(api.delivered[-1]) == 1
+
+
+def test_gzip_rejection_falls_back_to_plain_json_once_per_endpoint(api, tmp_path):
+    api.accept_gzip = False
+    result = make_delivery(api, tmp_path, compress=True).deliver(jobs(2))
+    assert result['sent'] == 2
+    assert [post['gzip'] for post in api.posts] == [True, False]
+
+    # A new delivery (e.g. the outbox drainer's) remembers the rejection
+    make_delivery(api, tmp_path, compress=True).deliver(jobs(4))
+    assert [post['gzip'] for post in api.posts] == [True, False, False]
+
+
+def test_unsupported_media_type_falls_back_to_plain_json(api, tmp_path):
+    api.responses.append((415, {'detail': 'Unsupported media type'}, {}))
+    result = make_delivery(api, tmp_path, compress=True).deliver(jobs(2))
+    assert result['sent'] == 2
+    assert [post['gzip'] for post in api.posts] == [True, False]
+
+
+def test_other_bad_requests_do_not_disable_gzip(api, tmp_path, sleeps):
+    api.responses.append((400, {'job_title': ['This field may not be blank.']}, {}))
+    result = make_delivery(api, tmp_path, compress=True).deliver(jobs(2))
+    assert (result['sent'], result['failed_batches']) == (0, 1)
+    assert [post['gzip'] for post in api.posts] == [True]
+    assert 'may not be blank' in result['failures'][0]
+    assert sleeps == []
+
+
+def test_retries_honour_retry_after(api, tmp_path, sleeps):
+    api.responses.append((503, {'detail': 'busy'}, {'Retry-After': '7'}))
+    api.responses.append((429, {'detail': 'slow down'}, {}))
+    result = make_delivery(api, tmp_path, max_retries=4, backoff=0.5).deliver(jobs(2))
+    assert (result['sent'], result['failed_batches']) == (2, 0)
+    assert len(api.posts) == 3
+    assert sleeps[0] == 7.0
+    # Without Retry-After: exponential backoff with jitter
+    assert 1.0 <= sleeps[1] <= 1.5
+
+
+def test_retries_give_up_after_max_retries(api, tmp_path, sleeps):
+    for _ in range(3):
+        api.responses.append((502, {'detail': 'bad gateway'}, {}))
+    result = make_delivery(api, tmp_path, max_retries=2).deliver(jobs(2))
+    assert (result['sent'], result['failed_batches']) == (0, 1)
+    assert len(api.posts) == 3
+    assert result['failures'][0].startswith('HTTP 502')
+
+
+def test_api_totals_are_summed_over_batches(api, tmp_path):
+    api.responses.append((200, {'total_created': 2, 'total_updated': 1, 'total_errors': 0, 'errors': []}, {}))
+    api.responses.append((201, {'total_created': 1, 'total_updated': 0, 'total_errors': 2,
+                                'errors': ['row 1: bad deadline', 'row 2: bad deadline']}, {}))
+    result = make_delivery(api, tmp_path, batch_size=3).deliver(jobs(6))
+    assert (result['sent'], result['batches']) == (6, 2)
+    assert (result['total_created'], result['total_updated'], result['total_errors']) == (3, 1, 2)
+    assert result['errors'] == ['row 1: bad deadline', 'row 2: bad deadline']
@@ -0,0 +1,58 @@
+"""
+The HTTP/lxml engine must produce the same records as the Selenium engine:
+both crawl the saved bdgovtjob.net pages in tests/fixtures.
+"""
+import os
+
+import pytest
+
+from bdgovtjob import BDGovtJobScraper
+from driver_cache import detect_chrome_version
+from fixture_server import RecordedSite, serve
+from metrics import Metrics
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+@pytest.fixture(scope='module')
+def category_url():
+    server, url = serve(RecordedSite(FIXTURES))
+    yield url
+    server.shutdown()
+
+
+def crawl(engine, url):
+    """all_jobs of a crawl of the fixture site, without the run-dependent scraped_at"""
+    scraper = BDGovtJobScraper(engine=engine, fallback_engine=None, incremental=False, use_http_cache=False,
+                               metrics=Metrics('test', path=''), enrich=False, dedup=False, job_store=False,
+                               checkpoint=False, selector_health=False)
+    scraper.base_url = url
+    scraper.page_delay = 0
+    scraper.debug_html = False
+    jobs = scraper.scrape_all_pages(max_pages=5, concurrency=1)
+    assert scraper.crawl_completed
+    return [{key: value for key, value in job.items() if key != 'scraped_at'} for job in jobs]
+
+
+def test_http_engine_extracts_saved_pages(category_url):
+    jobs = crawl('http', category_url)
+    assert len(jobs) == 10
+    by_title = {job['job_title']: job for job in jobs}
+    # Nested markup and source whitespace collapse like rendered text
+    assert 'BPSC Non-Cadre Job Circular 2025' in by_title
+    # Relative links are resolved like the browser's href property
+    assert by_title['Palli Sanchay Bank Job Circular 2025 – Officer']['job_url'] == (
+        category_url.split('/category/')[0] + '/palli-sanchay-bank-job-circular/'
+    )
+    # Empty links fall back to their title attribute
+    assert by_title['Dhaka WASA Job Circular 2025']['vacancies'] == '108'
+    assert by_title['Directorate of Primary Education (DPE) Job Circular']['deadline'] == 'N/A'
+    assert by_title['Ministry of Land Job Circular 2025']['posted_date'] == '28 October, 2025'
+
+
+@pytest.mark.skipif(detect_chrome_version() is None, reason='Chrome is not installed')
+@pytest.mark.parametrize('batch_extract', ['1', '0'])
+def test_http_engine_matches_selenium_engine(category_url, monkeypatch, batch_extract):
+    # Both the one-round-trip JS extraction and the per-element WebDriver calls
+    monkeypatch.setenv('BATCH_EXTRACT', batch_extract)
+    assert crawl('http', category_url) == crawl('selenium', category_url)
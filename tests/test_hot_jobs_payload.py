@@ -0,0 +1,76 @@
+"""
+Hot Jobs cards from JSON payloads: which payloads are recognised, which
+captured responses are read, and the check against the rendered cards.
+"""
+import json
+
+from fixture_server import HOT_JOBS_PAYLOAD_PATH, FixtureSite
+from hot_jobs_payload import PayloadCapture, cards_from_payload, cards_match_page
+
+BASE = "https://bdjobs.com/"
+
+
+class FakeDriver:
+    """Answers Network.getResponseBody with the bodies of the given request ids"""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.requested = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.requested.append(params['requestId'])
+        return {'body': json.dumps(self.bodies[params['requestId']]), 'base64Encoded': False}
+
+
+def captured(*responses):
+    """PayloadCapture that saw the (url, payload) JSON responses, and a driver serving them"""
+    capture = PayloadCapture(None)
+    bodies = {}
+    for number, (url, payload) in enumerate(responses):
+        request_id = f"req-{number}"
+        bodies[request_id] = payload
+        capture.consume([
+            {'method': 'Network.responseReceived',
+             'params': {'requestId': request_id, 'type': 'XHR',
+                        'response': {'url': url, 'mimeType': 'application/json'}}},
+            {'method': 'Network.loadingFinished', 'params': {'requestId': request_id}},
+        ])
+    return capture, FakeDriver(bodies)
+
+
+def test_fixture_payload_is_recognised():
+    payload = json.loads(FixtureSite(hot_job_cards=2, jobs_per_card=2).render_hot_jobs_payload("https://bdjobs.com"))
+    cards = cards_from_payload(payload, BASE)
+    assert [card['company_name'] for card in cards] == ['Company 0 Ltd.', 'Company 1 Ltd.']
+    assert cards[0]['company_logo_url'] == 'https://bdjobs.com/logos/0.png'
+    assert cards[1]['jobs'][1] == {'position': 'Senior Officer 101', 'job_url': 'https://bdjobs.com/jobdetails/?id=101'}
+
+
+def test_unrelated_lists_are_not_taken_for_jobs():
+    categories = {'data': [{'id': 1, 'name': 'Accounting', 'title': 'Accounting/Finance'},
+                           {'id': 2, 'name': 'Bank', 'title': 'Bank/Non-Bank Fin. Institution'}]}
+    assert cards_from_payload(categories, BASE) is None
+
+
+def test_only_responses_from_hot_jobs_endpoints_are_read():
+    hot_jobs = {'data': [{'companyName': 'Acme Ltd.', 'jobs': [{'jobTitle': 'Engineer', 'jobId': 7}]}]}
+    capture, driver = captured(
+        ("https://bdjobs.com/api/featured-companies", {'data': [{'companyName': 'Other Ltd.',
+                                                                 'jobs': [{'jobTitle': 'Clerk', 'jobId': 1}]}]}),
+        ("https://bdjobs.com" + HOT_JOBS_PAYLOAD_PATH, hot_jobs),
+    )
+    cards = capture.cards(driver, BASE)
+    assert [card['company_name'] for card in cards] == ['Acme Ltd.']
+    assert cards[0]['jobs'][0]['job_url'].endswith('jobdetails.asp?id=7')
+    assert driver.requested == ['req-1']
+
+    capture, driver = captured(("https://bdjobs.com/api/featured-companies", hot_jobs))
+    assert capture.cards(driver, BASE) is None
+    assert capture.cards(driver, BASE, url_pattern=r'featured') is not None
+
+
+def test_payload_must_match_the_rendered_cards():
+    cards = [{'company_name': 'Acme  Ltd.', 'jobs': []}, {'company_name': 'Beta Ltd.', 'jobs': []}]
+    assert cards_match_page(cards, ['Beta Ltd.', 'ACME Ltd.'])
+    assert not cards_match_page(cards, ['Acme Ltd.'])
+    assert not cards_match_page(cards, ['Acme Ltd.', 'Gamma Ltd.'])
@@ -0,0 +1,59 @@
+"""
+HttpPageCache shared by several processes, as in a sharded crawl: no process
+overwrites the others' index entries, and the size limit covers all of them.
+"""
+import json
+import multiprocessing
+
+from http_cache import HttpPageCache
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def url(shard, page):
+    return f"https://bdgovtjob.net/category/shard-{shard}/page/{page}/"
+
+
+def store_pages(directory, shard, pages, max_bytes):
+    cache = HttpPageCache(directory, max_bytes=max_bytes)
+    for page in range(pages):
+        cache.store(url(shard, page), FakeResponse(b'x' * 1000, headers={'ETag': f'"{shard}-{page}"'}),
+                    [{'title': f"Job {shard}-{page}"}])
+
+
+def run_shards(directory, shards, pages, max_bytes):
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=store_pages, args=(directory, shard, pages, max_bytes))
+                 for shard in range(shards)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+
+
+def test_concurrent_processes_keep_each_others_entries(tmp_path):
+    run_shards(str(tmp_path), shards=4, pages=10, max_bytes=10 * 1024 * 1024)
+    with open(tmp_path / 'index.json', encoding='utf-8') as f:
+        index = json.load(f)
+    assert set(index) == {url(shard, page) for shard in range(4) for page in range(10)}
+
+    cache = HttpPageCache(str(tmp_path))
+    response = FakeResponse(b'', status_code=304)
+    assert cache.conditional_headers(url(3, 9)) == {'If-None-Match': '"3-9"'}
+    assert cache.lookup(url(3, 9), response) == (b'x' * 1000, [{'title': 'Job 3-9'}])
+
+
+def test_size_limit_covers_every_process(tmp_path):
+    entry_size = 1000 + len(json.dumps([{'title': 'Job 0-0'}]))
+    run_shards(str(tmp_path), shards=3, pages=10, max_bytes=12 * entry_size)
+    with open(tmp_path / 'index.json', encoding='utf-8') as f:
+        index = json.load(f)
+    assert len(index) == 12
+    assert sum(entry['size'] for entry in index.values()) <= 12 * entry_size
+    assert len(list(tmp_path.glob('*.html'))) == 12
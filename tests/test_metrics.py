@@ -0,0 +1,33 @@
+"""
+Metrics where the resource module is missing (Windows), and rotation of the
+JSON-lines file.
+"""
+import json
+
+import metrics
+from metrics import Metrics, peak_rss_mb, rotate
+
+
+def test_peak_memory_is_skipped_without_the_resource_module(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'resource', None)
+    assert peak_rss_mb() is None
+
+    path = tmp_path / 'metrics.jsonl'
+    run = Metrics('test', path=str(path))
+    with run.timer('page_load'):
+        pass
+    run.close(jobs=3)
+    lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert not any(line.get('name') == 'python_peak_rss_mb' for line in lines)
+    assert lines[-1]['type'] == 'run' and lines[-1]['jobs'] == 3
+
+
+def test_rotation_keeps_the_configured_backups(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    for generation in range(4):
+        path.write_text(f"generation {generation}\n" * 10, encoding='utf-8')
+        assert rotate(str(path), max_bytes=10, backups=2)
+    assert not path.exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['metrics.jsonl.1', 'metrics.jsonl.2']
+    assert (tmp_path / 'metrics.jsonl.1').read_text(encoding='utf-8').startswith('generation 3')
+    assert not rotate(str(path), max_bytes=10, backups=2)
@@ -0,0 +1,89 @@
+"""
+Outbox claims and leases: a record re-enqueued while a drainer holds it is
+neither lost when the old copy is acked nor delivered twice unchanged.
+"""
+import pytest
+
+from outbox import Outbox, OutboxDrainer
+
+ENDPOINT = "http://127.0.0.1:8000/bdgovjob/send-data/"
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = Outbox(str(tmp_path / 'outbox.db'), lease=600)
+    yield outbox
+    outbox.close()
+
+
+def job(vacancies):
+    return {'job_title': 'Officer', 'job_url': 'https://bdgovtjob.net/officer/', 'vacancies': vacancies}
+
+
+def claims(claimed):
+    return [claim for claim, _, _ in claimed]
+
+
+def test_claimed_records_are_leased(outbox):
+    outbox.enqueue(ENDPOINT, [job('5')])
+    assert len(outbox.claim(ENDPOINT)) == 1
+    assert outbox.claim(ENDPOINT) == []
+    assert outbox.endpoints_due() == []
+
+
+def test_record_changed_while_claimed_survives_the_ack(outbox):
+    outbox.enqueue(ENDPOINT, [job('5')])
+    claimed = outbox.claim(ENDPOINT)
+    outbox.enqueue(ENDPOINT, [job('7')])
+    outbox.ack(claims(claimed))
+
+    # The changed copy is still queued, and released for the next claim
+    assert [record['vacancies'] for _, _, record in outbox.claim(ENDPOINT)] == ['7']
+
+
+def test_record_changed_while_claimed_is_not_delayed_by_the_nack(outbox):
+    outbox.enqueue(ENDPOINT, [job('5')])
+    claimed = outbox.claim(ENDPOINT)
+    outbox.enqueue(ENDPOINT, [job('7')])
+    outbox.nack(claims(claimed), 'HTTP 503')
+
+    assert outbox.status()[ENDPOINT]['failing'] == 0
+    assert [record['vacancies'] for _, _, record in outbox.claim(ENDPOINT)] == ['7']
+
+
+def test_unchanged_re_enqueue_keeps_the_lease(outbox):
+    outbox.enqueue(ENDPOINT, [job('5')])
+    claimed = outbox.claim(ENDPOINT)
+    outbox.enqueue(ENDPOINT, [job('5')])
+    assert outbox.claim(ENDPOINT) == []
+
+    outbox.ack(claims(claimed))
+    assert outbox.status() == {}
+
+
+class ChangingDelivery:
+    """Delivery whose first POST happens while the scraper re-enqueues a changed job"""
+
+    ledger = None
+
+    def __init__(self, outbox):
+        self.outbox = outbox
+        self.posted = []
+
+    def split_batches(self, records):
+        yield records
+
+    def post_batch(self, batch, idempotency_key=None):
+        self.posted.append([record['vacancies'] for record in batch])
+        if len(self.posted) == 1:
+            self.outbox.enqueue(ENDPOINT, [job('7')])
+
+
+def test_drainer_delivers_a_record_changed_during_its_post(outbox):
+    outbox.enqueue(ENDPOINT, [job('5')])
+    drainer = OutboxDrainer(outbox)
+    delivery = drainer._deliveries[ENDPOINT] = ChangingDelivery(outbox)
+
+    assert drainer.drain_once() == (2, 0)
+    assert delivery.posted == [['5'], ['7']]
+    assert outbox.status() == {}
@@ -0,0 +1,66 @@
+"""
+Typed records: English and Bengali dates and numbers, and the None fallback
+for values that cannot be parsed.
+"""
+from datetime import date, datetime
+
+import pytest
+
+from records import GovtJob, canonical_url, parse_date, parse_int
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('25 November 2025 at 5:00 PM', date(2025, 11, 25)),
+    ('3rd Nov, 2025', date(2025, 11, 3)),
+    ('November 25, 2025', date(2025, 11, 25)),
+    ('2025-11-25', date(2025, 11, 25)),
+    ('25/11/2025', date(2025, 11, 25)),
+    # Bengali digits, with English or numeric months
+    ('২৫ November ২০২৫', date(2025, 11, 25)),
+    ('২৫-১১-২০২৫', date(2025, 11, 25)),
+    # Bengali month names and their spelling variants
+    ('২৫ নভেম্বর ২০২৫', date(2025, 11, 25)),
+    ('আবেদনের শেষ তারিখ: ১০ ফেব্রুয়ারী, ২০২৬', date(2026, 2, 10)),
+    ('১ আগষ্ট ২০২৫', date(2025, 8, 1)),
+    # A zero-width non-joiner inside the month name
+    ('৫ জানু‌য়ারি ২০২৬', date(2026, 1, 5)),
+])
+def test_dates_are_parsed(text, expected):
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    None, '', 'N/A', 'Not mentioned', 'শীঘ্রই প্রকাশ করা হবে', '25 Smarch 2025', '31 February 2025', '2025-13-01',
+])
+def test_unparseable_dates_are_none(text):
+    assert parse_date(text) is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('65', 65), ('১২৫ জন', 125), ('1,200 posts', 1200), (7, 7), ('N/A', None), ('বিভিন্ন', None),
+])
+def test_numbers_are_parsed(text, expected):
+    assert parse_int(text) == expected
+
+
+def test_govt_job_from_bengali_record():
+    job = GovtJob.from_dict({
+        'job_title': '  বাংলাদেশ   রেলওয়ে নিয়োগ বিজ্ঞপ্তি ',
+        'job_url': 'HTTPS://BDGovtJob.net:443/railway/?utm_source=facebook&b=2&a=1#apply',
+        'vacancies': '৪৫০ জন',
+        'deadline': '২৫ নভেম্বর ২০২৫ বিকাল ৫টা',
+        'posted_date': 'Not mentioned',
+        'scraped_at': '2025-11-03 10:15:00',
+    })
+    assert job.job_title == 'বাংলাদেশ রেলওয়ে নিয়োগ বিজ্ঞপ্তি'
+    assert job.job_url == 'https://bdgovtjob.net/railway/?a=1&b=2'
+    assert (job.vacancies, job.deadline, job.posted_date) == (450, date(2025, 11, 25), None)
+    assert job.scraped_at == datetime(2025, 11, 3, 10, 15)
+    # Scrape time does not change the content hash
+    assert job.content_hash == GovtJob.from_dict({**job.to_row(), 'scraped_at': None}).content_hash
+
+
+def test_canonical_url_keeps_real_parameters():
+    assert canonical_url('https://jobs.bdjobs.com/jobdetails.asp?id=7&fbclid=x') == \
+        'https://jobs.bdjobs.com/jobdetails.asp?id=7'
+    assert canonical_url('N/A') == ''
@@ -0,0 +1,68 @@
+"""
+Incremental crawls: a second run over unchanged pages emits nothing and
+stops at page 1; a changed job is emitted again.
+"""
+import pytest
+
+from bdgovtjob import BDGovtJobScraper
+from fixture_server import FixtureSite, serve
+from metrics import Metrics
+from seen_index import CHANGED, NEW, UNCHANGED, SeenIndex
+
+
+@pytest.fixture
+def site_url(tmp_path, monkeypatch):
+    # The seen index lives in the working directory
+    monkeypatch.chdir(tmp_path)
+    server, url = serve(FixtureSite(pages=4, articles_per_page=3))
+    yield url
+    server.shutdown()
+
+
+def crawl(url, concurrency=1):
+    """An incremental crawl that marks what it emitted as seen, as main() does once it was saved"""
+    scraper = BDGovtJobScraper(engine='http', fallback_engine=None, incremental=True, use_http_cache=False,
+                               metrics=Metrics('test', path=''), enrich=False, dedup=False, job_store=False,
+                               checkpoint=False, selector_health=False)
+    scraper.base_url = url
+    scraper.page_delay = 0
+    scraper.debug_html = False
+    jobs = scraper.scrape_all_pages(max_pages=4, concurrency=concurrency, rate_limit=100)
+    scraper.commit_seen()
+    return scraper, jobs
+
+
+@pytest.mark.parametrize('concurrency', [1, 2])
+def test_second_run_over_unchanged_pages_stops_at_page_one(site_url, concurrency):
+    scraper, jobs = crawl(site_url, concurrency)
+    assert (len(jobs), scraper.last_page_scraped) == (12, 4)
+
+    scraper, jobs = crawl(site_url, concurrency)
+    assert jobs == []
+    assert scraper.last_page_scraped == 1
+    assert scraper.crawl_completed
+
+
+def test_changed_job_is_emitted_again(site_url):
+    _, first = crawl(site_url)
+    # The index remembers another version of one job of page 1 (the post was edited since)
+    index = SeenIndex('bdgovtjob')
+    index.mark_seen([{**first[1], 'vacancies': '999'}])
+    index.close()
+
+    scraper, jobs = crawl(site_url)
+    assert [job['job_url'] for job in jobs] == [first[1]['job_url']]
+    # Page 1 had a changed job, page 2 was all unchanged
+    assert scraper.last_page_scraped == 2
+
+
+def test_classify(tmp_path):
+    index = SeenIndex('test', path=str(tmp_path / 'seen.db'))
+    job = {'job_title': 'Officer', 'job_url': 'https://bdgovtjob.net/officer/', 'vacancies': '5',
+           'scraped_at': '2025-11-03 10:00:00'}
+    assert index.classify([job]) == [NEW]
+    index.mark_seen([job])
+    # Scrape time and detail fields do not make a job changed
+    assert index.classify([{**job, 'scraped_at': '2025-11-04 10:00:00', 'detail_text': '...'}]) == [UNCHANGED]
+    assert index.classify([{**job, 'vacancies': '6'}]) == [CHANGED]
+    assert SeenIndex('other', path=str(tmp_path / 'seen.db')).classify([job]) == [NEW]
@@ -0,0 +1,130 @@
+"""
+Selector health on crawls of the fixture site: a page 1 without articles
+aborts the crawl as a markup change, a failed extraction does not. And on
+scored pages: collapsed fields abort, optional fields are not judged, and a
+fallback selector that matched is tried first on the next run.
+"""
+import pytest
+
+from bdgovtjob import BDGovtJobScraper, HttpFetchEngine
+from fixture_server import FixtureSite, serve
+from metrics import Metrics
+from selector_health import SelectorHealth, SiteStructureChanged
+
+
+def serve_site(request, site):
+    server, url = serve(site)
+    request.addfinalizer(server.shutdown)
+    return url
+
+
+def scraper_for(url, tmp_path):
+    scraper = BDGovtJobScraper(engine='http', fallback_engine=None, incremental=False, use_http_cache=False,
+                               metrics=Metrics('test', path=''), enrich=False, dedup=False, job_store=False,
+                               checkpoint=False, selector_health=False)
+    scraper.selector_health = SelectorHealth('test', path=str(tmp_path / 'selector_health.db'))
+    scraper.base_url = url
+    scraper.page_delay = 0
+    scraper.debug_html = False
+    return scraper
+
+
+def test_page_one_without_articles_is_a_markup_change(request, tmp_path):
+    url = serve_site(request, FixtureSite(pages=3, articles_per_page=4, empty_pages={1}))
+    scraper = scraper_for(url, tmp_path)
+    scraper.scrape_all_pages(max_pages=3)
+    assert 'no articles on page 1' in scraper.structure_error
+    assert not scraper.crawl_completed
+
+
+def test_failed_extraction_is_not_a_markup_change(request, tmp_path, monkeypatch):
+    url = serve_site(request, FixtureSite(pages=3, articles_per_page=4))
+    find_articles = HttpFetchEngine.find_articles
+    calls = []
+
+    def flaky_find_articles(engine):
+        calls.append(1)
+        if len(calls) == 1:
+            raise TimeoutError("read timed out")
+        return find_articles(engine)
+
+    monkeypatch.setattr(HttpFetchEngine, 'find_articles', flaky_find_articles)
+    scraper = scraper_for(url, tmp_path)
+    jobs = scraper.scrape_all_pages(max_pages=3)
+    assert scraper.structure_error is None
+    assert scraper.crawl_completed
+    # Page 1 is lost to the error, pages 2 and 3 are crawled
+    assert len(jobs) == 8
+
+
+SELECTORS = {
+    'vacancies': (('.job-vacancy .job-value', '//a'), ('.vacancy-box span', '//b')),
+    'deadline': (('.job-deadline .job-value', '//c'), ('.deadline-box span', '//d')),
+}
+
+
+def page(count, **missing):
+    """Field dicts of count articles; fields in missing are 'N/A', selectors as the engines report them"""
+    return [{
+        'job_title': 'Officer', 'job_url': f'https://bdgovtjob.net/{i}/', 'posted_date': '3 November, 2025',
+        'vacancies': 'N/A' if 'vacancies' in missing else '10',
+        'deadline': 'N/A' if 'deadline' in missing else '25 November 2025',
+        'selectors': {
+            'vacancies': None if 'vacancies' in missing else missing.get('vacancies_selector', '.job-vacancy .job-value'),
+            'deadline': None if 'deadline' in missing else '.job-deadline .job-value',
+        },
+    } for i in range(count)]
+
+
+@pytest.fixture
+def health_path(tmp_path):
+    return str(tmp_path / 'selector_health.db')
+
+
+def test_collapsed_pages_in_a_row_abort(health_path):
+    health = SelectorHealth('test', path=health_path, min_ratio=0.5, abort_pages=2)
+    health.check_page(1, page(10))
+    # One collapsed page, then a healthy one: the streak starts over
+    health.check_page(2, page(10, vacancies=True, deadline=True))
+    health.check_page(3, page(10))
+    health.check_page(4, page(10, deadline=True))
+    with pytest.raises(SiteStructureChanged, match='deadline missing on 2 pages in a row'):
+        health.check_page(5, page(10, deadline=True))
+    assert health.aborted
+
+
+def test_empty_pages_are_not_scored(health_path):
+    health = SelectorHealth('test', path=health_path, abort_pages=1)
+    assert health.check_page(7, []) == {}
+    assert health.pages == []
+
+
+def test_usual_coverage_is_learned_from_healthy_runs_only(health_path):
+    health = SelectorHealth('test', path=health_path)
+    # A site where most posts have no deadline box
+    for page_num in range(1, 4):
+        health.check_page(page_num, page(7, deadline=True) + page(3))
+    health.close()
+
+    health = SelectorHealth('test', path=health_path, abort_pages=1)
+    assert health.usual['deadline'] == pytest.approx(0.3)
+    # An optional field is not judged: no abort although it is missing everywhere
+    health.check_page(1, page(10, deadline=True))
+    health.aborted = True
+    health.close()
+
+    # The aborted run did not change what is usual
+    assert SelectorHealth('test', path=health_path).usual == health.usual
+
+
+def test_fallback_that_matched_is_promoted_next_run(health_path):
+    health = SelectorHealth('test', path=health_path)
+    assert health.promote(SELECTORS) == SELECTORS
+    health.check_page(1, page(10, vacancies_selector='.vacancy-box span'))
+    assert health.fallback_matches() == [('vacancies', '.vacancy-box span', 10)]
+    health.close()
+
+    promoted = SelectorHealth('test', path=health_path).promote(SELECTORS)
+    assert promoted['vacancies'] == (SELECTORS['vacancies'][1], SELECTORS['vacancies'][0])
+    # The primary still matched for deadline: unchanged
+    assert promoted['deadline'] == SELECTORS['deadline']
@@ -0,0 +1,52 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    """
+    Thread-safe politeness limit shared by concurrent workers:
+    at most `rate` request starts per second for each host
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    @staticmethod
+    def _clock():
+        return time.monotonic()
+
+    def wait(self, url):
+        """Block until a request to url's host may start; returns seconds waited"""
+        if not self.interval:
+            return 0.0
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class SharedHostRateLimiter(HostRateLimiter):
+    """
+    HostRateLimiter shared by worker processes: its state lives in a
+    multiprocessing Manager, and the limiter can be passed to the workers
+    """
+
+    def __init__(self, rate, manager):
+        super().__init__(rate)
+        self._lock = manager.Lock()
+        self._next_slot = manager.dict()
+
+    @staticmethod
+    def _clock():
+        # Comparable between processes
+        return time.time()
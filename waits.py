@@ -0,0 +1,196 @@
+"""
+Readiness-driven waits for the Selenium scrapers.
+
+Instead of fixed time.sleep() calls, every wait polls a concrete readiness
+signal (document.readyState, a stable element count, network idle) and
+returns as soon as the page is actually ready. All waits of a run draw from
+one LatencyBudget, which caps the total time a run may spend waiting and
+records how long each wait really took.
+"""
+import json
+import os
+import threading
+import time
+
+
+class LatencyBudget:
+    """Total waiting time allowed for one run, shared by all waits (thread-safe)"""
+
+    def __init__(self, seconds=None):
+        # Usage: WAIT_BUDGET=90 python bdgovtjob.py
+        if seconds is None:
+            seconds = float(os.environ.get('WAIT_BUDGET', 180))
+        self.seconds = seconds
+        self.timings = []
+        self._spent = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        with self._lock:
+            return max(0.0, self.seconds - self._spent)
+
+    def allow(self, timeout):
+        """Timeout to use for the next wait: never more than what is left"""
+        return min(timeout, self.remaining)
+
+    def record(self, name, seconds, ready):
+        with self._lock:
+            self._spent += seconds
+            self.timings.append({'wait': name, 'seconds': round(seconds, 3), 'ready': ready})
+
+    def summary(self):
+        with self._lock:
+            timings = list(self.timings)
+        total = sum(t['seconds'] for t in timings)
+        slowest = max(timings, key=lambda t: t['seconds']) if timings else None
+        return {
+            'waits': len(timings),
+            'total_seconds': round(total, 3),
+            'timeouts': sum(1 for t in timings if not t['ready']),
+            'slowest': slowest,
+            'budget_seconds': self.seconds,
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        if not s['waits']:
+            return
+        print(f"⏱ Waits: {s['waits']} totalling {s['total_seconds']}s "
+              f"({s['timeouts']} timed out, budget {s['budget_seconds']}s)")
+        if s['slowest']:
+            print(f"   Slowest: {s['slowest']['wait']} ({s['slowest']['seconds']}s)")
+
+
+class ReadinessWaiter:
+    """Waits on readiness signals of one WebDriver, charging a LatencyBudget"""
+
+    def __init__(self, driver, budget=None, poll=0.1, network_stats=None):
+        self.driver = driver
+        self.budget = budget or LatencyBudget()
+        self.poll = poll
+        # Network events read while waiting are also forwarded here (see lean_profile.NetworkStats)
+        self.network_stats = network_stats
+
+    def _timed(self, name, timeout, condition):
+        """Poll condition() until truthy or the (budgeted) timeout expires"""
+        # Selenium is imported by the waits, not with the module: browserless
+        # runs use LatencyBudget too (see cli.py)
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        timeout = self.budget.allow(timeout)
+        start = time.monotonic()
+        ready = False
+        try:
+            ready = bool(WebDriverWait(self.driver, timeout, poll_frequency=self.poll).until(
+                lambda driver: condition()
+            ))
+        except TimeoutException:
+            ready = False
+        finally:
+            self.budget.record(name, time.monotonic() - start, ready)
+        return ready
+
+    def document_ready(self, timeout=15):
+        """Wait for document.readyState to be 'complete' (or 'interactive' with eager loading)"""
+        def condition():
+            state = self.driver.execute_script("return document.readyState")
+            return state in ('complete', 'interactive')
+        return self._timed('document_ready', timeout, condition)
+
+    def element_present(self, by, value, timeout=10):
+        """Wait for at least one element matching (by, value); returns it or None"""
+        from selenium.common.exceptions import WebDriverException
+        from selenium.webdriver.support import expected_conditions as EC
+
+        found = []
+
+        def condition():
+            try:
+                found.append(EC.presence_of_element_located((by, value))(self.driver))
+                return True
+            except WebDriverException:
+                return False
+        self._timed(f'present:{value}', timeout, condition)
+        return found[0] if found else None
+
+    def stable_count(self, css_selector, timeout=15, settle=0.5, minimum=1):
+        """
+        Wait until at least `minimum` elements match css_selector and their
+        count has not changed for `settle` seconds; returns the final count
+        """
+        state = {'count': -1, 'since': time.monotonic()}
+
+        def condition():
+            count = self.driver.execute_script(
+                "return document.querySelectorAll(arguments[0]).length", css_selector
+            )
+            now = time.monotonic()
+            if count != state['count']:
+                state['count'], state['since'] = count, now
+                return False
+            return count >= minimum and now - state['since'] >= settle
+        self._timed(f'stable_count:{css_selector}', timeout, condition)
+        return max(state['count'], 0)
+
+    def network_idle(self, timeout=10, idle=0.5):
+        """
+        Wait until no network request has been in flight for `idle` seconds.
+        Uses CDP Network events from the performance log when the driver was
+        started with performance logging, otherwise Resource Timing entries.
+        """
+        state = {'inflight': set(), 'marker': None, 'since': time.monotonic()}
+        use_cdp = self._performance_log_enabled()
+
+        def condition():
+            now = time.monotonic()
+            if use_cdp:
+                changed = self._drain_network_events(state['inflight'])
+                busy = bool(state['inflight'])
+            else:
+                marker = self.driver.execute_script(
+                    "return performance.getEntriesByType('resource').length"
+                )
+                changed, busy = marker != state['marker'], False
+                state['marker'] = marker
+            if changed or busy:
+                state['since'] = now
+                return False
+            return now - state['since'] >= idle
+        return self._timed('network_idle', timeout, condition)
+
+    def staleness_of(self, element, timeout=10):
+        """Wait for element to be detached from the DOM (e.g. after navigation)"""
+        from selenium.webdriver.support import expected_conditions as EC
+
+        return self._timed('staleness', timeout, lambda: EC.staleness_of(element)(self.driver))
+
+    def _performance_log_enabled(self):
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            return 'performance' in self.driver.log_types
+        except WebDriverException:
+            return False
+
+    def _drain_network_events(self, inflight):
+        """Apply CDP Network.* events to the in-flight request set; True if any arrived"""
+        entries = self.driver.get_log('performance')
+        messages = [json.loads(entry['message'])['message'] for entry in entries]
+        if self.network_stats is not None:
+            self.network_stats.consume(messages)
+        for message in messages:
+            method = message.get('method', '')
+            request_id = message.get('params', {}).get('requestId')
+            if method == 'Network.requestWillBeSent':
+                inflight.add(request_id)
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                inflight.discard(request_id)
+        return bool(entries)
+
+
+def enable_network_events(chrome_options):
+    """Ask Chrome to expose CDP Network events through the performance log"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return chrome_options